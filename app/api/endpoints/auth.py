@@ -14,7 +14,8 @@ from app.core.dependencies import get_current_active_user
 from app.schema.auth_schema import GoogleSignIn, SignIn, SignInResponse, SignUp
 from app.schema.user_schema import User
 from app.services.auth_service import AuthService
-from app.util.google import get_google_auth_state, google_auth_flow, verify_google_token
+from app.util.google import OAuthStateStore, exchange_code, \
+    get_google_auth_state, session_credentials, verify_google_token
 
 router = APIRouter(
     prefix="/auth",
@@ -26,7 +27,7 @@ router = APIRouter(
 @inject
 async def sign_in(user_info: SignIn, service: AuthService =
                   Depends(Provide[Container.auth_service])):
-    return service.sign_in(user_info)
+    return await service.async_sign_in(user_info)
 
 
 @router.post("/sign-up", response_model=User)
@@ -34,13 +35,15 @@ async def sign_in(user_info: SignIn, service: AuthService =
 async def sign_up(user_info: SignUp, service: AuthService =
                   Depends(Provide[Container.auth_service])):
 
-    return service.sign_up(user_info)
+    return await service.async_sign_up(user_info)
 
 
 @router.get("/google/login", summary="Google Login Authentication")
-async def google_login(request: Request):
+@inject
+async def google_login(request: Request, states: OAuthStateStore =
+                       Depends(Provide[Container.oauth_states])):
     """"""
-    authorization_url, state = get_google_auth_state()
+    authorization_url, state = get_google_auth_state(states)
 
     request.session['state'] = state
 
@@ -50,32 +53,31 @@ async def google_login(request: Request):
 @router.get("/", summary="Google Login Authentication")
 @inject
 async def google_login_callback(request: Request, service: AuthService =
-                                Depends(Provide[Container.auth_service])):
+                                Depends(Provide[Container.auth_service]),
+                                states: OAuthStateStore =
+                                Depends(Provide[Container.oauth_states])):
     """"""
-    flow = google_auth_flow(str(request.query_params.get('code')))
+    state = request.query_params.get('state')
 
-    if flow is None:
-        return responses.JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={"detail": "An error has occured!"})
+    # the state is checked first, as the exchange needs its verifier
+    code_verifier = states.pop(state) if state else None
 
-    if not request.session['state'] == request.query_params['state']:
+    if code_verifier is None or not request.session.get('state') == state:
         return responses.JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED,
                                       content={"detail": "Unauthorized"})
 
-    credentials = flow.credentials
+    token = await exchange_code(
+        str(request.query_params.get('code')), code_verifier)
+
+    if token is None:
+        return responses.JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": "An error has occured!"})
 
-    request.session['credentials'] = {
-        'token': credentials.token,
-        'refresh_token': credentials.refresh_token,
-        'token_uri': credentials.token_uri,
-        'client_id': credentials.client_id,
-        'client_secret': credentials.client_secret,
-        'scopes': credentials.scopes,
-    }
+    request.session['credentials'] = session_credentials(token)
 
-    user_info: Optional[Mapping[str, Any]] = verify_google_token(
-        id_token=credentials._id_token)
+    user_info: Optional[Mapping[str, Any]] = await verify_google_token(
+        id_token=token.get("id_token"))
 
     return service.google_sign_up(GoogleSignIn(**jsonable_encoder(user_info)))
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# File: debug.py
+# Author: Oluwatobiloba Light
+"""Debug endpoint"""
+
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends
+
+from app.core.admission import AdmissionController
+from app.core.cache import PrincipalCache, ResponseCache
+from app.core.container import Container
+from app.core.database import Database
+from app.core.dependencies import get_current_super_user
+from app.core.password_hasher import PasswordHasher
+from app.core.security import JWTBearer
+from app.model.user import User
+
+
+router = APIRouter(
+    prefix="/debug", tags=["debug"], dependencies=[Depends(JWTBearer())])
+
+
+@router.get("/db", summary="Database connection pool metrics")
+@inject
+async def get_db_stats(
+    db: Database = Depends(Provide[Container.db]),
+    current_user: User = Depends(get_current_super_user),
+):
+    return db.pool_stats()
+
+
+@router.get("/cache", summary="Event read cache metrics")
+@inject
+async def get_cache_stats(
+    cache: ResponseCache = Depends(Provide[Container.event_cache]),
+    current_user: User = Depends(get_current_super_user),
+):
+    return cache.stats()
+
+
+@router.get("/principals", summary="Authenticated user cache metrics")
+@inject
+async def get_principal_cache_stats(
+    cache: PrincipalCache = Depends(Provide[Container.principal_cache]),
+    current_user: User = Depends(get_current_super_user),
+):
+    return cache.stats()
+
+
+@router.get("/password-hasher", summary="Password hashing pool metrics")
+@inject
+async def get_password_hasher_stats(
+    password_hasher: PasswordHasher = Depends(
+        Provide[Container.password_hasher]),
+    current_user: User = Depends(get_current_super_user),
+):
+    return password_hasher.stats()
+
+
+@router.get("/admission", summary="Event waiting room metrics")
+@inject
+async def get_admission_stats(
+    admission: AdmissionController = Depends(Provide[Container.admission]),
+    current_user: User = Depends(get_current_super_user),
+):
+    return admission.stats()
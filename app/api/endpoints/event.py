@@ -7,20 +7,30 @@
 from typing import List
 from uuid import UUID
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from app.core.admission import QUEUE_TOKEN_HEADER, AdmissionController
+from app.core.config import configs
 from app.core.container import Container
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, require_admission
+from app.core.exceptions import ValidationError
 from app.core.security import JWTBearer
 from app.model.category import Category
 from app.model.user import User
 from app.schema.category_schema import CreateCategory
-from app.schema.event_schema import CreateEvent, Event, Event_, FindEventQuery, \
-    FindEventQueryOptions, FindEventsResult, UpdateEvent
-from app.schema.user_schema import User_
+from app.schema.ticket_schema import CreateTicketType, Reservation, \
+    ReserveTickets, TicketShards, TicketType
+from app.schema.queue_schema import QueueStatus
+from app.schema.event_schema import CreateEvent, DeleteEvents, Event, \
+    FindEventQuery, FindEventQueryOptions, FindEventsResult, UpdateEvent
 from app.services.category_service import CategoryService
 from app.services.event_service import EventService
-from app.services.user_service import UserService
+from app.services.ticket_service import TicketService
+from app.util.etag import compute_etag, is_not_modified, latest, \
+    not_modified, set_validators
+from app.util.serializers import serialize_event, serialize_events, \
+    serialize_events_result
 
 
 router = APIRouter(
@@ -29,19 +39,58 @@ router = APIRouter(
 )
 
 
+def _event_version(event) -> list:
+    """What an event's representation derives from, for its ETag"""
+    owner = event.owner
+
+    return [event.id, event.updated_at,
+            owner.id if owner else None, owner.updated_at if owner else None,
+            sorted(str(category.id) for category in event.categories)]
+
+
+def _events_etag(events: list, *parts) -> str:
+    """
+    ETag of a list of events. Lists carry no Last-Modified, as a deleted
+    event leaves the latest update of the others as it was
+    """
+    return compute_etag([_event_version(event) for event in events], *parts)
+
+
+def _event_validators(event) -> tuple:
+    """Returns the ETag and Last-Modified of an event"""
+    last_modified = latest(
+        [event.updated_at, event.owner.updated_at if event.owner else None])
+
+    return _events_etag([event]), last_modified
+
+
+def _events_response(content, etag: str,
+                     last_modified=None) -> ORJSONResponse:
+    """Serialized events, with their validators"""
+    response = ORJSONResponse(content)
+
+    set_validators(response, etag, last_modified)
+
+    return response
+
+
 @router.get("/all", summary="All events", response_model=FindEventsResult)
 @inject
 async def get_events(
+    request: Request,
     find_query: FindEventQuery = Depends(),
     service: EventService = Depends(Provide[Container.event_service]),
 ):
-    events = service.get_list(FindEventQueryOptions(
+    events = await service.async_get_list(FindEventQueryOptions(
         **jsonable_encoder(find_query)
     ))
 
-    print("events", events['founds'])
+    etag = _events_etag(events['founds'], events['search_options'])
+
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
-    return events
+    return _events_response(serialize_events_result(events), etag)
 
 
 @router.post("/category/create", summary="Create event category",
@@ -68,41 +117,70 @@ async def create_event_category(
 async def create_event(
     event_info: CreateEvent,
     service: EventService = Depends(Provide[Container.event_service]),
-    user_service: UserService = Depends(Provide[Container.user_service]),
     current_user: User = Depends(get_current_user),
 ):
     event = service.create_event(event_info, current_user)
 
-    owner = user_service.get_by_id(str(current_user.id))
+    # the owner is the current user
+    return ORJSONResponse(serialize_event(event, owner=current_user))
 
-    categories = event.categories
 
-    event = Event(**event.model_dump(), categories=[*categories],
-                  owner=User_(**owner.model_dump()))
+@router.post("/batch", summary="Create a batch of events",
+             dependencies=[Depends(JWTBearer())],
+             response_model=List[Event]
+             )
+@inject
+async def create_events(
+    events_info: List[CreateEvent],
+    service: EventService = Depends(Provide[Container.event_service]),
+    current_user: User = Depends(get_current_user),
+):
+    if len(events_info) > configs.BULK_MAX_SIZE:
+        raise ValidationError(
+            detail=f"A batch holds at most {configs.BULK_MAX_SIZE} events")
+
+    events = service.create_events(events_info, current_user)
+
+    return ORJSONResponse(serialize_events(events))
+
+
+@router.delete("/batch", summary="Delete a batch of events",
+               dependencies=[Depends(JWTBearer())],
+               )
+@inject
+async def delete_events(
+    events_info: DeleteEvents,
+    service: EventService = Depends(Provide[Container.event_service]),
+    current_user: User = Depends(get_current_user)
+):
+    if len(events_info.ids) > configs.BULK_MAX_SIZE:
+        raise ValidationError(
+            detail=f"A batch holds at most {configs.BULK_MAX_SIZE} events")
 
-    return event
+    deleted = service.remove_events(events_info.ids, current_user.id)
+
+    return {
+        "message": "Events deleted successfully!",
+        "deleted": deleted
+    }
 
 
 @router.get("/{event_id}", summary="Get an event", response_model=Event)
 @inject
 async def get_event(
     event_id: str,
+    request: Request,
     service: EventService = Depends(Provide[Container.event_service]),
-    user_service: UserService = Depends(Provide[Container.user_service])
 ):
-    event = service.get_by_id(event_id)
-
-    owner = user_service.get_by_id(str(event.owner_id))
+    event = await service.async_get_by_id(event_id)
 
-    delattr(owner, "password")
+    etag, last_modified = _event_validators(event)
 
-    categories: List[Category] = []
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
 
-    for category in event.categories:
-        categories.append(Category(**category.model_dump()))
-
-    return Event(**event.model_dump(), categories=categories,
-                 owner=User_(**owner.model_dump()))
+    # the owner is loaded with the event
+    return _events_response(serialize_event(event), etag, last_modified)
 
 
 @router.patch("/{event_id}", summary="Update an event",
@@ -118,7 +196,7 @@ async def update_event(
 ):
     event = service.patch(event_info, UUID(event_id), current_user.id)
 
-    return event
+    return ORJSONResponse(serialize_event(event))
 
 
 @router.delete("/{event_id}", summary="Delete an event",
@@ -143,22 +221,117 @@ async def delete_event(
 @inject
 async def get_user_events(
     owner_id: str,
+    request: Request,
     find_query: FindEventQuery = Depends(),
     service: EventService = Depends(Provide[Container.event_service]),
-    user_service: UserService = Depends(Provide[Container.user_service])
 ):
-    events = service.get_events_by_user(find_query, UUID(owner_id))
+    events = await service.async_get_events_by_user(
+        find_query, UUID(owner_id))
 
-    for event in events['founds']:
-        category_list: List[Category] = []
+    etag = _events_etag(events['founds'], events['search_options'])
 
-        for category in event.categories:
-            category_list.append(
-                Category(**category.model_dump()))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
-        owner = User_(**event.owner.model_dump())
+    return _events_response(serialize_events_result(events), etag)
 
-        event = Event_(**event.model_dump(),
-                       categories=category_list, owner=owner)
 
-    return events
+@router.post("/{event_id}/ticket-types", summary="Create a ticket type",
+             dependencies=[Depends(JWTBearer())],
+             response_model=TicketType)
+@inject
+async def create_ticket_type(
+    event_id: UUID,
+    ticket_type_info: CreateTicketType,
+    service: TicketService = Depends(Provide[Container.ticket_service]),
+    current_user: User = Depends(get_current_user)
+):
+    return service.create_ticket_type(
+        ticket_type_info, event_id, current_user.id)
+
+
+@router.get("/{event_id}/ticket-types", summary="Get the ticket types",
+            response_model=List[TicketType])
+@inject
+async def get_ticket_types(
+    event_id: UUID,
+    service: TicketService = Depends(Provide[Container.ticket_service]),
+):
+    return service.get_ticket_types(event_id)
+
+
+@router.put("/{event_id}/ticket-shards",
+            summary="Split the ticket availability over counters",
+            dependencies=[Depends(JWTBearer())],
+            response_model=List[TicketType])
+@inject
+async def set_ticket_shards(
+    event_id: UUID,
+    shards_info: TicketShards,
+    service: TicketService = Depends(Provide[Container.ticket_service]),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Sharded counters spread the holds of a flash sale over several rows;
+    one shard is a single counter
+    """
+    return service.set_ticket_shards(
+        event_id, current_user.id, shards_info.shards)
+
+
+@router.get("/{event_id}/queue", summary="Place in the waiting room",
+            dependencies=[Depends(JWTBearer())],
+            response_model=QueueStatus)
+@inject
+async def get_queue_status(
+    event_id: UUID,
+    request: Request,
+    wait: float = Query(default=0, ge=0, le=configs.ADMISSION_MAX_WAIT),
+    service: EventService = Depends(Provide[Container.event_service]),
+    admission: AdmissionController = Depends(Provide[Container.admission]),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Joins the event's waiting room, or with the token in the X-Queue-Token
+    header gives the place held. Up to `wait` seconds are spent waiting
+    for the admission before answering.
+    """
+    service.get_by_id(str(event_id))
+
+    return await admission.wait(event_id, current_user.id,
+                                request.headers.get(QUEUE_TOKEN_HEADER),
+                                wait)
+
+
+@router.post("/{event_id}/reserve", summary="Reserve tickets",
+             dependencies=[Depends(JWTBearer()),
+                           Depends(require_admission)],
+             response_model=Reservation)
+@inject
+async def reserve_tickets(
+    event_id: UUID,
+    reserve_info: ReserveTickets,
+    service: TicketService = Depends(Provide[Container.ticket_service]),
+    current_user: User = Depends(get_current_user)
+):
+    return service.reserve(reserve_info, event_id, current_user.id)
+
+
+@router.delete("/{event_id}/reservations/{reservation_id}",
+               summary="Cancel a reservation",
+               dependencies=[Depends(JWTBearer())],
+               )
+@inject
+async def cancel_reservation(
+    event_id: UUID,
+    reservation_id: UUID,
+    service: TicketService = Depends(Provide[Container.ticket_service]),
+    current_user: User = Depends(get_current_user)
+):
+    remaining = service.cancel_reservation(
+        event_id, reservation_id, current_user.id)
+
+    return {
+        "message": "Reservation cancelled successfully!",
+        "remaining": remaining
+    }
@@ -7,21 +7,27 @@
 from typing import List
 from uuid import UUID
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
 
+from app.core.config import configs
 from app.core.container import Container
-from app.core.dependencies import get_current_user
-from app.core.exceptions import ValidationError
-from app.core.security import JWTBearer, get_password_hash
+from app.core.dependencies import get_current_user, get_token_payload
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.password_hasher import PasswordHasher
+from app.core.security import JWTBearer
 from app.model.category import Category
 from app.model.event import Event
+from app.schema.auth_schema import Payload
 from app.schema.base_schema import Blank
 from app.schema.event_schema import Event_, FindEventQuery, FindEventsResult, FindUserEventsResult, GetUserEventsQuery
 from app.schema.user_schema import FindUserQuery, \
     FindUserQueryOptions, FindUserResult, UpsertUser, User, User_
 from app.services.event_service import EventService
 from app.services.user_service import UserService
+from app.util.jobs import jobs
+from app.util.serializers import serialize_events_result
 
 router = APIRouter(
     prefix="/user", tags=["user"], dependencies=[Depends(JWTBearer())])
@@ -48,21 +54,10 @@ async def get_user_events(
     event_service: EventService = Depends(Provide[Container.event_service]),
     current_user: User = Depends(get_current_user),
 ):
-    events = event_service.get_events_by_user(find_query, current_user.id)
+    events = await event_service.async_get_events_by_user(
+        find_query, current_user.id)
 
-    for event in events['founds']:
-        category_list: List[Category] = []
-
-        for category in event.categories:
-            category_list.append(
-                Category(**category.model_dump()))
-
-        owner = User_(**event.owner.model_dump())
-
-        event = Event_(**event.model_dump(),
-                       categories=category_list, owner=owner)
-
-    return events
+    return ORJSONResponse(serialize_events_result(events))
 
 
 @router.get("/{user_id}", response_model=User)
@@ -95,13 +90,15 @@ async def update_user(
     # user_id: UUID,
     user: UpsertUser,
     service: UserService = Depends(Provide[Container.user_service]),
+    password_hasher: PasswordHasher = Depends(
+        Provide[Container.password_hasher]),
     current_user: User = Depends(get_current_user),
 ):
 
     if user.password and len(user.password) < 6:
         raise ValidationError("Password is too short!")
     elif user.password and len(user.password) >= 6:
-        user.password = get_password_hash(user.password)
+        user.password = await password_hasher.hash(user.password)
 
     updated_user = service.patch(current_user.id, user)
 
@@ -113,11 +110,44 @@ async def update_user(
 @router.delete("/", response_model=None)
 @inject
 async def delete_user(
+    background_tasks: BackgroundTasks,
+    background: bool = False,
     service: UserService = Depends(Provide[Container.user_service]),
     current_user: User = Depends(get_current_user),
 ):
-    service.remove_by_id(str(current_user.id))
+    user_id = str(current_user.id)
+
+    # large accounts are deleted in batches after the response is sent
+    if background or service.count_events(user_id) > \
+            configs.USER_DELETE_BACKGROUND_THRESHOLD:
+        job = service.start_remove_job(user_id)
+
+        background_tasks.add_task(service.run_remove_job, job["id"], user_id)
+
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+            "message": "Account deletion started",
+            "job": job
+        })
+
+    service.remove_by_id(user_id)
 
     return {
         "message": "Account deleted successfully!"
     }
+
+
+@router.get("/delete-jobs/{job_id}", summary="Progress of an account deletion")
+async def get_delete_job(job_id: str,
+                         payload: Payload = Depends(get_token_payload)):
+    """
+    The job of the caller's own account deletion. Its user is gone once the
+    job is done, so the caller is known by their token. Jobs are kept by the
+    worker that runs them, polls reaching another worker get a 404.
+    """
+    job = jobs.get(job_id)
+
+    if job is None or job["kind"] != "delete_user" or \
+            job["user_id"] != payload.id:
+        raise NotFoundError(detail=f"not found id : {job_id}")
+
+    return job
@@ -9,9 +9,10 @@ from fastapi import APIRouter
 from app.api.endpoints.auth import router as auth_router
 from app.api.endpoints.user import router as user_router
 from app.api.endpoints.event import router as event_router
+from app.api.endpoints.debug import router as debug_router
 
 routers = APIRouter()
-router_list = [auth_router, user_router, event_router]
+router_list = [auth_router, user_router, event_router, debug_router]
 
 for router in router_list:
     # router.tags = routers.tags.append("v1")
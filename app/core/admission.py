@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# File: admission.py
+# Author: Oluwatobiloba Light
+"""Waiting room in front of the purchases of an event"""
+
+
+import asyncio
+import hashlib
+import hmac
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from uuid import uuid4
+
+from jose import JWTError, jwt
+
+from app.core.config import configs
+from app.core.exceptions import ServiceUnavailableError
+
+
+ALGORITHM = "HS256"
+
+QUEUE_TOKEN_TYPE = "queue"
+
+# the header a buyer sends their position token in
+QUEUE_TOKEN_HEADER = "X-Queue-Token"
+
+
+def queue_signing_key(secret: str) -> str:
+    """
+    The key queue tokens are signed with, derived from the app's secret so
+    no other token signed with it passes for one
+    """
+    return hmac.new(secret.encode(), b"admission-queue-token",
+                    hashlib.sha256).hexdigest()
+
+
+class EventQueue:
+    """
+    FIFO of the buyers of one event. Positions are handed out in order and
+    admitted at `rate` per second, after a `burst` let in at once, so a
+    position is admitted once `admitted` reaches it. Admissions are worked
+    out from the time passed whenever the queue is touched.
+    """
+
+    def __init__(self, rate: float, burst: int, now: float) -> None:
+        # a queue dropped while idle starts over, its tokens are refused
+        self.epoch = uuid4().hex[:12]
+        self.rate = rate
+        self.burst = burst
+        self.joined = 0
+        self.admitted = float(burst)
+        self.updated_at = now
+        self.joined_at = now
+        # the positions of the buyers still waiting, so one buyer does not
+        # queue twice
+        self.positions: Dict[str, int] = {}
+        self.waiting: Deque[Tuple[int, float, str]] = deque()
+        # the admitted positions a purchase was made with, by when, each
+        # admits one purchase
+        self.used: Dict[int, float] = {}
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _record_wait(self, wait: float) -> None:
+        self.waits += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def advance(self, now: float) -> None:
+        admitted, updated_at = self.admitted, self.updated_at
+
+        # the unused rate of an idle queue adds up to a burst at most
+        self.admitted = min(admitted + (now - updated_at) * self.rate,
+                            self.joined + self.burst)
+        self.updated_at = now
+
+        while self.waiting and self.waiting[0][0] <= self.admitted:
+            position, joined_at, key = self.waiting.popleft()
+
+            self.positions.pop(key, None)
+
+            admitted_at = updated_at + \
+                max(position - admitted, 0) / self.rate
+
+            self._record_wait(max(admitted_at - joined_at, 0))
+
+    def join(self, key: str, now: float) -> int:
+        self.advance(now)
+
+        if key in self.positions:
+            return self.positions[key]
+
+        self.joined += 1
+        self.joined_at = now
+
+        if self.joined <= self.admitted:
+            self._record_wait(0)
+        else:
+            self.positions[key] = self.joined
+            self.waiting.append((self.joined, now, key))
+
+        return self.joined
+
+    @property
+    def depth(self) -> int:
+        return len(self.waiting)
+
+    def ahead(self, position: int) -> int:
+        return max(position - math.floor(self.admitted) - 1, 0)
+
+    def eta(self, position: int) -> float:
+        """Seconds until the position is admitted"""
+        return max(position - self.admitted, 0) / self.rate
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "joined": self.joined,
+            "admitted": min(math.floor(self.admitted), self.joined),
+            "rate": self.rate,
+            "waits": self.waits,
+            "wait_avg": round(self.wait_total / self.waits, 3)
+            if self.waits else None,
+            "wait_max": round(self.wait_max, 3),
+            "used": len(self.used),
+        }
+
+
+class AdmissionController:
+    """
+    Smooths the buyers of each event into a steady rate. A buyer joins the
+    event's queue and gets a token signing their position, which they poll
+    with until admitted, for a fresh token each time; an admitted position
+    passes the purchase routes once. Queues are in process, each worker
+    admits its own rate.
+    """
+
+    def __init__(self, rate: float, burst: int, max_depth: int,
+                 token_ttl: int, enabled: bool = True) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_depth = max_depth
+        self.token_ttl = token_ttl
+        self.enabled = enabled
+        self.rejected = 0
+        self._key = queue_signing_key(configs.SECRET_KEY)
+        self._queues: Dict[str, EventQueue] = {}
+        self._pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        # the tokens of a queue idle for their lifetime have all expired
+        if now - self._pruned_at < self.token_ttl:
+            return
+
+        self._pruned_at = now
+
+        for event_id, queue in list(self._queues.items()):
+            queue.advance(now)
+
+            if not queue.depth and now - queue.joined_at > self.token_ttl:
+                del self._queues[event_id]
+
+    def _queue(self, event_id: str, now: float) -> EventQueue:
+        queue = self._queues.get(event_id)
+
+        if queue is None:
+            self._prune(now)
+
+            queue = self._queues[event_id] = EventQueue(
+                self.rate, self.burst, now)
+
+        return queue
+
+    def _token(self, event_id: str, user_id: str, queue: EventQueue,
+               position: int) -> str:
+        return jwt.encode({
+            "typ": QUEUE_TOKEN_TYPE, "evt": event_id, "sub": user_id,
+            "epoch": queue.epoch, "pos": position,
+            "exp": int(time.time()) + self.token_ttl,
+        }, self._key, algorithm=ALGORITHM)
+
+    def _claims(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not token:
+            return None
+
+        try:
+            claims = jwt.decode(token, self._key, algorithms=ALGORITHM)
+        except JWTError:
+            return None
+
+        return claims if claims.get("typ") == QUEUE_TOKEN_TYPE else None
+
+    def _status(self, event_id: str, user_id: str, queue: EventQueue,
+                position: int) -> Dict[str, Any]:
+        eta = queue.eta(position)
+
+        return {
+            "event_id": event_id,
+            "position": position,
+            "ahead": queue.ahead(position),
+            "admitted": eta == 0,
+            "retry_after": math.ceil(eta),
+            # renewed on every poll, the lifetime only runs between polls
+            "token": self._token(event_id, user_id, queue, position),
+        }
+
+    def _use(self, queue: EventQueue, position: int, now: float) -> None:
+        # the tokens of a position used longer ago than their lifetime
+        # have all expired
+        while queue.used and \
+                next(iter(queue.used.values())) < now - self.token_ttl:
+            del queue.used[next(iter(queue.used))]
+
+        queue.used[position] = now
+
+    def admit(self, event_id: Any, user_id: Any,
+              token: Optional[str] = None,
+              use: bool = False) -> Dict[str, Any]:
+        """
+        The place in the queue of the token, or of a new position for a
+        buyer whose token is missing, expired, from an older queue or of a
+        position already used. With `use`, an admitted position is used up.
+        """
+        event_id, user_id = str(event_id), str(user_id)
+
+        claims = self._claims(token)
+
+        now = time.monotonic()
+
+        with self._lock:
+            queue = self._queue(event_id, now)
+
+            if claims is not None and claims.get("evt") == event_id and \
+                    claims.get("sub") == user_id and \
+                    claims.get("epoch") == queue.epoch and \
+                    claims["pos"] not in queue.used:
+                position = claims["pos"]
+
+                queue.advance(now)
+            else:
+                if queue.depth >= self.max_depth and \
+                        user_id not in queue.positions:
+                    self.rejected += 1
+
+                    raise ServiceUnavailableError(
+                        detail="The queue of this event is full, try again "
+                               "shortly",
+                        headers={"Retry-After": str(
+                            math.ceil(queue.depth / self.rate))})
+
+                position = queue.join(user_id, now)
+
+            status = self._status(event_id, user_id, queue, position)
+
+            if use and status["admitted"]:
+                self._use(queue, position, now)
+
+            return status
+
+    def release(self, event_id: Any, position: int) -> None:
+        """Gives back a position used for a purchase that failed"""
+        with self._lock:
+            queue = self._queues.get(str(event_id))
+
+            if queue is not None:
+                queue.used.pop(position, None)
+
+    async def wait(self, event_id: Any, user_id: Any,
+                   token: Optional[str] = None,
+                   timeout: float = 0) -> Dict[str, Any]:
+        """`admit`, waiting up to the timeout for the admission"""
+        deadline = time.monotonic() + timeout
+
+        while True:
+            status = self.admit(event_id, user_id, token)
+
+            remaining = deadline - time.monotonic()
+
+            if status["admitted"] or remaining <= 0:
+                return status
+
+            token = status["token"]
+
+            # positions are admitted on a schedule, wake when it is due
+            with self._lock:
+                queue = self._queues.get(str(event_id))
+                eta = queue.eta(status["position"]) if queue else 0
+
+            await asyncio.sleep(min(max(eta, 0.01), remaining))
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+
+        with self._lock:
+            queues = {}
+
+            for event_id, queue in self._queues.items():
+                queue.advance(now)
+                queues[event_id] = queue.stats()
+
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_depth": self.max_depth,
+            "rejected": self.rejected,
+            "depth": sum(queue["depth"] for queue in queues.values()),
+            "queues": queues,
+        }
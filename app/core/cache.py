@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# File: cache.py
+# Author: Oluwatobiloba Light
+"""Response cache"""
+
+
+import hashlib
+import json
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, \
+    Tuple
+from uuid import uuid4
+
+from cachetools import TLRUCache
+
+
+class CacheBackend(ABC):
+    """Byte store behind `ResponseCache`, e.g in process or shared"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In process LRU with per entry TTL, bounded in entries and bytes"""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pop(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+
+        self.size_bytes -= len(value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        # a value larger than the whole cache would only evict everything
+        if len(value) > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+            self._entries[key] = (value, expires_at)
+            self.size_bytes += len(value)
+
+            while len(self._entries) > self.max_entries or \
+                    self.size_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ResponseCache:
+    """
+    Caches pickled results under keys derived from normalized arguments.
+    Each key belongs to namespaces whose version token is part of the key,
+    so invalidating a namespace gives it a new token and orphans its
+    entries, which age out of the backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float,
+                 enabled: bool = True) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def _version(self, namespace: str) -> str:
+        key = f"version:{namespace}"
+
+        version = self.backend.get(key)
+
+        # a version lost to eviction is replaced, which also invalidates
+        if version is None:
+            version = uuid4().hex.encode()
+
+            self.backend.set(key, version)
+
+        return version.decode()
+
+    def key(self, namespaces: Iterable[str], *parts: Any) -> str:
+        namespaces = list(namespaces)
+
+        payload = json.dumps(
+            [[self._version(namespace) for namespace in namespaces], parts],
+            sort_keys=True, default=str, separators=(",", ":"))
+
+        return ":".join(namespaces) + ":" + \
+            hashlib.sha1(payload.encode()).hexdigest()
+
+    def get_or_set(self, namespaces: Iterable[str], parts: tuple,
+                   build: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return build()
+
+        key = self.key(namespaces, *parts)
+
+        cached = self.backend.get(key)
+
+        if cached is not None:
+            return pickle.loads(cached)
+
+        value = build()
+
+        self.backend.set(key, pickle.dumps(value), self.ttl)
+
+        return value
+
+    async def async_get_or_set(self, namespaces: Iterable[str], parts: tuple,
+                               build: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await build()
+
+        key = self.key(namespaces, *parts)
+
+        cached = self.backend.get(key)
+
+        if cached is not None:
+            return pickle.loads(cached)
+
+        value = await build()
+
+        self.backend.set(key, pickle.dumps(value), self.ttl)
+
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.backend.set(f"version:{namespace}", uuid4().hex.encode())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "ttl": self.ttl,
+                **self.backend.stats()}
+
+
+class PrincipalCache:
+    """
+    LRU of authenticated users by id. An entry lives for the TTL at most,
+    and never past the expiry of the token it was loaded for. Users are
+    kept pickled so each request gets its own copy.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, enabled: bool = True) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = TLRUCache(maxsize=maxsize, ttu=self._expires_at,
+                                  timer=time.time)
+        self._lock = threading.Lock()
+
+    def _expires_at(self, key: str, value: Tuple[bytes, Optional[float]],
+                    now: float) -> float:
+        _, token_expires_at = value
+
+        if token_expires_at is None:
+            return now + self.ttl
+        return min(now + self.ttl, token_expires_at)
+
+    def get_or_set(self, user_id: Any, token_expires_at: Optional[float],
+                   build: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return build()
+
+        key = str(user_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            return pickle.loads(entry[0])
+
+        user = build()
+
+        if user is not None:
+            with self._lock:
+                self._entries[key] = (pickle.dumps(user), token_expires_at)
+
+        return user
+
+    def invalidate(self, *user_ids: Any) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(str(user_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "enabled": self.enabled,
+                "ttl": self.ttl,
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
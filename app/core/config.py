@@ -31,6 +31,11 @@ class Configs(BaseSettings):
         "postgresql": "postgresql",
         "mysql": "mysql+mysqldb",
     }
+    ASYNC_DB_ENGINE_MAPPER: dict = {
+        "postgresql": "postgresql+asyncpg",
+        "mysql": "mysql+aiomysql",
+        "sqlite": "sqlite+aiosqlite",
+    }
 
     PROJECT_ROOT: str = os.path.dirname(os.path.dirname(
         os.path.dirname(os.path.abspath(__file__))))
@@ -50,6 +55,20 @@ class Configs(BaseSettings):
     GOOGLE_SCOPES: List[str] = ['https://www.googleapis.com/auth/userinfo.profile',
                                 'https://www.googleapis.com/auth/userinfo.email', 'openid']
     GOOGLE_REDIRECT_URI: str = "http://127.0.0.1:8000/api/v1/auth"
+    # ID token signing certificates, kept for the max-age Google sends and
+    # refreshed in the background shortly before they expire
+    GOOGLE_CERTS_URL: str = os.getenv(
+        "GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+    GOOGLE_CERTS_DEFAULT_MAX_AGE: int = 3600
+    GOOGLE_CERTS_REFRESH_BEFORE: int = 300
+    # overrides the client secrets' token_uri, e.g for a local stub
+    GOOGLE_TOKEN_URI: Optional[str] = os.getenv("GOOGLE_TOKEN_URI")
+    GOOGLE_HTTP_TIMEOUT: float = 10.0
+    GOOGLE_HTTP_MAX_CONNECTIONS: int = 20
+    # logins in progress, by OAuth state
+    GOOGLE_OAUTH_STATE_TTL: int = 600
+    GOOGLE_OAUTH_STATE_MAX_ENTRIES: int = 100000
+    GOOGLE_OAUTH_STATE_MAX_BYTES: int = 16 * 1024 * 1024
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
@@ -73,10 +92,129 @@ class Configs(BaseSettings):
         database=ENV_DATABASE_MAPPER[ENV],
     )
 
+    # async database mode (asyncpg/aiosqlite), disabled unless DB_ASYNC=true
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() == "true"
+    ASYNC_DB_ENGINE: str = ASYNC_DB_ENGINE_MAPPER.get(DB, "postgresql+asyncpg")
+
+    ASYNC_DATABASE_URI: Optional[str] = DATABASE_URI_FORMAT.format(
+        db_engine=ASYNC_DB_ENGINE,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=DB_PORT,
+        database=ENV_DATABASE_MAPPER[ENV],
+    ) if DB_ASYNC else None
+
+    # read replicas, as a comma separated list of hosts on DB_PORT
+    DB_REPLICA_HOSTS: str = os.getenv("DB_REPLICA_HOSTS", "")
+    # round_robin or least_connections
+    DB_REPLICA_STRATEGY: str = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+    # reads go to the primary for this long after a write
+    DB_READ_YOUR_WRITES_SECONDS: float = float(
+        os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+    # connection pool
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv(
+        "DB_POOL_PRE_PING", "true").lower() == "true"
+
     # find query
     PAGE: int = 1
     PAGE_SIZE: int = 10
     ORDERING: str = "-id"
+    # total count strategy: exact, estimated, cached or skip
+    COUNT: str = "exact"
+    COUNT_CACHE_TTL: int = 30
+    COUNT_CACHE_MAXSIZE: int = 1024
+    STATEMENT_CACHE_SIZE: int = 512
+
+    # bulk operations
+    BULK_CHUNK_SIZE: int = 500
+    BULK_MAX_SIZE: int = 1000
+
+    # user deletion, in batches in the background for accounts with more
+    # events than the threshold
+    USER_DELETE_BATCH_SIZE: int = 1000
+    USER_DELETE_BACKGROUND_THRESHOLD: int = 5000
+
+    # event read cache
+    EVENT_CACHE_ENABLED: bool = os.getenv(
+        "EVENT_CACHE_ENABLED", "true").lower() == "true"
+    EVENT_CACHE_TTL: int = 30
+    EVENT_CACHE_MAX_ENTRIES: int = 10000
+    EVENT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # password hashing, in a process pool; sign ins beyond the pending
+    # limit get a 503. Raising the rounds rehashes passwords on sign in
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING: int = int(
+        os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_BCRYPT_ROUNDS: int = int(
+        os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+
+    # claims of verified access tokens, each kept until its token expires
+    VERIFIED_TOKEN_CACHE_SIZE: int = 10000
+
+    # authenticated users, by id, for the dependencies resolving them from
+    # a token; bounds how long a change made by another process may go
+    # unnoticed
+    AUTH_USER_CACHE_ENABLED: bool = os.getenv(
+        "AUTH_USER_CACHE_ENABLED", "true").lower() == "true"
+    AUTH_USER_CACHE_TTL: int = 60
+    AUTH_USER_CACHE_SIZE: int = 10000
+
+    # ticket availability of events selling with sharded counters: the
+    # shard a hold tries first is random or a hash of the buyer, and the
+    # summed view shown on listings may be this many seconds old
+    TICKET_MAX_SHARDS: int = 64
+    TICKET_SHARD_STRATEGY: str = os.getenv("TICKET_SHARD_STRATEGY", "random")
+    TICKET_AVAILABILITY_CACHE_TTL: int = 2
+    TICKET_AVAILABILITY_CACHE_MAX_ENTRIES: int = 10000
+    TICKET_AVAILABILITY_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # waiting room of the purchase routes: the buyers of an event beyond
+    # the burst are queued and admitted at the rate, per event and worker
+    ADMISSION_ENABLED: bool = os.getenv(
+        "ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_RATE: float = float(os.getenv("ADMISSION_RATE", "50"))
+    ADMISSION_BURST: int = int(os.getenv("ADMISSION_BURST", "50"))
+    ADMISSION_MAX_DEPTH: int = 100000
+    # queue tokens are renewed on every poll, an admitted buyer has this
+    # long to make their purchase
+    ADMISSION_TOKEN_TTL: int = 300
+    ADMISSION_MAX_WAIT: int = 20
+
+    # background jobs, kept in the memory of the worker running them
+    JOB_REGISTRY_SIZE: int = 1024
+    JOB_TTL: int = 3600
+
+    @property
+    def REPLICA_DATABASE_URIS(self) -> List[str]:
+        return [self.DATABASE_URI_FORMAT.format(
+            db_engine=self.DB_ENGINE,
+            user=self.DB_USER,
+            password=self.DB_PASSWORD,
+            host=host.strip(),
+            port=self.DB_PORT,
+            database=self.ENV_DATABASE_MAPPER[self.ENV],
+        ) for host in self.DB_REPLICA_HOSTS.split(",") if host.strip()]
+
+    @property
+    def ASYNC_REPLICA_DATABASE_URIS(self) -> List[str]:
+        if not self.DB_ASYNC:
+            return []
+
+        return [self.DATABASE_URI_FORMAT.format(
+            db_engine=self.ASYNC_DB_ENGINE,
+            user=self.DB_USER,
+            password=self.DB_PASSWORD,
+            host=host.strip(),
+            port=self.DB_PORT,
+            database=self.ENV_DATABASE_MAPPER[self.ENV],
+        ) for host in self.DB_REPLICA_HOSTS.split(",") if host.strip()]
 
     class Config:
         case_sensitive = True
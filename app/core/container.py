@@ -5,15 +5,22 @@
 
 from dependency_injector import containers, providers
 
+from app.core.admission import AdmissionController
+from app.core.cache import MemoryCacheBackend, PrincipalCache, \
+    ResponseCache
 from app.core.config import configs
 from app.core.database import Database
+from app.core.password_hasher import PasswordHasher
 from app.repository import *
 from app.repository.category_repository import CategoryRepository
 from app.repository.event_repository import EventRepository
+from app.repository.ticket_repository import TicketRepository
 from app.services import *
 from app.services.auth_service import AuthService
 from app.services.category_service import CategoryService
 from app.services.event_service import EventService
+from app.services.ticket_service import TicketService
+from app.util.google import OAuthStateStore
 
 
 class Container(containers.DeclarativeContainer):
@@ -22,38 +29,104 @@ class Container(containers.DeclarativeContainer):
             "app.api.endpoints.auth",
             "app.api.endpoints.user",
             "app.api.endpoints.event",
+            "app.api.endpoints.debug",
             "app.core.dependencies",
         ]
     )
 
     db = providers.Singleton(
-        Database, db_url=configs.DATABASE_URI)
+        Database, db_url=configs.DATABASE_URI,
+        async_db_url=configs.ASYNC_DATABASE_URI,
+        pool_size=configs.DB_POOL_SIZE,
+        max_overflow=configs.DB_MAX_OVERFLOW,
+        pool_timeout=configs.DB_POOL_TIMEOUT,
+        pool_recycle=configs.DB_POOL_RECYCLE,
+        pool_pre_ping=configs.DB_POOL_PRE_PING,
+        replica_urls=configs.REPLICA_DATABASE_URIS,
+        replica_strategy=configs.DB_REPLICA_STRATEGY,
+        read_your_writes_seconds=configs.DB_READ_YOUR_WRITES_SECONDS,
+        async_replica_urls=configs.ASYNC_REPLICA_DATABASE_URIS)
 
-    # Asynchronous session provider (if needed)
-    # async_db = providers.Singleton(
-    #     AsyncDatabase, db_url=configs.DATABASE_URI, engine_type="prisma"
-    # )
+    cache_backend = providers.Singleton(
+        MemoryCacheBackend, max_entries=configs.EVENT_CACHE_MAX_ENTRIES,
+        max_bytes=configs.EVENT_CACHE_MAX_BYTES)
+
+    event_cache = providers.Singleton(
+        ResponseCache, backend=cache_backend, ttl=configs.EVENT_CACHE_TTL,
+        enabled=configs.EVENT_CACHE_ENABLED)
+
+    # the tickets remaining, summed over sharded counters, for listings
+    availability_cache_backend = providers.Singleton(
+        MemoryCacheBackend,
+        max_entries=configs.TICKET_AVAILABILITY_CACHE_MAX_ENTRIES,
+        max_bytes=configs.TICKET_AVAILABILITY_CACHE_MAX_BYTES)
+
+    availability_cache = providers.Singleton(
+        ResponseCache, backend=availability_cache_backend,
+        ttl=configs.TICKET_AVAILABILITY_CACHE_TTL)
+
+    admission = providers.Singleton(
+        AdmissionController, rate=configs.ADMISSION_RATE,
+        burst=configs.ADMISSION_BURST, max_depth=configs.ADMISSION_MAX_DEPTH,
+        token_ttl=configs.ADMISSION_TOKEN_TTL,
+        enabled=configs.ADMISSION_ENABLED)
+
+    password_hasher = providers.Singleton(
+        PasswordHasher, workers=configs.PASSWORD_HASH_WORKERS,
+        max_pending=configs.PASSWORD_HASH_MAX_PENDING)
+
+    principal_cache = providers.Singleton(
+        PrincipalCache, maxsize=configs.AUTH_USER_CACHE_SIZE,
+        ttl=configs.AUTH_USER_CACHE_TTL,
+        enabled=configs.AUTH_USER_CACHE_ENABLED)
+
+    # a shared backend lets the callback of a login reach another worker
+    oauth_state_backend = providers.Singleton(
+        MemoryCacheBackend, max_entries=configs.GOOGLE_OAUTH_STATE_MAX_ENTRIES,
+        max_bytes=configs.GOOGLE_OAUTH_STATE_MAX_BYTES)
+
+    oauth_states = providers.Singleton(
+        OAuthStateStore, backend=oauth_state_backend,
+        ttl=configs.GOOGLE_OAUTH_STATE_TTL)
 
     user_repository = providers.Factory(
-        UserRepository, session_factory=db.provided.session)
+        UserRepository, session_factory=db.provided.session,
+        async_session_factory=db.provided.async_session,
+        read_session_factory=db.provided.read_session,
+        async_read_session_factory=db.provided.async_read_session)
 
-    # async_user_repository = providers.Factory(
-    #     UserRepository, session_factory=async_db.provided.session)
+    category_repository = providers.Factory(
+        CategoryRepository, session_factory=db.provided.session,
+        async_session_factory=db.provided.async_session,
+        read_session_factory=db.provided.read_session,
+        async_read_session_factory=db.provided.async_read_session)
 
-    category_repository = providers.Factory(CategoryRepository,
-                                            session_factory=db.provided.session)
+    event_repository = providers.Factory(
+        EventRepository, session_factory=db.provided.session,
+        async_session_factory=db.provided.async_session,
+        read_session_factory=db.provided.read_session,
+        async_read_session_factory=db.provided.async_read_session)
 
-    event_repository = providers.Factory(EventRepository,
-                                         session_factory=db.provided.session)
+    ticket_repository = providers.Factory(
+        TicketRepository, session_factory=db.provided.session,
+        async_session_factory=db.provided.async_session,
+        read_session_factory=db.provided.read_session,
+        async_read_session_factory=db.provided.async_read_session)
 
     auth_service = providers.Factory(
-        AuthService, user_repository=user_repository)
+        AuthService, user_repository=user_repository,
+        password_hasher=password_hasher)
 
     user_service = providers.Factory(
-        UserService, user_repository=user_repository)
+        UserService, user_repository=user_repository, cache=event_cache,
+        principal_cache=principal_cache)
 
     category_service = providers.Factory(CategoryService,
                                          category_repository=category_repository)
 
     event_service = providers.Factory(
-        EventService, event_repository=event_repository)
+        EventService, event_repository=event_repository, cache=event_cache)
+
+    ticket_service = providers.Factory(
+        TicketService, ticket_repository=ticket_repository,
+        cache=availability_cache)
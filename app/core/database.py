@@ -3,15 +3,26 @@
 # Author: Oluwatobiloba Light
 """Database"""
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import itertools
 import os
 from pathlib import Path
-from typing import Any, AsyncGenerator, Generator, Optional, Union
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, \
+    Union
 
 from prisma import Prisma
-from sqlalchemy import create_engine, orm
+from sqlalchemy import create_engine, event, make_url, orm
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, \
+    async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.pool_metrics import InstrumentedAsyncQueuePool, \
+    InstrumentedQueuePool
 
 
 Base = declarative_base()
@@ -28,11 +39,67 @@ Base = declarative_base()
 #         return cls.__name__.lower()
 
 
+REPLICA_STRATEGIES = ("round_robin", "least_connections")
+
+
+class ReadYourWrites:
+    """Until when the reads of the current request go to the primary"""
+
+    def __init__(self, primary_until: float = 0.0) -> None:
+        self.primary_until = primary_until
+        self.written = False
+
+
+_read_your_writes: ContextVar[Optional[ReadYourWrites]] = ContextVar(
+    "read_your_writes", default=None)
+
+
+def read_your_writes_state() -> ReadYourWrites:
+    state = _read_your_writes.get()
+
+    if state is None:
+        state = ReadYourWrites()
+        _read_your_writes.set(state)
+
+    return state
+
+
+@contextmanager
+def read_your_writes_scope(primary_until: float = 0.0) \
+        -> Generator[ReadYourWrites, None, None]:
+    """Tracks the writes of a request, e.g from a cookie of a previous one"""
+    token = _read_your_writes.set(ReadYourWrites(primary_until))
+
+    try:
+        yield _read_your_writes.get()
+    finally:
+        _read_your_writes.reset(token)
+
+
 class Database:
     # _client: Optional[Prisma] = None
 
-    def __init__(self, db_url: str) -> None:
-        self._engine = create_engine(db_url, echo=False)
+    def __init__(self, db_url: str,
+                 async_db_url: Optional[str] = None,
+                 pool_size: int = 5,
+                 max_overflow: int = 10,
+                 pool_timeout: float = 30,
+                 pool_recycle: int = -1,
+                 pool_pre_ping: bool = False,
+                 replica_urls: Optional[List[str]] = None,
+                 replica_strategy: str = "round_robin",
+                 read_your_writes_seconds: float = 5.0,
+                 async_replica_urls: Optional[List[str]] = None) -> None:
+        pool_options = dict(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+
+        self._engine = create_engine(
+            db_url, echo=False, **self._pool_options(db_url, pool_options))
 
         self._session_factory = orm.scoped_session(
             orm.sessionmaker(
@@ -42,6 +109,104 @@ class Database:
             ),
         )
 
+        if replica_strategy not in REPLICA_STRATEGIES:
+            raise ValueError(f"Invalid replica strategy : {replica_strategy}")
+
+        self._replica_engines = [
+            create_engine(url, echo=False,
+                          **self._pool_options(url, pool_options))
+            for url in replica_urls or []]
+
+        self._replica_session_factories = [
+            orm.sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            for engine in self._replica_engines]
+
+        self._replica_strategy = replica_strategy
+        self._replica_cycle = itertools.count()
+        self._replica_lock = threading.Lock()
+
+        self._read_your_writes_seconds = read_your_writes_seconds
+
+        if self._replica_engines:
+            event.listen(self._engine, "commit", self._on_primary_commit)
+
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory: Optional[
+            async_sessionmaker[AsyncSession]] = None
+        self._async_replica_engines: List[AsyncEngine] = []
+        self._async_replica_session_factories: List[
+            async_sessionmaker[AsyncSession]] = []
+
+        if async_db_url:
+            self._async_engine = create_async_engine(
+                async_db_url, echo=False,
+                **self._pool_options(async_db_url, pool_options))
+
+            # objects are used after the session closes, and lazy loading
+            # is not possible on an AsyncSession, so do not expire on commit
+            self._async_session_factory = async_sessionmaker(
+                autoflush=False,
+                expire_on_commit=False,
+                bind=self._async_engine,
+            )
+
+            self._async_replica_engines = [
+                create_async_engine(url, echo=False,
+                                    **self._pool_options(url, pool_options))
+                for url in async_replica_urls or []]
+
+            self._async_replica_session_factories = [
+                async_sessionmaker(autoflush=False, expire_on_commit=False,
+                                   bind=engine)
+                for engine in self._async_replica_engines]
+
+            if self._async_replica_engines:
+                # the async engine runs on a sync engine, in the context of
+                # the request awaiting it
+                event.listen(self._async_engine.sync_engine, "commit",
+                             self._on_primary_commit)
+
+    @staticmethod
+    def _pool_options(db_url: str, pool_options: Dict[str, Any]) \
+            -> Dict[str, Any]:
+        """
+        Instruments the dialect's queue pool; dialects pooling otherwise
+        (e.g aiosqlite's NullPool) keep their default pool
+        """
+        url = make_url(db_url)
+
+        pool_class = url.get_dialect().get_pool_class(url)
+
+        if issubclass(pool_class, AsyncAdaptedQueuePool):
+            return {"poolclass": InstrumentedAsyncQueuePool, **pool_options}
+        if issubclass(pool_class, QueuePool):
+            return {"poolclass": InstrumentedQueuePool, **pool_options}
+        return {"pool_pre_ping": pool_options["pool_pre_ping"]}
+
+    @staticmethod
+    def _engine_pool_stats(pool) -> Dict[str, Any]:
+        if hasattr(pool, "stats"):
+            return pool.stats()
+        return {"status": pool.status()}
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Live pool state and checkout/connect metrics of each engine"""
+        stats = {"sync": self._engine_pool_stats(self._engine.pool)}
+
+        if self._replica_engines:
+            stats["replicas"] = [self._engine_pool_stats(engine.pool)
+                                 for engine in self._replica_engines]
+
+        if self._async_engine is not None:
+            stats["async"] = self._engine_pool_stats(self._async_engine.pool)
+
+        if self._async_replica_engines:
+            stats["async_replicas"] = [
+                self._engine_pool_stats(engine.pool)
+                for engine in self._async_replica_engines]
+
+        return stats
+
     def create_database(self) -> None:
         Base.metadata.create_all(self._engine)
 
@@ -56,3 +221,83 @@ class Database:
             raise
         finally:
             session.close()
+
+    def _on_primary_commit(self, connection) -> None:
+        # replicas may lag behind the primary, so the writer's reads stay
+        # on the primary for a while
+        state = read_your_writes_state()
+
+        state.primary_until = time.time() + self._read_your_writes_seconds
+        state.written = True
+
+    def _pick_replica(self, engines: list) -> int:
+        if self._replica_strategy == "least_connections":
+            return min(
+                range(len(engines)),
+                key=lambda index: getattr(
+                    engines[index].pool, "checkedout", lambda: 0)())
+
+        with self._replica_lock:
+            return next(self._replica_cycle) % len(engines)
+
+    def _reads_on_primary(self, replicas: list) -> bool:
+        return not replicas or \
+            time.time() < read_your_writes_state().primary_until
+
+    @contextmanager
+    def read_session(self) -> Generator[Session, None, None]:
+        """
+        Session for read only queries, on a replica unless there are none or
+        the current request wrote recently
+        """
+        if self._reads_on_primary(self._replica_session_factories):
+            with self.session() as session:
+                yield session
+            return
+
+        session: Session = self._replica_session_factories[
+            self._pick_replica(self._replica_engines)]()
+
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @asynccontextmanager
+    async def async_session(self) -> AsyncGenerator[AsyncSession, None]:
+        if self._async_session_factory is None:
+            raise RuntimeError("Async database mode is not enabled")
+
+        session: AsyncSession = self._async_session_factory()
+
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    @asynccontextmanager
+    async def async_read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """The async counterpart of `read_session`"""
+        if self._reads_on_primary(self._async_replica_session_factories):
+            async with self.async_session() as session:
+                yield session
+            return
+
+        session: AsyncSession = self._async_replica_session_factories[
+            self._pick_replica(
+                [engine.sync_engine for engine in
+                 self._async_replica_engines])]()
+
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
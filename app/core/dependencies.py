@@ -4,16 +4,16 @@
 """Dependencies"""
 
 
-from typing import Optional
+from typing import Iterator, Optional
+from uuid import UUID
 from dependency_injector.wiring import Provide, inject
-from fastapi import Depends
-from jose import jwt, JWTError
+from fastapi import Depends, Request
 from pydantic import ValidationError
 
-from app.core.config import configs
+from app.core.admission import QUEUE_TOKEN_HEADER, AdmissionController
 from app.core.container import Container
-from app.core.exceptions import AuthError
-from app.core.security import ALGORITHM, JWTBearer
+from app.core.exceptions import AuthError, TooManyRequestsError
+from app.core.security import JWTBearer, verified_claims
 from app.model.user import User
 from app.schema.auth_schema import Payload
 from app.services.user_service import UserService
@@ -21,20 +21,34 @@ from app.services.user_service import UserService
 
 @inject
 def get_current_user(
+    request: Request,
     token: str = Depends(JWTBearer()),
     service: UserService = Depends(Provide[Container.user_service]),
 ) -> User:
+    payload = verified_claims(request, token)
+
     try:
-        payload = jwt.decode(token, configs.SECRET_KEY, algorithms=ALGORITHM)
         token_data = Payload(**payload)
-    except (JWTError, ValidationError):
+    except ValidationError:
         raise AuthError(detail="Could not validate credentials")
-    current_user: User = service.get_by_id(token_data.id)
+    current_user: User = service.get_principal(
+        token_data.id, payload.get("exp"))
     if not current_user:
         raise AuthError(detail="User not found")
     return current_user
 
 
+def get_token_payload(
+    request: Request,
+    token: str = Depends(JWTBearer()),
+) -> Payload:
+    """The verified claims of the caller's token, without loading the user"""
+    try:
+        return Payload(**verified_claims(request, token))
+    except ValidationError:
+        raise AuthError(detail="Could not validate credentials")
+
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
         raise AuthError("Inactive user")
@@ -42,15 +56,18 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
 
 
 def get_current_user_with_no_exception(
+    request: Request,
     token: str = Depends(JWTBearer()),
     service: UserService = Depends(Provide[Container.user_service]),
 ) -> Optional[User]:
+    payload = verified_claims(request, token)
+
     try:
-        payload = jwt.decode(token, configs.SECRET_KEY, algorithms=ALGORITHM)
         token_data = Payload(**payload)
-    except (JWTError, ValidationError):
+    except ValidationError:
         return None
-    current_user: User = service.get_by_id(token_data.id)
+    current_user: User = service.get_principal(
+        token_data.id, payload.get("exp"))
     if not current_user:
         return None
     return current_user
@@ -62,3 +79,44 @@ def get_current_super_user(current_user: User = Depends(get_current_user)) -> Us
     if not current_user.is_admin:
         raise AuthError("User is not an admin!")
     return current_user
+
+
+@inject
+def get_admission(
+    admission: AdmissionController = Depends(Provide[Container.admission]),
+) -> AdmissionController:
+    return admission
+
+
+# not wrapped by @inject, whose wrapper FastAPI does not see as a generator
+def require_admission(
+    event_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    admission: AdmissionController = Depends(get_admission),
+) -> Iterator[None]:
+    """
+    Lets the buyers of an event through its waiting room. Those not
+    admitted yet get their place in the queue, to poll with its token. An
+    admission is used up by the purchase it lets through, unless the
+    purchase fails.
+    """
+    if not admission.enabled:
+        yield
+        return
+
+    status = admission.admit(event_id, current_user.id,
+                             request.headers.get(QUEUE_TOKEN_HEADER),
+                             use=True)
+
+    if not status["admitted"]:
+        raise TooManyRequestsError(
+            detail=status,
+            headers={"Retry-After": str(max(status["retry_after"], 1)),
+                     QUEUE_TOKEN_HEADER: status["token"]})
+
+    try:
+        yield
+    except Exception:
+        admission.release(event_id, status["position"])
+        raise
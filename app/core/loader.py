@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# File: loader.py
+# Author: Oluwatobiloba Light
+"""Request scoped entity loader"""
+
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+from typing import Any, Callable, Dict, Generator, Iterable, List, \
+    Optional, Tuple
+
+
+class EntityLoader:
+    """
+    Identity map of the entities a request has loaded. The ids missing from
+    a load are fetched in one query and ids already loaded are not queried
+    again, so a request reads each entity once. The entities are shared by
+    everything the request touches.
+    """
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.hits = 0
+        self._entities: Dict[Tuple[type, str], Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model: type, id: Any) -> Tuple[type, str]:
+        # ids arrive both as UUIDs and as strings
+        return model, str(id)
+
+    def prime(self, *entities: Any) -> None:
+        with self._lock:
+            for entity in entities:
+                if entity is not None:
+                    self._entities[self._key(type(entity), entity.id)] = \
+                        entity
+
+    def evict(self, model: type, *ids: Any) -> None:
+        with self._lock:
+            for id in ids:
+                self._entities.pop(self._key(model, id), None)
+
+    def load_many(self, model: type, ids: Iterable[Any],
+                  fetch: Callable[[list], Iterable[Any]]) -> List[Any]:
+        """
+        Returns the entities of the ids that exist, in the order of the ids,
+        fetching the ones not loaded yet at once
+        """
+        ids = list(ids)
+
+        with self._lock:
+            missing = [id for id in dict.fromkeys(ids)
+                       if self._key(model, id) not in self._entities]
+
+            self.hits += len(ids) - len(missing)
+
+            if missing:
+                self.queries += 1
+
+        if missing:
+            self.prime(*fetch(missing))
+
+        with self._lock:
+            founds = (self._entities.get(self._key(model, id)) for id in ids)
+
+            return [found for found in founds if found is not None]
+
+    def load(self, model: type, id: Any,
+             fetch: Callable[[list], Iterable[Any]]) -> Optional[Any]:
+        founds = self.load_many(model, [id], fetch)
+
+        return founds[0] if founds else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entities": len(self._entities), "queries": self.queries,
+                    "hits": self.hits}
+
+
+_entity_loader: ContextVar[Optional[EntityLoader]] = ContextVar(
+    "entity_loader", default=None)
+
+
+def entity_loader() -> Optional[EntityLoader]:
+    """The loader of the current request, if any"""
+    return _entity_loader.get()
+
+
+@contextmanager
+def entity_loader_scope() -> Generator[EntityLoader, None, None]:
+    token = _entity_loader.set(EntityLoader())
+
+    try:
+        yield _entity_loader.get()
+    finally:
+        _entity_loader.reset(token)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# File: middleware.py
+# Author: Oluwatobiloba Light
+"""Middlewares of the app"""
+
+
+import hashlib
+import hmac
+import math
+import time
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+from app.core.database import read_your_writes_scope
+
+
+READ_YOUR_WRITES_COOKIE = "db_primary_until"
+
+
+def _signature(primary_until: str, secret: str) -> str:
+    return hmac.new(secret.encode(), b"read-your-writes:" +
+                    primary_until.encode(), hashlib.sha256).hexdigest()
+
+
+def sign_primary_until(primary_until: float, secret: str) -> str:
+    value = repr(primary_until)
+
+    return f"{value}.{_signature(value, secret)}"
+
+
+def parse_primary_until(cookie: Optional[str], secret: str,
+                        seconds: float) -> float:
+    """
+    Returns until when a client's reads go to the primary. A cookie that is
+    not ours or does not parse counts as 0, and none keeps a client on the
+    primary for longer than a write would
+    """
+    if not cookie:
+        return 0.0
+
+    value, _, signature = cookie.rpartition(".")
+
+    if not hmac.compare_digest(signature, _signature(value, secret)):
+        return 0.0
+
+    try:
+        primary_until = float(value)
+    except ValueError:
+        return 0.0
+
+    if math.isnan(primary_until):
+        return 0.0
+
+    return min(primary_until, time.time() + seconds)
+
+
+def read_your_writes_middleware(secret: str, seconds: float) \
+        -> Callable[[Request, Callable[[Request], Awaitable[Response]]],
+                    Awaitable[Response]]:
+    """
+    Keeps a client's reads on the primary for `seconds` after its writes,
+    across requests, as the replicas may lag behind
+    """
+    async def read_your_writes(request: Request, call_next) -> Response:
+        primary_until = parse_primary_until(
+            request.cookies.get(READ_YOUR_WRITES_COOKIE), secret, seconds)
+
+        with read_your_writes_scope(primary_until) as state:
+            response = await call_next(request)
+
+        if state.written:
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                sign_primary_until(state.primary_until, secret),
+                max_age=math.ceil(seconds), httponly=True)
+
+        return response
+
+    return read_your_writes
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# File: password_hasher.py
+# Author: Oluwatobiloba Light
+"""Password hashing off the event loop"""
+
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.exceptions import ServiceUnavailableError
+from app.util.password import hash_password, verify_and_update, \
+    verify_password
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a process pool, so hashing neither blocks the event loop
+    nor holds the GIL of the serving process. Work beyond `max_pending`
+    jobs is refused rather than queued behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # started on first use; spawned workers only import what hashing
+        # needs, not the forked state of the server
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"))
+
+            return self._executor
+
+    async def _run(self, function: Callable, *args: Any) -> Any:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+
+                raise ServiceUnavailableError(
+                    detail="Too many sign in requests, try again shortly",
+                    headers={"Retry-After": "1"})
+
+            self.pending += 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._pool(), function, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password,
+                               hashed_password)
+
+    async def verify_and_update(self, plain_password: str,
+                                hashed_password: str) \
+            -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update, plain_password,
+                               hashed_password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"workers": self.workers, "pending": self.pending,
+                    "max_pending": self.max_pending,
+                    "rejected": self.rejected,
+                    "started": self._executor is not None}
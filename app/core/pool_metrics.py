@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# File: pool_metrics.py
+# Author: Oluwatobiloba Light
+"""Connection pool metrics"""
+
+
+import threading
+import time
+from typing import Dict, Sequence
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+# seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative latency histogram, in the style of prometheus"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict:
+        cumulative = 0
+        buckets = {}
+
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "buckets": buckets,
+        }
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.wait_time = Histogram()
+        self.connect_time = Histogram()
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+            self.wait_time.observe(seconds)
+
+    def observe_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.connects += 1
+            self.connect_time.observe(seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "wait_time": self.wait_time.snapshot(),
+                "connect_time": self.connect_time.snapshot(),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """
+    Times how long a checkout waits for a connection, which includes
+    connecting when the pool opens a new one, and how long connecting takes
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.metrics.observe_checkout(
+                time.perf_counter() - start, timed_out)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+
+        try:
+            return super()._create_connection()
+        finally:
+            self.metrics.observe_connect(time.perf_counter() - start)
+
+    def stats(self) -> Dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            # overflow() counts up from -pool_size
+            "overflow": max(self.overflow(), 0),
+            "timeout": self.timeout(),
+            **self.metrics.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin,
+                                 AsyncAdaptedQueuePool):
+    pass
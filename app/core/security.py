@@ -5,18 +5,27 @@
 
 
 from datetime import datetime, timedelta, timezone
+import hashlib
+import threading
+import time
 from typing import Optional, Tuple
+from cachetools import TLRUCache
 from fastapi import Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
-from passlib.context import CryptContext
 from app.core.config import configs
 from app.core.exceptions import AuthError
+from app.util.password import hash_password, verify_password
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = "HS256"
 
+# claims of tokens already verified, by token hash, until the token expires
+_verified_tokens: TLRUCache = TLRUCache(
+    maxsize=configs.VERIFIED_TOKEN_CACHE_SIZE,
+    ttu=lambda key, claims, now: claims["exp"], timer=time.time)
+_verified_tokens_lock = threading.Lock()
+
 
 def create_access_token(subject: dict, expires_delta:
                         Optional[timedelta] = None) -> Tuple[str, str]:
@@ -45,15 +54,36 @@ def create_access_token(subject: dict, expires_delta:
     return encoded_jwt, expiration_datetime
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def get_password_hash(password: str) -> str:
+    return hash_password(password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def _token_key(token: str) -> str:
+    # keyed by the secret too, rotating it revokes the verified tokens
+    return hashlib.sha256(
+        f"{configs.SECRET_KEY}:{token}".encode()).hexdigest()
 
 
 def decode_jwt(token: str) -> dict:
+    """The claims of a valid token, or an empty dict"""
+    key = _token_key(token)
+
+    with _verified_tokens_lock:
+        claims = _verified_tokens.get(key)
+
+    if claims is not None:
+        return dict(claims)
+
+    claims = _decode_jwt(token)
+
+    if claims:
+        with _verified_tokens_lock:
+            _verified_tokens[key] = claims
+
+    return dict(claims)
+
+
+def _decode_jwt(token: str) -> dict:
     try:
         decoded_token = jwt.decode(
             token, configs.SECRET_KEY, algorithms=ALGORITHM)
@@ -70,6 +100,20 @@ def decode_jwt(token: str) -> dict:
         return {}
 
 
+def verified_claims(request: Request, token: str) -> dict:
+    """
+    The claims of the request's token, verified once per request and kept
+    on its state for the dependencies that need them
+    """
+    state = request.state
+
+    if getattr(state, "token", None) != token:
+        state.token = token
+        state.token_claims = decode_jwt(token)
+
+    return state.token_claims
+
+
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True):
         super(JWTBearer, self).__init__(auto_error=auto_error)
@@ -82,7 +126,7 @@ class JWTBearer(HTTPBearer):
             if not credentials.scheme == "Bearer":
                 raise AuthError(detail="Invalid authentication scheme.")
 
-            if not self.verify_jwt(credentials.credentials):
+            if not verified_claims(request, credentials.credentials):
                 raise AuthError(detail="Invalid token or expired token.")
 
             return credentials.credentials
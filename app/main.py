@@ -85,13 +85,16 @@
 #         "detail": "Validation error", "errors": errors})
 
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.routes import routers as v1_routers
 # from app.api.routes import routers as v2_routers
 from app.core.config import configs
 from app.core.container import Container
+from app.core.loader import entity_loader_scope
+from app.core.middleware import read_your_writes_middleware
 from app.util.class_object import singleton
 from starlette.middleware.sessions import SessionMiddleware
 
@@ -104,7 +107,8 @@ class AppCreator:
             title=configs.PROJECT_NAME,
             # openapi_url=f"{configs.API}/openapi.json",
             version="0.0.1",
-            description="Event Ticketing Server"
+            description="Event Ticketing Server",
+            default_response_class=ORJSONResponse
         )
 
         # self.app.add_middleware(
@@ -127,6 +131,19 @@ class AppCreator:
                 allow_headers=["*"],
             )
 
+        # the entities a request loads are read once and shared by
+        # everything the request touches
+        @self.app.middleware("http")
+        async def entity_loader(request: Request, call_next):
+            with entity_loader_scope():
+                return await call_next(request)
+
+        # keep a client's reads on the primary for a while after its writes,
+        # across requests, as the replicas may lag behind
+        if configs.REPLICA_DATABASE_URIS:
+            self.app.middleware("http")(read_your_writes_middleware(
+                configs.SECRET_KEY, configs.DB_READ_YOUR_WRITES_SECONDS))
+
         # set routes
         @self.app.get("/")
         def root():
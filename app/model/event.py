@@ -12,8 +12,9 @@ from app.core.database import Base
 from app.schema.user_schema import User
 from app.util.date import format_time_with_am_pm
 from typing import Dict, List, Optional, Tuple
-from sqlalchemy import ARRAY, JSON, Column, Date, DateTime, ForeignKey, String, Uuid, func, \
-    Enum
+from sqlalchemy import ARRAY, DDL, JSON, Column, Date, DateTime, ForeignKey, Index, Integer, String, \
+    Uuid, func, Enum
+from sqlalchemy.event import listen
 from app.model.base_model import BaseModel
 from sqlalchemy.orm import relationship
 from datetime import date as dt, datetime, time
@@ -48,14 +49,17 @@ class EventCategory(BaseModel, table=True):
 event_categories = Table(
     "event_categories",
     SQLModel.metadata,
-    Column("event_id", Uuid, ForeignKey("events.id"), primary_key=True),
+    Column("event_id", Uuid, ForeignKey("events.id", ondelete="CASCADE"),
+           primary_key=True),
     Column("category_id", Uuid, ForeignKey(
-        "categories.id"), primary_key=True)
+        "categories.id"), primary_key=True),
+    Index("ix_event_categories_category_id", "category_id"),
 )
 
 
 class Event(BaseModel, table=True):
     __tablename__: str = 'events'
+    __table_args__ = (Index("ix_events_created_at", "created_at"),)
 
     name: str = Field(sa_column=Column(
         String(255), default=None, nullable=False))
@@ -70,7 +74,7 @@ class Event(BaseModel, table=True):
         sa_column=Column(String(2048), default=None, nullable=False))
 
     date: dt = Field(sa_column=Column(
-        Date, default=dt.today(), nullable=False))
+        Date, default=dt.today(), nullable=False, index=True))
 
     location: str = Field(sa_column=Column(
         String(255), default=None, nullable=False))
@@ -81,10 +85,15 @@ class Event(BaseModel, table=True):
     evt_type: EventType = Field(default=EventType.public, nullable=False)
 
     owner_id: Optional[UUID] = Field(
-        sa_column=Column(Uuid, ForeignKey('users.id')))
+        sa_column=Column(Uuid, ForeignKey('users.id', ondelete="CASCADE"),
+                         index=True))
 
     owner: Optional['User'] = Relationship(back_populates="events")
 
+    # how many counters the availability of each ticket type is split over
+    ticket_shards: int = Field(sa_column=Column(
+        Integer, nullable=False, default=1, server_default="1"))
+
     @property
     def formatted_start_time(self) -> Optional[str]:
         """
@@ -98,3 +107,54 @@ class Event(BaseModel, table=True):
         This property returns the end_time with AM/PM format.
         """
         return format_time_with_am_pm(self.end_time)
+
+
+# full-text search over name, location and description. Postgres keeps a
+# generated tsvector column with a GIN index, plus trigram indexes for
+# substring matches; SQLite keeps an FTS5 shadow table in sync with triggers
+EVENT_SEARCH_DDL: Dict[str, List[str]] = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+        ") STORED",
+        "CREATE INDEX IF NOT EXISTS ix_events_search_vector "
+        "ON events USING gin (search_vector)",
+        "CREATE INDEX IF NOT EXISTS ix_events_name_trgm "
+        "ON events USING gin (name gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_events_location_trgm "
+        "ON events USING gin (location gin_trgm_ops)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+        "name, location, description, content='events', "
+        "content_rowid='rowid')",
+        "CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events "
+        "BEGIN "
+        "INSERT INTO events_fts(rowid, name, location, description) "
+        "VALUES (new.rowid, new.name, new.location, new.description); "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events "
+        "BEGIN "
+        "INSERT INTO events_fts(events_fts, rowid, name, location, "
+        "description) VALUES ('delete', old.rowid, old.name, old.location, "
+        "old.description); "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE ON events "
+        "BEGIN "
+        "INSERT INTO events_fts(events_fts, rowid, name, location, "
+        "description) VALUES ('delete', old.rowid, old.name, old.location, "
+        "old.description); "
+        "INSERT INTO events_fts(rowid, name, location, description) "
+        "VALUES (new.rowid, new.name, new.location, new.description); "
+        "END",
+    ],
+}
+
+for dialect_name, statements in EVENT_SEARCH_DDL.items():
+    for statement in statements:
+        listen(Event.__table__, "after_create",
+               DDL(statement).execute_if(dialect=dialect_name))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# File: ticket.py
+# Author: Oluwatobiloba Light
+"""Ticket Model"""
+
+
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import CheckConstraint, Column, ForeignKey, Integer, \
+    Numeric, String, Uuid
+from sqlmodel import Field, SQLModel, Table
+
+from app.model.base_model import BaseModel
+
+
+class TicketType(BaseModel, table=True):
+    __tablename__: str = "ticket_types"
+    # the constraint backs the conditional decrement, a hold can never take
+    # the remaining tickets below zero. On an event with sharded counters
+    # the tickets are in `ticket_type_shards` and `remaining` only holds
+    # the tickets given back since the counters were last split
+    __table_args__ = (
+        CheckConstraint("remaining >= 0 AND remaining <= capacity",
+                        name="ck_ticket_types_remaining"),
+        CheckConstraint("max_per_order > 0",
+                        name="ck_ticket_types_max_per_order"),
+    )
+
+    event_id: UUID = Field(sa_column=Column(
+        Uuid, ForeignKey("events.id", ondelete="CASCADE"), nullable=False,
+        index=True))
+
+    name: str = Field(sa_column=Column(String(100), nullable=False))
+
+    price: Decimal = Field(sa_column=Column(
+        Numeric(10, 2), nullable=False, default=0))
+
+    capacity: int = Field(sa_column=Column(Integer, nullable=False))
+
+    remaining: int = Field(sa_column=Column(Integer, nullable=False))
+
+    max_per_order: int = Field(sa_column=Column(
+        Integer, nullable=False, default=10))
+
+
+class Reservation(BaseModel, table=True):
+    __tablename__: str = "reservations"
+    __table_args__ = (
+        CheckConstraint("quantity > 0", name="ck_reservations_quantity"),
+    )
+
+    ticket_type_id: UUID = Field(sa_column=Column(
+        Uuid, ForeignKey("ticket_types.id", ondelete="CASCADE"),
+        nullable=False, index=True))
+
+    event_id: UUID = Field(sa_column=Column(
+        Uuid, ForeignKey("events.id", ondelete="CASCADE"), nullable=False,
+        index=True))
+
+    user_id: UUID = Field(sa_column=Column(
+        Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False,
+        index=True))
+
+    quantity: int = Field(sa_column=Column(Integer, nullable=False))
+
+    # the counter the tickets were taken from, to give them back to
+    shard: Optional[int] = Field(sa_column=Column(Integer, nullable=True))
+
+
+# the sub-counters of a ticket type on an event with sharded counters; its
+# availability is their sum
+ticket_type_shards = Table(
+    "ticket_type_shards",
+    SQLModel.metadata,
+    Column("ticket_type_id", Uuid,
+           ForeignKey("ticket_types.id", ondelete="CASCADE"),
+           primary_key=True),
+    Column("shard", Integer, primary_key=True, autoincrement=False),
+    Column("remaining", Integer, nullable=False),
+    CheckConstraint("remaining >= 0", name="ck_ticket_type_shards_remaining"),
+)
@@ -6,8 +6,9 @@
 
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import Boolean, Column, String, text
+from sqlalchemy import Boolean, Column, Index, String, delete, func, select
 from app.model.base_model import BaseModel
+from app.model.event import Event as EventModel, event_categories
 from sqlalchemy.orm import relationship, Session
 from sqlmodel import Field, Relationship
 
@@ -32,17 +33,42 @@ class User(BaseModel, table=True):
     is_active: bool = Field(sa_column=Column(Boolean, default=True))
     is_admin: bool = Field(sa_column=Column(Boolean, default=False))
 
-    events: Optional[List["Event"]] = Relationship(back_populates="owner")
+    # events are deleted in bulk, or by the ON DELETE CASCADE of owner_id,
+    # so deleting a user does not load its events
+    events: Optional[List["Event"]] = Relationship(
+        back_populates="owner",
+        sa_relationship_kwargs={"passive_deletes": True})
 
     @classmethod
-    def delete_user_events(cls, session: Session, user_id):
-        """"""
-        events = session.execute(
-            text("SELECT * FROM events WHERE owner_id = '{}'"
-                 .format(str(user_id)))).fetchall()
-
-        for event in events:
-            session.execute(
-                text("DELETE FROM event_categories WHERE event_id = '{}'".format(str(event.id))))
-            session.execute(
-                text("DELETE FROM events WHERE id = '{}'".format(str(event.id))))
+    def delete_user_events(cls, session: Session, user_id,
+                           limit: Optional[int] = None) -> int:
+        """
+        Deletes the user's events with their category links, at most
+        `limit` of them, and returns how many were deleted
+        """
+        owner = EventModel.owner_id == UUID(str(user_id))
+
+        if limit is not None:
+            event_ids = session.scalars(
+                select(EventModel.id).filter(owner).limit(limit)).all()
+
+            criteria = EventModel.id.in_(event_ids)
+        else:
+            # MySQL refuses a DELETE reading its own table in a subquery,
+            # the events go by their owner and only the links by the
+            # events' subquery
+            event_ids = select(EventModel.id).filter(owner)
+
+            criteria = owner
+
+        session.execute(delete(event_categories).filter(
+            event_categories.c.event_id.in_(event_ids)))
+
+        return session.execute(
+            delete(EventModel).filter(criteria)
+            .execution_options(synchronize_session=False)).rowcount
+
+# emails are stored lower cased, and looked up by lower(email) so the
+# addresses stored before they were still match
+Index("uq_users_email_lower", func.lower(User.__table__.c.email),
+      unique=True)
@@ -4,82 +4,487 @@
 """Base Repository"""
 
 
-from contextlib import AbstractContextManager
-from typing import Callable
-from uuid import UUID
-
+import math
+import threading
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from typing import Callable, Iterator, List, Optional
+from uuid import UUID, uuid4
+
+from cachetools import TTLCache
+from sqlalchemy import bindparam, delete, func, insert, select, text, \
+    tuple_, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.core.config import configs
-from app.core.exceptions import DuplicatedError, NotFoundError
-from app.util.query_builder import dict_to_sqlalchemy_filter_options
+from app.core.exceptions import DuplicatedError, NotFoundError, \
+    ValidationError
+from app.core.loader import entity_loader
+from app.util.cursor import decode_cursor, encode_cursor, parse_cursor_value
+from app.util.query_builder import StatementCache, build_filter_options, \
+    parse_filter_options
+
+
+COUNT_STRATEGIES = ("exact", "estimated", "cached", "skip")
+
+# total counts shared by every repository instance, keyed by the filter
+# shape and its parameters
+_count_cache: TTLCache = TTLCache(maxsize=configs.COUNT_CACHE_MAXSIZE,
+                                  ttl=configs.COUNT_CACHE_TTL)
+_count_cache_lock = threading.Lock()
+
+# list statements shared by every repository instance, keyed by their shape
+statement_cache = StatementCache(maxsize=configs.STATEMENT_CACHE_SIZE)
 
 
 class BaseRepository:
     def __init__(self, session_factory:
-                 Callable[[], Session], model) -> None:
+                 Callable[[], AbstractContextManager[Session]], model,
+                 async_session_factory: Optional[
+                     Callable[[], AbstractAsyncContextManager[AsyncSession]]]
+                 = None,
+                 read_session_factory: Optional[
+                     Callable[[], AbstractContextManager[Session]]]
+                 = None,
+                 async_read_session_factory: Optional[
+                     Callable[[], AbstractAsyncContextManager[AsyncSession]]]
+                 = None) -> None:
         self.session_factory = session_factory
+        # read only queries may go to a replica
+        self.read_session_factory = read_session_factory or session_factory
+        self.async_session_factory = async_session_factory
+        self.async_read_session_factory = async_read_session_factory or \
+            async_session_factory
         self.model = model
 
-    def read_by_options(self, schema, eager=False):
-        with self.session_factory() as session:
-            # if schema and schema.model_dump():
-            schema_as_dict = schema.dict(
-                exclude_none=True) if schema and schema.model_dump() else {}
+    def _loader_options(self, eager=False) -> list:
+        """Returns the relationship loader options for a query"""
+        if not eager:
+            return []
 
-            ordering = schema_as_dict.get("ordering", configs.ORDERING)
+        return [joinedload(getattr(self.model, eager))
+                for eager in getattr(self.model, "eagers", [])]
 
-            order_query = (
-                getattr(self.model, ordering[1:]).desc()
-                if ordering.startswith("-")
-                else getattr(self.model, ordering).asc()
-            )
+    def _related_entities(self, found) -> list:
+        """The entities loaded along with a row"""
+        return []
 
-            page = schema_as_dict.get("page", configs.PAGE)
+    def _prime(self, *founds) -> None:
+        """Shares loaded rows with the rest of the request"""
+        loader = entity_loader()
 
-            page_size = schema_as_dict.get("page_size", configs.PAGE_SIZE)
+        if loader is None:
+            return
 
-            filter_options = dict_to_sqlalchemy_filter_options(
-                self.model, schema.dict(exclude_none=True))
+        for found in founds:
+            loader.prime(found, *self._related_entities(found))
 
-            query = session.query(self.model)
+    def _forget(self, *ids) -> None:
+        loader = entity_loader()
 
-            if eager:
-                for eager in getattr(self.model, "eagers", []):
-                    query = query.options(
-                        joinedload(getattr(self.model, eager)))
+        if loader is not None:
+            loader.evict(self.model, *ids)
+
+    def _order_query(self, ordering: str):
+        return (
+            getattr(self.model, ordering[1:]).desc()
+            if ordering.startswith("-")
+            else getattr(self.model, ordering).asc()
+        )
+
+    def _keyset_columns(self, ordering: str) -> list:
+        """Returns the ordering column followed by the id tiebreaker"""
+        column_name = ordering.lstrip("-")
+
+        if column_name == "id":
+            return ["id"]
+        return [column_name, "id"]
+
+    def _keyset_order_query(self, ordering: str) -> list:
+        direction = "-" if ordering.startswith("-") else ""
+
+        return [self._order_query(direction + column_name)
+                for column_name in self._keyset_columns(ordering)]
+
+    def _seek_criteria(self, ordering: str):
+        """Builds the tuple comparison that seeks past the cursor's row"""
+        columns = [getattr(self.model, name)
+                   for name in self._keyset_columns(ordering)]
+
+        # bind each value with its column's type so custom types (GUID)
+        # apply their bind processing inside the tuple
+        values = [bindparam(f"after_{index}", type_=column.type)
+                  for index, column in enumerate(columns)]
+
+        if ordering.startswith("-"):
+            return tuple_(*columns) < tuple_(*values)
+        return tuple_(*columns) > tuple_(*values)
+
+    def _seek_params(self, ordering: str, after: str) -> dict:
+        column_names = self._keyset_columns(ordering)
+
+        values = decode_cursor(after, ordering)
+
+        if len(values) != len(column_names):
+            raise ValidationError(detail="Invalid cursor")
+
+        return {
+            f"after_{index}": parse_cursor_value(
+                getattr(self.model, name).type, value)
+            for index, (name, value) in enumerate(zip(column_names, values))
+        }
+
+    def _next_cursor(self, founds, options: dict,
+                     has_more: Optional[bool] = None) -> Optional[str]:
+        page_size = options["page_size"]
+
+        # a ranked page has no keyset to resume from
+        if page_size == "all" or not founds or has_more is False \
+                or len(founds) < page_size or options["ranked"]:
+            return None
 
-            filtered_query = query.filter(filter_options)
+        ordering = options["ordering"]
 
-            query = filtered_query.order_by(order_query)
+        return encode_cursor(ordering, [
+            getattr(founds[-1], name)
+            for name in self._keyset_columns(ordering)])
 
-            total_count = filtered_query.count()
+    def _search(self, dialect_name: str) -> tuple:
+        """
+        Returns the criteria and rank expression of a text search, bound to
+        the parameters returned by `_search_params`
+        """
+        return None, None
 
-            if page_size == "all":
-                query = query.all()
-                pages = 1
+    def _search_params(self, q: str, dialect_name: str) -> dict:
+        return {}
+
+    def _build_list_statements(self, filter_shape: tuple, ordering: str,
+                               paged: bool, seek: bool, count: str,
+                               ranked: bool, eager, dialect_name: str):
+        """Builds the page and count statements of a list query shape"""
+        filtered_query = select(self.model).filter(
+            build_filter_options(self.model, filter_shape))
+
+        search, rank = self._search(dialect_name) if ranked is not None \
+            else (None, None)
+
+        if search is not None:
+            filtered_query = filtered_query.filter(search)
+
+        count_query = select(func.count()).select_from(
+            filtered_query.subquery())
+
+        order_query = self._keyset_order_query(ordering)
+
+        if ranked and rank is not None:
+            order_query = [rank.desc(), *order_query]
+
+        query = filtered_query.order_by(*order_query)\
+            .options(*self._loader_options(eager))
+
+        # the exact total comes back with the page itself as COUNT(*) OVER(),
+        # except in keyset mode where the seek would narrow the window. Only
+        # a limited query is wrapped before the eager joins, unlimited the
+        # window would count the joined rows
+        if count == "exact" and paged and not seek:
+            query = query.add_columns(func.count().over())
+
+        if paged:
+            # keyset mode seeks past the cursor's row instead of scanning
+            # and discarding (page - 1) * page_size rows
+            if seek:
+                query = query.filter(self._seek_criteria(ordering))\
+                    .limit(bindparam("limit"))
+            else:
+                query = query.limit(bindparam("limit"))\
+                    .offset(bindparam("offset"))
+
+        return query, count_query, rank is not None
+
+    def _list_statements(self, schema, eager=False, filters=None,
+                         dialect_name: str = "postgresql"):
+        """
+        Returns the page and count statements of a list query, reused from
+        the statement cache, with the parameters to execute them with
+        """
+        schema_as_dict = schema.dict(
+            exclude_none=True) if schema and schema.model_dump() else {}
+
+        ordering = schema_as_dict.get("ordering", configs.ORDERING)
+
+        page = schema_as_dict.get("page", configs.PAGE)
+
+        page_size = schema_as_dict.get("page_size", configs.PAGE_SIZE)
+
+        after = schema_as_dict.get("after")
+
+        count = schema_as_dict.get("count", configs.COUNT)
+
+        if count not in COUNT_STRATEGIES:
+            raise ValidationError(detail=f"Invalid count strategy : {count}")
+
+        q = schema_as_dict.get("q")
+
+        filter_shape, params = parse_filter_options(
+            self.model, {**schema_as_dict, **(filters or {})})
+
+        if q:
+            params.update(self._search_params(q, dialect_name))
+
+        # the count only depends on the filter and search
+        count_key = (type(self), dialect_name, filter_shape, bool(q),
+                     repr(sorted(params.items())))
+
+        paged = page_size != "all"
+
+        seek = paged and bool(after)
+
+        # search results are ranked unless an ordering or cursor is given;
+        # None means there is no search at all
+        ranked = (not seek and "ordering" not in schema_as_dict) if q \
+            else None
+
+        if paged:
+            page_size = int(page_size)
+
+            # skip mode fetches one extra row to tell whether there is more
+            params["limit"] = page_size + 1 if count == "skip" else page_size
+
+            if seek:
+                params.update(self._seek_params(ordering, after))
             else:
-                page_size = int(page_size)
-                pages = 0 if total_count < 1 else (1 if page_size > total_count else int(
-                    total_count / page_size))
-
-                query = query.limit(page_size).offset(
-                    (page - 1) * page_size).all()
-
-            return {
-                "founds": query,
-                "search_options": {
-                    "page": page,
-                    "pages": pages,
-                    "page_size": page_size,
-                    "ordering": ordering,
-                    "total_count": total_count,
-                },
-            }
+                params["offset"] = (page - 1) * page_size
+
+        key = (type(self), dialect_name, filter_shape, ordering, paged, seek,
+               count, ranked, eager)
+
+        query, count_query, has_rank = statement_cache.get_or_build(
+            key, lambda: self._build_list_statements(
+                filter_shape, ordering, paged, seek, count, ranked, eager,
+                dialect_name))
+
+        return query, count_query, {
+            "page": page,
+            "page_size": page_size,
+            "ordering": ordering,
+            "count": count,
+            "filtered": bool(filter_shape) or bool(q),
+            "windowed": count == "exact" and paged and not seek,
+            "ranked": bool(ranked) and has_rank,
+            "params": params,
+            "count_key": count_key,
+        }
+
+    def _list_result(self, rows, options: dict, total_count=None):
+        page_size = options["page_size"]
+
+        has_more: Optional[bool] = None
+
+        founds = [row[0] for row in rows]
+
+        if options["windowed"]:
+            total_count = rows[0][1] if rows else (total_count or 0)
+
+        if options["count"] == "skip" and page_size != "all":
+            has_more = len(founds) > page_size
+
+            founds = founds[:page_size]
+
+        if total_count is None:
+            pages = None
+        elif page_size == "all":
+            pages = 1
+        else:
+            pages = math.ceil(total_count / page_size)
+
+        return {
+            "founds": founds,
+            "search_options": {
+                "page": options["page"],
+                "page_size": page_size,
+                "ordering": options["ordering"],
+                "pages": pages,
+                "total_count": total_count,
+                "has_more": has_more,
+                "next_cursor": self._next_cursor(founds, options, has_more),
+            },
+        }
+
+    def _needs_count_query(self, rows, options: dict) -> bool:
+        if options["count"] == "skip":
+            return False
+
+        # an empty window carries no count, which is only conclusive on the
+        # first page
+        return not options["windowed"] or (
+            not rows and options["page"] != 1)
+
+    def _estimate_query(self, session):
+        """Planner row estimate, only meaningful for unfiltered listings"""
+        if session.bind.dialect.name != "postgresql":
+            return None
+
+        return text("SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = CAST(:table_name AS regclass)")\
+            .bindparams(table_name=self.model.__tablename__)
+
+    def _total_count(self, session, count_query, options: dict) -> int:
+        if options["count"] == "estimated" and not options["filtered"]:
+            estimate_query = self._estimate_query(session)
+
+            if estimate_query is not None:
+                estimate = session.execute(estimate_query).scalar()
+
+                # reltuples is -1 until the table has been analyzed
+                if estimate is not None and estimate >= 0:
+                    return int(estimate)
+
+        if options["count"] == "cached":
+            key = options["count_key"]
+
+            with _count_cache_lock:
+                total_count = _count_cache.get(key)
+
+            if total_count is None:
+                total_count = session.execute(
+                    count_query, options["params"]).scalar_one()
+
+                with _count_cache_lock:
+                    _count_cache[key] = total_count
+
+            return total_count
+
+        return session.execute(count_query, options["params"]).scalar_one()
+
+    async def _async_total_count(self, session, count_query,
+                                 options: dict) -> int:
+        if options["count"] == "estimated" and not options["filtered"]:
+            estimate_query = self._estimate_query(session)
+
+            if estimate_query is not None:
+                estimate = (await session.execute(estimate_query)).scalar()
+
+                # reltuples is -1 until the table has been analyzed
+                if estimate is not None and estimate >= 0:
+                    return int(estimate)
+
+        if options["count"] == "cached":
+            key = options["count_key"]
+
+            with _count_cache_lock:
+                total_count = _count_cache.get(key)
+
+            if total_count is None:
+                total_count = (await session.execute(
+                    count_query, options["params"])).scalar_one()
+
+                with _count_cache_lock:
+                    _count_cache[key] = total_count
+
+            return total_count
+
+        return (await session.execute(
+            count_query, options["params"])).scalar_one()
+
+    def _read_by_options(self, schema, eager=False, filters=None):
+        with self.read_session_factory() as session:
+            query, count_query, options = self._list_statements(
+                schema, eager, filters, session.bind.dialect.name)
+
+            rows = session.execute(query, options["params"]).unique().all()
+
+            total_count = self._total_count(session, count_query, options) \
+                if self._needs_count_query(rows, options) else None
+
+            result = self._list_result(rows, options, total_count)
+
+            self._prime(*result["founds"])
+
+            return result
+
+    async def _async_read_by_options(self, schema, eager=False,
+                                     filters=None):
+        async with self._async_read_session() as session:
+            query, count_query, options = self._list_statements(
+                schema, eager, filters, session.bind.dialect.name)
+
+            rows = (await session.execute(
+                query, options["params"])).unique().all()
+
+            total_count = await self._async_total_count(
+                session, count_query, options) \
+                if self._needs_count_query(rows, options) else None
+
+            result = self._list_result(rows, options, total_count)
+
+            self._prime(*result["founds"])
+
+            return result
+
+    def _async_session(self) -> AbstractAsyncContextManager[AsyncSession]:
+        if self.async_session_factory is None:
+            raise RuntimeError(
+                f"{type(self).__name__} has no async session factory")
+
+        return self.async_session_factory()
+
+    def _async_read_session(self) \
+            -> AbstractAsyncContextManager[AsyncSession]:
+        if self.async_read_session_factory is None:
+            raise RuntimeError(
+                f"{type(self).__name__} has no async session factory")
+
+        return self.async_read_session_factory()
+
+    def read_by_options(self, schema, eager=False):
+        return self._read_by_options(schema, eager)
+
+    async def async_read_by_options(self, schema, eager=False):
+        return await self._async_read_by_options(schema, eager)
+
+    def _fetch_by_ids(self, ids: list) -> list:
+        with self.read_session_factory() as session:
+            founds = []
+
+            for chunk in self._chunks(ids):
+                founds.extend(session.execute(
+                    select(self.model).filter(self.model.id.in_(chunk))
+                    .options(*self._loader_options()))
+                    .unique().scalars())
+
+            self._prime(*founds)
+
+            return founds
+
+    def read_many_by_ids(self, ids: list) -> list:
+        """
+        The rows of the ids, in their order. Within a request, the ids it
+        has not loaded yet are read in one query.
+        """
+        loader = entity_loader()
+
+        if loader is None:
+            founds = {str(found.id): found
+                      for found in self._fetch_by_ids(list(ids))}
+
+            return [founds[str(id)] for id in ids if str(id) in founds]
+
+        return loader.load_many(self.model, ids, self._fetch_by_ids)
 
     def read_by_id(self, id: UUID, eager=False):
-        with self.session_factory() as session:
+        loader = entity_loader()
+
+        # eager loads carry relationships the loaded row may not have
+        if loader is not None and not eager:
+            found = loader.load(self.model, id, self._fetch_by_ids)
+
+            if not found:
+                raise NotFoundError(detail=f"not found id : {id}")
+            return found
+
+        with self.read_session_factory() as session:
             query = session.query(self.model)
 
             if eager:
@@ -93,6 +498,20 @@ class BaseRepository:
                 raise NotFoundError(detail=f"not found id : {id}")
             return query
 
+    async def async_read_by_id(self, id: UUID, eager=False):
+        async with self._async_read_session() as session:
+            query = select(self.model).filter(self.model.id == id)\
+                .options(*self._loader_options(eager))
+
+            found = (await session.execute(query)).unique().scalars().first()
+
+            if not found:
+                raise NotFoundError(detail=f"not found id : {id}")
+
+            self._prime(found)
+
+            return found
+
     def create(self, schema):
         with self.session_factory() as session:
             query = self.model(**schema.dict())
@@ -108,32 +527,245 @@ class BaseRepository:
 
             return query
 
-    def update(self, id: UUID, schema):
+    async def async_create(self, schema):
+        async with self._async_session() as session:
+            query = self.model(**schema.dict())
+
+            try:
+                session.add(query)
+
+                await session.commit()
+
+                await session.refresh(query)
+            except IntegrityError as e:
+                raise DuplicatedError(detail=str(e.orig))
+
+            return query
+
+    def _chunks(self, items: list, chunk_size: Optional[int] = None) \
+            -> Iterator[list]:
+        chunk_size = chunk_size or configs.BULK_CHUNK_SIZE
+
+        for start in range(0, len(items), chunk_size):
+            yield items[start:start + chunk_size]
+
+    def _bulk_insert(self, session, rows: List[dict],
+                     chunk_size: Optional[int] = None,
+                     returning: bool = True) -> list:
+        """
+        Inserts the rows as one executemany per chunk on the caller's
+        transaction, returning the created objects where the dialect
+        supports INSERT ... RETURNING for executemany
+        """
+        returning = returning and \
+            session.bind.dialect.insert_executemany_returning
+
+        founds = []
+
+        for chunk in self._chunks(rows, chunk_size):
+            if returning:
+                founds.extend(session.scalars(
+                    insert(self.model).returning(self.model), chunk).all())
+            else:
+                session.execute(insert(self.model), chunk)
+
+        return founds if returning else None
+
+    def _read_many(self, session, ids: list, eager=False,
+                   chunk_size: Optional[int] = None) -> list:
+        founds = {}
+
+        for chunk in self._chunks(ids, chunk_size):
+            founds.update((found.id, found) for found in session.execute(
+                select(self.model).filter(self.model.id.in_(chunk))
+                .options(*self._loader_options(eager))).unique().scalars())
+
+        # in the order of the given ids
+        return [founds[id] for id in ids if id in founds]
+
+    def bulk_create(self, schemas: list, chunk_size: Optional[int] = None):
         with self.session_factory() as session:
-            session.query(self.model).filter(self.model.id == id).update(
-                schema.dict(exclude_none=True))
+            # the model's id default is evaluated once and table models
+            # carry it, so each row gets its own id
+            rows = [{**schema.dict(exclude={"id"}), "id": uuid4()}
+                    for schema in schemas]
 
-            session.commit()
+            try:
+                founds = self._bulk_insert(session, rows, chunk_size)
 
-            return self.read_by_id(id)
+                # keep the returned rows loaded past the commit
+                if founds is not None:
+                    session.expunge_all()
 
-    def update_attr(self, id: UUID, column: str, value):
+                session.commit()
+            except IntegrityError as e:
+                raise DuplicatedError(detail=str(e.orig))
+
+            if founds is None:
+                founds = self._read_many(
+                    session, [row["id"] for row in rows], chunk_size=chunk_size)
+
+            return founds
+
+    def bulk_update(self, schemas: list, chunk_size: Optional[int] = None):
+        """Updates rows by the id carried in each schema"""
         with self.session_factory() as session:
-            session.query(self.model).filter(
-                self.model.id == id).update({column: value})
+            rows = [schema.dict(exclude_none=True) for schema in schemas]
+
+            update_query = update(self.model)
+
+            # stamped as `_touch` does, on the statement since the rows
+            # bind plain values only
+            if hasattr(self.model, "updated_at"):
+                update_query = update_query.values(updated_at=func.now())
+
+            try:
+                for chunk in self._chunks(rows, chunk_size):
+                    session.execute(update_query, chunk)
+
+                session.commit()
+            except IntegrityError as e:
+                raise DuplicatedError(detail=str(e.orig))
+
+            founds = self._read_many(
+                session, [row["id"] for row in rows], chunk_size=chunk_size)
+
+            self._prime(*founds)
+
+            return founds
+
+    def bulk_delete(self, ids: List[UUID],
+                    chunk_size: Optional[int] = None) -> int:
+        """Deletes rows by id and returns how many were deleted"""
+        with self.session_factory() as session:
+            deleted = 0
+
+            for chunk in self._chunks(ids, chunk_size):
+                deleted += session.execute(
+                    delete(self.model).filter(self.model.id.in_(chunk))
+                    .execution_options(synchronize_session=False)).rowcount
 
             session.commit()
 
-            return self.read_by_id(id)
+            self._forget(*ids)
 
-    def whole_update(self, id: UUID, schema):
+            return deleted
+
+    def _returning_loader_options(self, eager=False) -> list:
+        """Relationship loaders for UPDATE ... RETURNING, which cannot join"""
+        if not eager:
+            return []
+
+        return [selectinload(getattr(self.model, eager))
+                for eager in getattr(self.model, "eagers", [])]
+
+    def _touch(self, values: dict) -> dict:
+        """The values stamped with the update time, which ETags derive from"""
+        if not values or not hasattr(self.model, "updated_at"):
+            return values
+
+        return {**values, "updated_at": func.now()}
+
+    def _update_statements(self, criteria: list, values: dict, eager=False):
+        """
+        Returns the UPDATE ... RETURNING of the values, or None without
+        values, and the SELECT of the row for dialects without RETURNING
+        """
+        options = self._returning_loader_options(eager)
+
+        select_query = select(self.model).filter(*criteria).options(*options)\
+            .execution_options(populate_existing=True)
+
+        if not values:
+            return None, select_query
+
+        update_query = update(self.model).filter(*criteria).values(**values)\
+            .returning(self.model).options(*options)\
+            .execution_options(synchronize_session=False,
+                               populate_existing=True)
+
+        return update_query, select_query
+
+    def _update_returning(self, session, criteria: list, values: dict,
+                          eager=False):
+        """
+        Updates the row matching the criteria and returns it, with its
+        relationships, in the same transaction; in one statement where the
+        dialect supports UPDATE ... RETURNING
+        """
+        values = self._touch(values)
+
+        update_query, select_query = self._update_statements(
+            criteria, values, eager)
+
+        if update_query is None:
+            return session.scalars(select_query).first()
+
+        if session.bind.dialect.update_returning:
+            return session.scalars(update_query).first()
+
+        session.execute(update(self.model).filter(*criteria).values(**values))
+
+        return session.scalars(select_query).first()
+
+    async def _async_update_returning(self, session, criteria: list,
+                                      values: dict, eager=False):
+        values = self._touch(values)
+
+        update_query, select_query = self._update_statements(
+            criteria, values, eager)
+
+        if update_query is None:
+            return (await session.scalars(select_query)).first()
+
+        if session.bind.dialect.update_returning:
+            return (await session.scalars(update_query)).first()
+
+        await session.execute(
+            update(self.model).filter(*criteria).values(**values))
+
+        return (await session.scalars(select_query)).first()
+
+    def _update(self, id: UUID, values: dict, eager=False):
         with self.session_factory() as session:
-            session.query(self.model).filter(
-                self.model.id == id).update(schema.dict())
+            found = self._update_returning(
+                session, [self.model.id == id], values, eager)
+
+            if not found:
+                raise NotFoundError(detail=f"not found id : {id}")
+
+            # keep the returned row loaded past the commit
+            session.expunge_all()
 
             session.commit()
 
-            return self.read_by_id(id)
+            self._prime(found)
+
+            return found
+
+    def update(self, id: UUID, schema):
+        return self._update(id, schema.dict(exclude_none=True))
+
+    async def async_update(self, id: UUID, schema):
+        async with self._async_session() as session:
+            found = await self._async_update_returning(
+                session, [self.model.id == id],
+                schema.dict(exclude_none=True))
+
+            if not found:
+                raise NotFoundError(detail=f"not found id : {id}")
+
+            await session.commit()
+
+            self._forget(id)
+
+            return found
+
+    def update_attr(self, id: UUID, column: str, value):
+        return self._update(id, {column: value})
+
+    def whole_update(self, id: UUID, schema):
+        return self._update(id, schema.dict())
 
     def delete_by_id(self, id: str):
         with self.session_factory() as session:
@@ -146,3 +778,17 @@ class BaseRepository:
             session.delete(query)
 
             session.commit()
+
+            self._forget(id)
+
+    async def async_delete_by_id(self, id: str):
+        async with self._async_session() as session:
+            result = await session.execute(
+                delete(self.model).filter(self.model.id == id))
+
+            if result.rowcount < 1:
+                raise NotFoundError(detail=f"not found id : {id}")
+
+            await session.commit()
+
+            self._forget(id)
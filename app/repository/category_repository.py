@@ -4,7 +4,8 @@
 """Category Repository"""
 
 
-from typing import Callable
+from typing import Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.core.exceptions import DuplicatedError
@@ -13,11 +14,18 @@ from app.repository.base_repository import BaseRepository
 
 
 class CategoryRepository(BaseRepository):
-    def __init__(self, session_factory: Callable[[], Session]):
+    def __init__(self, session_factory: Callable[[], Session],
+                 async_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None,
+                 read_session_factory: Optional[
+                     Callable[[], Session]] = None,
+                 async_read_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None):
         self.session_factory = session_factory
         self.model = Category
 
-        super().__init__(session_factory, Category)
+        super().__init__(session_factory, Category, async_session_factory,
+                         read_session_factory, async_read_session_factory)
 
     def create(self, schema) -> Category:
         """"""
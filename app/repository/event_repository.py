@@ -5,60 +5,120 @@
 
 
 import json
-from typing import Callable, List
+from typing import Callable, List, Optional
 from uuid import UUID, uuid4
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import String, Uuid, func, or_, cast
+from sqlalchemy import String, bindparam, column, delete, func, insert, \
+    literal_column, or_, select, table, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.exceptions import DuplicatedError, NotFoundError
 from app.model.category import Category
-from app.model.event import Event
+from app.model.event import Event, event_categories
 from app.model.user import User
 from app.repository.base_repository import BaseRepository
 from app.schema.event_schema import FindEventsResult, FindUserEventsResult
-from app.util.query_builder import dict_to_sqlalchemy_filter_options
+from app.util.query_builder import dict_to_sqlalchemy_filter_options, \
+    to_fts5_query, to_like_pattern
 from app.core.config import configs
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 
 
 class EventRepository(BaseRepository):
-    def __init__(self, session_factory: Callable[[], Session]):
+    def __init__(self, session_factory: Callable[[], Session],
+                 async_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None,
+                 read_session_factory: Optional[
+                     Callable[[], Session]] = None,
+                 async_read_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None):
         self.session_factory = session_factory
         self.model = Event  # I want the type
 
-        super().__init__(session_factory, Event)
+        super().__init__(session_factory, Event, async_session_factory,
+                         read_session_factory, async_read_session_factory)
+
+    def _insert_ignore(self, session, table):
+        """INSERT that skips rows conflicting with a unique constraint"""
+        dialect_name = session.bind.dialect.name
+
+        if dialect_name == "postgresql":
+            return postgresql.insert(table).on_conflict_do_nothing()
+        if dialect_name == "sqlite":
+            return sqlite.insert(table).on_conflict_do_nothing()
+        return insert(table).prefix_with("IGNORE")
+
+    def _resolve_categories(self, session, names: List[str]) -> List[UUID]:
+        """
+        Returns the ids of the named categories, creating the missing ones,
+        in one lookup and at most one insert on the caller's transaction.
+        """
+        names = list(dict.fromkeys(names))
+
+        if not names:
+            return []
+
+        categories = Category.__table__
+
+        found = dict(session.execute(
+            select(categories.c.name, categories.c.id)
+            .filter(categories.c.name.in_(names))).all())
+
+        missing = [name for name in names if name not in found]
+
+        if missing:
+            insert_query = self._insert_ignore(session, categories).values(
+                [{"id": uuid4(), "name": name} for name in missing])
+
+            if session.bind.dialect.insert_returning:
+                found.update(session.execute(insert_query.returning(
+                    categories.c.name, categories.c.id)).all())
+            else:
+                session.execute(insert_query)
+
+            # rows skipped on conflict were created by a concurrent request
+            conflicted = [name for name in missing if name not in found]
+
+            if conflicted:
+                found.update(session.execute(
+                    select(categories.c.name, categories.c.id)
+                    .filter(categories.c.name.in_(conflicted))).all())
+
+        return [found[name] for name in names]
+
+    def _link_categories(self, session, event_id: UUID, names: List[str]):
+        """Bulk inserts the event_categories links of an event"""
+        category_ids = self._resolve_categories(session, names)
+
+        if category_ids:
+            session.execute(insert(event_categories), [
+                {"event_id": event_id, "category_id": category_id}
+                for category_id in category_ids])
 
     def create(self, schema, user_id: UUID):
         with self.session_factory() as session:
-            category_session = session.query(
-                Category)
-
-            categories: List['Category'] = [*schema.categories]
+            categories: List[str] = [
+                category.name for category in schema.categories]
 
             delattr(schema, 'categories')
 
-            query = self.model(id=uuid4(), **schema.dict())
+            query = self.model(id=uuid4(), **schema.dict(exclude={"id"}))
 
             query.owner_id = user_id
 
-            for category in categories:
-                cat = category_session.filter(cast(Category.name, String)
-                                              == cast(category.name, String)).all()
-
-                if len(cat) < 1:
-                    # create new category here
-                    pass
-                else:
-                    query.categories.append(cat[0])
-
             try:
                 session.add(query)
 
+                session.flush()
+
+                self._link_categories(session, query.id, categories)
+
                 session.commit()
 
                 event_with_categories = session.query(
-                    self.model).filter_by(id=query.id).options(joinedload(Event.categories)).first()
+                    self.model).filter_by(id=query.id).options(selectinload(Event.categories)).first()
 
                 # session.refresh(query)
                 if event_with_categories:
@@ -73,120 +133,151 @@ class EventRepository(BaseRepository):
 
             return query
 
-    def read_by_options(self, schema, eager=False):
+    def bulk_create_events(self, schemas: list, user_id: UUID,
+                           chunk_size: Optional[int] = None) -> list:
+        """
+        Creates the events of a batch in one transaction: one executemany
+        per chunk of events, one category lookup and upsert for the whole
+        batch and one executemany per chunk of category links.
+        """
         with self.session_factory() as session:
-            # if schema and schema.model_dump():
-            schema_as_dict = schema.dict(
-                exclude_none=True) if schema and schema.model_dump() else {}
-
-            ordering = schema_as_dict.get("ordering", configs.ORDERING)
+            rows: List[dict] = []
+            links: List[tuple] = []
 
-            order_query = (
-                getattr(self.model, ordering[1:]).desc()
-                if ordering.startswith("-")
-                else getattr(self.model, ordering).asc()
-            )
+            for schema in schemas:
+                event_id = uuid4()
 
-            page = schema_as_dict.get("page", configs.PAGE)
+                rows.append({**schema.dict(exclude={"id", "categories"}),
+                             "id": event_id, "owner_id": user_id})
 
-            page_size = schema_as_dict.get("page_size", configs.PAGE_SIZE)
+                links.extend((event_id, name) for name in schema.categories)
 
-            filter_options = dict_to_sqlalchemy_filter_options(
-                self.model, schema.dict(exclude_none=True))
+            names = list(dict.fromkeys(name for _, name in links))
 
-            query = session.query(self.model)
+            try:
+                self._bulk_insert(session, rows, chunk_size, returning=False)
 
-            if eager:
-                for eager in getattr(self.model, "eagers", []):
-                    query = query.options(
-                        joinedload(getattr(self.model, eager)))
+                category_ids = dict(
+                    zip(names, self._resolve_categories(session, names)))
 
-            filtered_query = query.filter(filter_options)
+                link_rows = [{"event_id": event_id,
+                              "category_id": category_ids[name]}
+                             for event_id, name in dict.fromkeys(links)]
 
-            query = filtered_query.order_by(order_query).options(
-                joinedload(self.model.categories), joinedload(self.model.owner))
+                for chunk in self._chunks(link_rows, chunk_size):
+                    session.execute(insert(event_categories), chunk)
 
-            total_count = filtered_query.count()
+                session.commit()
+            except IntegrityError as e:
+                raise DuplicatedError(detail=str(e.orig))
 
-            if page_size == "all":
-                query = query.all()
-                pages = 1
-            else:
-                page_size = int(page_size)
-                pages = 0 if total_count < 1 else (1 if page_size > total_count else int(
-                    total_count / page_size))
-
-                query = query.limit(page_size).offset(
-                    (page - 1) * page_size).all()
-
-            return {
-                "founds": query,
-                "search_options": {
-                    "page": page,
-                    "pages": pages,
-                    "page_size": page_size,
-                    "ordering": ordering,
-                    "total_count": total_count,
-                },
-            }
+            return self._read_many(session, [row["id"] for row in rows],
+                                   chunk_size=chunk_size)
 
-    def get_events_by_user(self, schema, owner_id: UUID, eager=False):
-        """"""
+    def bulk_delete_events(self, ids: List[UUID], user_id: UUID,
+                           chunk_size: Optional[int] = None) -> int:
+        """Deletes the user's events among the ids with their links"""
         with self.session_factory() as session:
-            schema_as_dict = schema.dict(
-                exclude_none=True) if schema and schema.model_dump() else {}
+            deleted = 0
 
-            ordering = schema_as_dict.get("ordering", configs.ORDERING)
+            for chunk in self._chunks([UUID(str(id)) for id in ids],
+                                      chunk_size):
+                owned = select(self.model.id).filter(
+                    self.model.id.in_(chunk),
+                    self.model.owner_id == UUID(str(user_id)))
 
-            order_query = (
-                getattr(self.model, ordering[1:]).desc()
-                if ordering.startswith("-")
-                else getattr(self.model, ordering).asc()
-            )
+                session.execute(delete(event_categories).filter(
+                    event_categories.c.event_id.in_(owned)))
 
-            page = schema_as_dict.get("page", configs.PAGE)
+                deleted += session.execute(
+                    delete(self.model).filter(
+                        self.model.id.in_(chunk),
+                        self.model.owner_id == UUID(str(user_id)))
+                    .execution_options(synchronize_session=False)).rowcount
 
-            page_size = schema_as_dict.get("page_size", configs.PAGE_SIZE)
+            session.commit()
 
-            query = session.query(self.model)
+            self._forget(*ids)
 
-            if eager:
-                for eager in getattr(self.model, "eagers", []):
-                    query = query.options(
-                        joinedload(getattr(self.model, eager)))
+            return deleted
 
-            filtered_query = query.filter(
-                cast(self.model.owner_id, Uuid) == cast(owner_id, Uuid))
+    def _loader_options(self, eager=False) -> list:
+        # the categories come in a second query keyed on the event ids; the
+        # nested join of a joined load makes SQLite materialize the whole
+        # event_categories table on every page
+        return [*super()._loader_options(eager),
+                selectinload(self.model.categories),
+                joinedload(self.model.owner)]
 
-            query = filtered_query.order_by(order_query).options(
-                joinedload(self.model.categories), joinedload(self.model.owner))
+    def _related_entities(self, found) -> list:
+        # the owner and categories are loaded with every event
+        return [found.owner, *found.categories]
 
-            total_count = filtered_query.count()
+    def _returning_loader_options(self, eager=False) -> list:
+        return [*super()._returning_loader_options(eager),
+                selectinload(self.model.categories),
+                selectinload(self.model.owner)]
 
-            if page_size == "all":
-                query = query.all()
-                pages = 1
-            else:
-                page_size = int(page_size)
-                pages = 0 if total_count < 1 else (1 if page_size > total_count else int(
-                    total_count / page_size))
-
-                query = query.limit(page_size).offset(
-                    (page - 1) * page_size).all()
-
-            return {
-                "founds": query,
-                "search_options": {
-                    "page": page,
-                    "pages": pages,
-                    "page_size": page_size,
-                    "ordering": ordering,
-                    "total_count": total_count,
-                },
-            }
+    def _search(self, dialect_name: str) -> tuple:
+        """Full-text search over name, location and description"""
+        q = bindparam("q", type_=String)
+
+        q_like = bindparam("q_like", type_=String)
+
+        if dialect_name == "postgresql":
+            search_vector = literal_column("events.search_vector")
+
+            ts_query = func.websearch_to_tsquery("english", q)
+
+            # the trigram indexes serve the substring matches
+            search = or_(search_vector.op("@@")(ts_query),
+                         self.model.name.ilike(q_like, escape="/"),
+                         self.model.location.ilike(q_like, escape="/"))
+
+            rank = func.ts_rank(search_vector, ts_query) + \
+                func.similarity(self.model.name, q)
+
+            return search, rank
+
+        if dialect_name == "sqlite":
+            events_fts = table("events_fts", column("rowid"),
+                               column("events_fts"))
+
+            rowid = literal_column("events.rowid")
+
+            match = events_fts.c.events_fts.match(
+                bindparam("q_fts", type_=String))
+
+            # bm25 weighted like the postgres vector (name, location,
+            # description); lower is a better match
+            rank = -select(func.bm25(events_fts.c.events_fts, 10.0, 5.0, 1.0))\
+                .filter(events_fts.c.rowid == rowid, match).scalar_subquery()
+
+            return rowid.in_(select(events_fts.c.rowid).filter(match)), rank
+
+        return or_(self.model.name.ilike(q_like, escape="/"),
+                   self.model.location.ilike(q_like, escape="/"),
+                   self.model.description.ilike(q_like, escape="/")), None
+
+    def _search_params(self, q: str, dialect_name: str) -> dict:
+        if dialect_name == "sqlite":
+            return {"q_fts": to_fts5_query(q)}
+
+        return {"q": q, "q_like": to_like_pattern(q)}
+
+    def get_events_by_user(self, schema, owner_id: UUID, eager=False):
+        """"""
+        return self._read_by_options(
+            schema, eager, {"owner_id__eq": owner_id})
+
+    async def async_get_events_by_user(self, schema, owner_id: UUID,
+                                       eager=False):
+        """"""
+        return await self._async_read_by_options(
+            schema, eager, {"owner_id__eq": owner_id})
 
     def get_event_by_id(self, event_id: UUID, eager=False):
-        with self.session_factory() as session:
+        with self.read_session_factory() as session:
             query = session.query(self.model)
 
             if eager:
@@ -194,55 +285,83 @@ class EventRepository(BaseRepository):
                     query = query.options(
                         joinedload(getattr(self.model, eager)))
 
-            query = query.filter(cast(self.model.id, Uuid) == cast(event_id, Uuid))\
-                .options(joinedload(self.model.categories), joinedload(self.model.owner)).first()
+            query = query.filter(self.model.id == event_id)\
+                .options(selectinload(self.model.categories), joinedload(self.model.owner)).first()
 
             if not query:
                 raise NotFoundError(detail=f"not found id : {id}")
+
+            self._prime(query)
+
             return query
 
+    async def async_get_event_by_id(self, event_id: UUID, eager=False):
+        async with self._async_read_session() as session:
+            query = select(self.model)\
+                .filter(self.model.id == event_id)\
+                .options(*self._loader_options(eager))
+
+            found = (await session.execute(query)).unique().scalars().first()
+
+            if not found:
+                raise NotFoundError(detail=f"not found id : {event_id}")
+
+            self._prime(found)
+
+            return found
+
     def update_event(self, schema, event_id: UUID, user_id: UUID, eager=False):
         """Update an event by ID"""
         with self.session_factory() as session:
-            category_session = session.query(
-                Category)
+            categories: Optional[List[str]] = schema.categories
 
-            categories: List['Category'] = [*schema.categories]
+            values = schema.dict(exclude_none=True, exclude={
+                'id', 'owner_id', 'created_at', 'updated_at', 'categories'})
 
-            delattr(schema, 'categories')
+            # a change of categories alone is an update of the event too
+            values["updated_at"] = func.now()
 
-            query = self.model(**schema.dict())
+            criteria = [self.model.id == UUID(str(event_id)),
+                        self.model.owner_id == UUID(str(user_id))]
 
-            for category in categories:
-                cat = category_session.filter(cast(Category.name, String)
-                                              == cast(category, String)).all()
+            if categories is None:
+                event = self._update_returning(session, criteria, values)
+            else:
+                # the owner's update goes first, so the links of a missing
+                # event or of another user's are never touched; submitted
+                # categories then replace the current ones and the event is
+                # read back with them
+                updated = session.execute(
+                    update(self.model).filter(*criteria).values(**values)
+                    .execution_options(synchronize_session=False))
 
-                if len(cat) < 1:
-                    # create new category here
-                    pass
-                else:
-                    query.categories.append(cat[0])
+                event = None
 
-            event = session.get(self.model, event_id)
+                if updated.rowcount == 1:
+                    session.execute(delete(event_categories).filter(
+                        event_categories.c.event_id == UUID(str(event_id))))
 
-            if event:
-                for [k, v] in query.model_dump().items():
-                    if v is not None and k not in ['id', 'owner_id', 'created_at', 'updated_at']:
-                        setattr(event, k, v)
+                    self._link_categories(session, event_id, categories)
 
-            # session.query(self.model)\
-            #     .filter(cast(self.model.id, Uuid) == cast(event_id, Uuid),
-            #             cast(self.model.owner_id, Uuid) == cast(user_id, Uuid))\
-            #     .update({'name': 'oops', 'categories': query.categories}, synchronize_session='fetch')
+                    event = self._update_returning(session, criteria, {})
+
+            if not event:
+                raise NotFoundError(detail=f"not found id : {event_id}")
+
+            # keep the returned event loaded past the commit
+            session.expunge_all()
 
             session.commit()
 
-            return self.get_event_by_id(event_id)
+            self._prime(event)
+
+            return event
 
     def delete_event_by_id(self, id: str, user_id: str):
         with self.session_factory() as session:
-            query = session.query(self.model).filter(cast(self.model.id, Uuid) == cast(
-                id, Uuid), cast(self.model.owner_id, Uuid) == cast(user_id, Uuid)).first()
+            query = session.query(self.model).filter(
+                self.model.id == UUID(str(id)),
+                self.model.owner_id == UUID(str(user_id))).first()
 
             if not query:
                 raise NotFoundError(detail=f"not found id : {id}")
@@ -251,4 +370,6 @@ class EventRepository(BaseRepository):
 
             session.commit()
 
+            self._forget(id)
+
             return None
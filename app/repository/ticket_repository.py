@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# File: ticket_repository.py
+# Author: Oluwatobiloba Light
+"""Ticket Repository"""
+
+
+import random
+import zlib
+from typing import Any, Callable, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import configs
+from app.core.exceptions import ConflictError, NotFoundError, \
+    ValidationError
+from app.model.event import Event
+from app.model.ticket import Reservation, TicketType, ticket_type_shards
+from app.repository.base_repository import BaseRepository
+
+
+def spread(total: int, shards: int) -> List[int]:
+    """Splits the tickets evenly over the shards"""
+    return [total // shards + (1 if shard < total % shards else 0)
+            for shard in range(shards)]
+
+
+class TicketRepository(BaseRepository):
+    def __init__(self, session_factory: Callable[[], Session],
+                 async_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None,
+                 read_session_factory: Optional[
+                     Callable[[], Session]] = None,
+                 async_read_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None):
+        self.session_factory = session_factory
+        self.model = TicketType
+
+        super().__init__(session_factory, TicketType, async_session_factory,
+                         read_session_factory, async_read_session_factory)
+
+    def _split(self, session, ticket_type_id: UUID, remaining: int,
+               shards: int) -> None:
+        """
+        Lays the remaining tickets out on the shards, or back on the ticket
+        type for a single counter
+        """
+        session.execute(delete(ticket_type_shards).filter(
+            ticket_type_shards.c.ticket_type_id == ticket_type_id))
+
+        if shards > 1:
+            session.execute(insert(ticket_type_shards), [
+                {"ticket_type_id": ticket_type_id, "shard": shard,
+                 "remaining": value}
+                for shard, value in enumerate(spread(remaining, shards))])
+
+        session.execute(update(self.model).filter(
+            self.model.id == ticket_type_id).values(
+            remaining=0 if shards > 1 else remaining)
+            .execution_options(synchronize_session=False))
+
+    def create_ticket_type(self, schema, event_id: UUID,
+                           user_id: UUID) -> TicketType:
+        """Creates a ticket type on an event of the user"""
+        with self.session_factory() as session:
+            # locked against a change of the shards meanwhile
+            shards = session.scalar(select(Event.ticket_shards).filter(
+                Event.id == event_id, Event.owner_id == user_id)
+                .with_for_update())
+
+            if shards is None:
+                raise NotFoundError(detail=f"not found id : {event_id}")
+
+            ticket_type = self.model(id=uuid4(), event_id=event_id,
+                                     remaining=schema.capacity,
+                                     **schema.dict())
+
+            session.add(ticket_type)
+
+            session.flush()
+
+            if shards > 1:
+                self._split(session, ticket_type.id, schema.capacity, shards)
+
+            session.commit()
+
+            session.refresh(ticket_type)
+
+            return ticket_type
+
+    def set_ticket_shards(self, event_id: UUID, user_id: UUID,
+                          shards: int) -> None:
+        """
+        Splits the availability of the ticket types of an event of the user
+        over the given number of counters, or joins it back into one
+        """
+        with self.session_factory() as session:
+            updated = session.execute(update(Event).filter(
+                Event.id == event_id, Event.owner_id == user_id)
+                .values(ticket_shards=shards)
+                .execution_options(synchronize_session=False))
+
+            if updated.rowcount < 1:
+                raise NotFoundError(detail=f"not found id : {event_id}")
+
+            ticket_types = session.execute(
+                select(self.model.id, self.model.remaining)
+                .filter(self.model.event_id == event_id)
+                .order_by(self.model.id).with_for_update()).all()
+
+            for ticket_type_id, remaining in ticket_types:
+                pooled = session.scalars(
+                    select(ticket_type_shards.c.remaining)
+                    .filter(ticket_type_shards.c.ticket_type_id ==
+                            ticket_type_id)
+                    .with_for_update()).all()
+
+                self._split(session, ticket_type_id,
+                            remaining + sum(pooled), shards)
+
+            session.commit()
+
+    def _sharded_remaining(self):
+        return select(func.coalesce(func.sum(
+            ticket_type_shards.c.remaining), 0)).filter(
+            ticket_type_shards.c.ticket_type_id == self.model.id)\
+            .scalar_subquery()
+
+    def get_ticket_types(self, event_id: UUID) \
+            -> List[Tuple[TicketType, int]]:
+        """The ticket types of an event, with the tickets on their shards"""
+        with self.read_session_factory() as session:
+            return [tuple(row) for row in session.execute(
+                select(self.model, self._sharded_remaining())
+                .filter(self.model.event_id == event_id)
+                .order_by(self.model.price, self.model.name))]
+
+    def _hold(self, session, event_id: UUID, ticket_type_id: UUID,
+              quantity: int) -> Optional[Tuple[int, int]]:
+        """
+        Takes the tickets off the remaining ones in a single conditional
+        UPDATE, returning what remains with the shards of the event, or
+        None when the ticket type has too few left or does not allow that
+        many in one order. The row is locked from this statement to the
+        commit and never read first.
+        """
+        criteria = [self.model.id == ticket_type_id,
+                    self.model.event_id == event_id,
+                    self.model.remaining >= quantity,
+                    self.model.max_per_order >= quantity]
+
+        shards = select(Event.ticket_shards).filter(
+            Event.id == self.model.event_id).scalar_subquery()
+
+        hold_query = update(self.model).filter(*criteria).values(
+            **self._touch({"remaining": self.model.remaining - quantity}))\
+            .execution_options(synchronize_session=False)
+
+        if session.bind.dialect.update_returning:
+            return session.execute(
+                hold_query.returning(self.model.remaining, shards)).first()
+
+        if session.execute(hold_query).rowcount != 1:
+            return None
+
+        return session.execute(select(self.model.remaining, shards).filter(
+            self.model.id == ticket_type_id)).first()
+
+    def _first_shard(self, shards: int, key: Any) -> int:
+        if configs.TICKET_SHARD_STRATEGY == "hash":
+            return zlib.crc32(str(key).encode()) % shards
+        return random.randrange(shards)
+
+    def _hold_shard(self, session, ticket_type_id: UUID, shard: int,
+                    quantity: int) -> bool:
+        """The conditional decrement of `_hold`, on one shard"""
+        return session.execute(update(ticket_type_shards).filter(
+            ticket_type_shards.c.ticket_type_id == ticket_type_id,
+            ticket_type_shards.c.shard == shard,
+            ticket_type_shards.c.remaining >= quantity).values(
+            remaining=ticket_type_shards.c.remaining - quantity)
+        ).rowcount == 1
+
+    def _rebalance(self, session, ticket_type_id: UUID, quantity: int,
+                   first: int) -> Optional[int]:
+        """
+        Holds the tickets when no shard has enough left on its own, by
+        locking the shards and spreading what remains over them again, or
+        gathering it on the first shard once too little remains to spread.
+        Returns the shard held from, or None when too few tickets remain.
+        """
+        shards = session.execute(
+            select(ticket_type_shards.c.shard, ticket_type_shards.c.remaining)
+            .filter(ticket_type_shards.c.ticket_type_id == ticket_type_id)
+            .order_by(ticket_type_shards.c.shard).with_for_update()).all()
+
+        total = sum(remaining for _, remaining in shards)
+
+        if not shards or total < quantity:
+            return None
+
+        # the counters may have been split again since the first shard was
+        # picked, it is taken among the locked ones
+        first = first % len(shards)
+
+        if total // len(shards) >= quantity:
+            values = spread(total, len(shards))
+        else:
+            values = [total if index == first else 0
+                      for index in range(len(shards))]
+
+        values[first] -= quantity
+
+        session.execute(
+            update(ticket_type_shards).filter(
+                ticket_type_shards.c.ticket_type_id == ticket_type_id,
+                ticket_type_shards.c.shard == bindparam("b_shard"))
+            .values(remaining=bindparam("b_remaining")),
+            [{"b_shard": shard, "b_remaining": value}
+             for (shard, _), value in zip(shards, values)])
+
+        return shards[first][0]
+
+    def _locked_ticket_type(self, query):
+        """
+        Locks the ticket type of a hold or release on its shards before the
+        shards, in the order `set_ticket_shards` locks them. A key share
+        lock lets holds go on side by side, only a change of the shards
+        waits for them.
+        """
+        return query.with_for_update(read=True, key_share=True,
+                                     of=self.model)
+
+    def _hold_sharded(self, session, ticket_type_id: UUID, shards: int,
+                      quantity: int, key: Any) -> Optional[int]:
+        """
+        Holds the tickets on one of the shards, returning its number, or
+        None when too few tickets remain
+        """
+        first = self._first_shard(shards, key)
+
+        if self._hold_shard(session, ticket_type_id, first, quantity):
+            return first
+
+        # the shard ran dry, the fullest of the others are tried next
+        others = session.scalars(
+            select(ticket_type_shards.c.shard).filter(
+                ticket_type_shards.c.ticket_type_id == ticket_type_id,
+                ticket_type_shards.c.shard != first,
+                ticket_type_shards.c.remaining >= quantity)
+            .order_by(ticket_type_shards.c.remaining.desc())).all()
+
+        for shard in others:
+            if self._hold_shard(session, ticket_type_id, shard, quantity):
+                return shard
+
+        return self._rebalance(session, ticket_type_id, quantity, first)
+
+    def _available(self, session, ticket_type_id: UUID) -> int:
+        return session.scalar(
+            select(self.model.remaining + self._sharded_remaining())
+            .filter(self.model.id == ticket_type_id))
+
+    def _insert_reservation(self, session, row: dict) -> Reservation:
+        if session.bind.dialect.insert_returning:
+            return session.scalar(
+                insert(Reservation).values(**row).returning(Reservation))
+
+        reservation = Reservation(**row)
+
+        session.add(reservation)
+
+        session.flush()
+
+        session.refresh(reservation)
+
+        return reservation
+
+    def reserve(self, event_id: UUID, ticket_type_id: UUID, user_id: UUID,
+                quantity: int) -> Tuple[Reservation, Optional[int]]:
+        """
+        Holds the tickets and records the reservation in one transaction,
+        returning the reservation and the tickets remaining, which are not
+        counted for sharded counters
+        """
+        with self.session_factory() as session:
+            shard = None
+
+            # tickets given back on a sharded event are taken first
+            held = self._hold(session, event_id, ticket_type_id, quantity)
+
+            if held is None:
+                found = session.execute(self._locked_ticket_type(
+                    select(self.model.max_per_order, Event.ticket_shards)
+                    .join(Event, Event.id == self.model.event_id)
+                    .filter(self.model.id == ticket_type_id,
+                            self.model.event_id == event_id))).first()
+
+                if found is None:
+                    raise NotFoundError(
+                        detail=f"not found id : {ticket_type_id}")
+
+                max_per_order, shards = found
+
+                if quantity > max_per_order:
+                    raise ValidationError(
+                        detail=f"An order holds at most {max_per_order} "
+                               f"tickets")
+
+                if shards > 1:
+                    shard = self._hold_sharded(
+                        session, ticket_type_id, shards, quantity, user_id)
+
+                    # the counters may have been joined back meanwhile
+                    if shard is None:
+                        held = self._hold(session, event_id, ticket_type_id,
+                                          quantity)
+
+                if shard is None and held is None:
+                    session.rollback()
+
+                    raise ConflictError(
+                        detail=f"Only {self._available(session, ticket_type_id)}"
+                               f" tickets remaining")
+
+            reservation = self._insert_reservation(session, {
+                "id": uuid4(), "event_id": event_id,
+                "ticket_type_id": ticket_type_id, "user_id": user_id,
+                "quantity": quantity, "shard": shard})
+
+            # keep the returned row loaded past the commit
+            session.expunge_all()
+
+            session.commit()
+
+            # the rest of a sharded event's tickets are on its shards
+            remaining = held[0] if held is not None and held[1] == 1 \
+                else None
+
+            return reservation, remaining
+
+    def cancel_reservation(self, event_id: UUID, reservation_id: UUID,
+                           user_id: UUID) -> Optional[int]:
+        """
+        Deletes a reservation of the user and gives its tickets back,
+        returning the tickets remaining, which are not counted for sharded
+        counters
+        """
+        criteria = [Reservation.id == reservation_id,
+                    Reservation.event_id == event_id,
+                    Reservation.user_id == user_id]
+
+        columns = [Reservation.ticket_type_id, Reservation.quantity,
+                   Reservation.shard]
+
+        with self.session_factory() as session:
+            delete_query = delete(Reservation).filter(*criteria)\
+                .execution_options(synchronize_session=False)
+
+            if session.bind.dialect.delete_returning:
+                found = session.execute(
+                    delete_query.returning(*columns)).first()
+            else:
+                found = session.execute(
+                    select(*columns).filter(*criteria)).first()
+
+                if found is not None:
+                    session.execute(delete_query)
+
+            if found is None:
+                raise NotFoundError(detail=f"not found id : {reservation_id}")
+
+            ticket_type_id, quantity, shard = found
+
+            if shard is not None:
+                session.execute(self._locked_ticket_type(
+                    select(self.model.id).filter(
+                        self.model.id == ticket_type_id)))
+
+            if shard is not None and session.execute(
+                    update(ticket_type_shards).filter(
+                        ticket_type_shards.c.ticket_type_id ==
+                        ticket_type_id,
+                        ticket_type_shards.c.shard == shard).values(
+                        remaining=ticket_type_shards.c.remaining + quantity)
+            ).rowcount == 1:
+                session.commit()
+
+                return None
+
+            # the shard is gone once the counters were joined or split again
+            release_query = update(self.model).filter(
+                self.model.id == ticket_type_id).values(
+                **self._touch({"remaining": self.model.remaining + quantity}))\
+                .execution_options(synchronize_session=False)
+
+            if session.bind.dialect.update_returning:
+                remaining = session.scalar(
+                    release_query.returning(self.model.remaining))
+            else:
+                session.execute(release_query)
+
+                remaining = session.scalar(select(self.model.remaining)
+                                           .filter(self.model.id ==
+                                                   ticket_type_id))
+
+            session.commit()
+
+            return None if shard is not None else remaining
@@ -4,26 +4,49 @@
 """User Repository"""
 
 
-from typing import Callable
+from typing import Callable, Optional
 from uuid import UUID
-from sqlalchemy import Uuid, cast, text
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import configs
 from app.core.exceptions import NotFoundError
+from app.model.event import Event
 from app.model.user import User
 from app.repository.base_repository import BaseRepository
+from app.util.utils import normalize_email
 
 
 class UserRepository(BaseRepository):
-    def __init__(self, session_factory: Callable[[], Session]):
+    def __init__(self, session_factory: Callable[[], Session],
+                 async_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None,
+                 read_session_factory: Optional[
+                     Callable[[], Session]] = None,
+                 async_read_session_factory: Optional[
+                     Callable[[], AsyncSession]] = None):
         self.session_factory = session_factory
         self.model = User
 
-        super().__init__(session_factory, User)
+        super().__init__(session_factory, User, async_session_factory,
+                         read_session_factory, async_read_session_factory)
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        """The user with the email, through the lower(email) index"""
+        with self.read_session_factory() as session:
+            found = session.execute(
+                select(self.model)
+                .filter(func.lower(self.model.email) == normalize_email(email))
+            ).scalars().first()
+
+            self._prime(found)
+
+            return found
 
     def delete_by_id(self, user_id: str):
         with self.session_factory() as session:
             query = session.query(self.model).filter(
-                cast(self.model.id, Uuid) == cast(user_id, Uuid)).first()
+                self.model.id == UUID(str(user_id))).first()
 
             if not query:
                 raise NotFoundError(detail=f"not found id : {user_id}")
@@ -33,3 +56,61 @@ class UserRepository(BaseRepository):
             session.delete(query)
 
             session.commit()
+
+            self._forget(user_id)
+
+    def count_user_events(self, user_id: str) -> int:
+        with self.session_factory() as session:
+            return session.execute(select(func.count()).select_from(Event)
+                                   .filter(Event.owner_id == UUID(str(user_id))))\
+                .scalar_one()
+
+    def delete_by_id_in_batches(self, user_id: str,
+                                batch_size: Optional[int] = None,
+                                progress: Optional[Callable[[int], None]]
+                                = None) -> int:
+        """
+        Deletes the user's events a batch per transaction, so no single
+        transaction holds locks on all of them, then the user. Returns how
+        many events were deleted.
+        """
+        batch_size = batch_size or configs.USER_DELETE_BATCH_SIZE
+
+        deleted = 0
+
+        while True:
+            with self.session_factory() as session:
+                count = self.model.delete_user_events(
+                    session, user_id=user_id, limit=batch_size)
+
+                session.commit()
+
+            deleted += count
+
+            if progress is not None:
+                progress(deleted)
+
+            if count < batch_size:
+                break
+
+        self.delete_by_id(user_id)
+
+        return deleted
+
+    async def async_delete_by_id(self, user_id: str):
+        async with self._async_session() as session:
+            query = (await session.execute(select(self.model).filter(
+                self.model.id == UUID(str(user_id)))))\
+                .scalars().first()
+
+            if not query:
+                raise NotFoundError(detail=f"not found id : {user_id}")
+
+            await session.run_sync(
+                self.model.delete_user_events, user_id=user_id)
+
+            await session.delete(query)
+
+            await session.commit()
+
+            self._forget(user_id)
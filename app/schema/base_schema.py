@@ -28,10 +28,14 @@ class FindQueryOptions(BaseModel):
     page: Optional[int] = Field(default=None)
     ordering: Optional[str] = Field(default=None)
     page_size: Optional[Union[int, str]] = Field(default=None)
+    after: Optional[str] = Field(default=None)
+    count: Optional[str] = Field(default=None)
 
 
 class SearchOptions(FindBase):
     total_count: Optional[int]
+    has_more: Optional[bool] = Field(default=None)
+    next_cursor: Optional[str] = Field(default=None)
 
 
 class FindResult(BaseModel):
@@ -75,6 +75,10 @@ class DeleteEvent(ModelBaseInfo):
     ...
 
 
+class DeleteEvents(BaseModel):
+    ids: List[UUID]
+
+
 
 class GetUserEventsQuery(BaseModel):
     owner_id: Optional[str] = None
@@ -85,6 +89,9 @@ class FindEventQuery(BaseModel):
     page: Optional[int] = None
     page_size: Optional[Union[str, int]] = None
     ordering: Optional[str] = None
+    after: Optional[str] = None
+    count: Optional[str] = None
+    q: Optional[str] = None
     ...
 
     class Config:
@@ -92,7 +99,7 @@ class FindEventQuery(BaseModel):
 
 
 class FindEventQueryOptions(FindQueryOptions):
-    ...
+    q: Optional[str] = Field(default=None)
 
 
 class FindEventsResult(BaseModel):
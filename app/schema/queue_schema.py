@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# File: queue_schema.py
+# Author: Oluwatobiloba Light
+"""Queue Schema"""
+
+
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class QueueStatus(BaseModel):
+    event_id: UUID
+    position: int
+    ahead: int
+    admitted: bool
+    retry_after: int
+    token: str
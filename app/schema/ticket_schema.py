@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# File: ticket_schema.py
+# Author: Oluwatobiloba Light
+"""Ticket Schema"""
+
+
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.core.config import configs
+from app.schema.base_schema import ModelBaseInfo
+
+
+class BaseTicketType(BaseModel):
+    name: str = Field(max_length=100)
+    price: Decimal = Field(ge=0, max_digits=10, decimal_places=2)
+    capacity: int = Field(ge=0)
+    max_per_order: int = Field(default=10, gt=0)
+
+    class Config:
+        orm_mode = True
+
+
+class CreateTicketType(BaseTicketType):
+    ...
+
+
+class TicketType(ModelBaseInfo, BaseTicketType):
+    event_id: UUID
+    remaining: int
+
+
+class TicketShards(BaseModel):
+    shards: int = Field(ge=1, le=configs.TICKET_MAX_SHARDS)
+
+
+class ReserveTickets(BaseModel):
+    ticket_type_id: UUID
+    quantity: int = Field(default=1, gt=0)
+
+
+class Reservation(ModelBaseInfo):
+    event_id: UUID
+    ticket_type_id: UUID
+    user_id: UUID
+    quantity: int
+    # not known for sharded counters, whose sum is listed with the types
+    remaining: Optional[int] = None
+
+    class Config:
+        orm_mode = True
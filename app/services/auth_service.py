@@ -11,41 +11,66 @@ from fastapi.encoders import jsonable_encoder
 
 from app.core.config import configs
 from app.core.exceptions import AuthError, ValidationError
+from app.core.password_hasher import PasswordHasher
 from app.core.security import create_access_token, get_password_hash, \
     verify_password
 from app.model.user import User
 from app.repository.user_repository import UserRepository
 from app.schema.auth_schema import GoogleSignIn, Payload, SignIn, SignUp
-from app.schema.user_schema import FindUser
 from app.services.base_service import BaseService
 from app.util.hash import get_rand_hash
+from app.util.utils import normalize_email
 
 
 class AuthService(BaseService):
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository,
+                 password_hasher: Optional[PasswordHasher] = None):
         self.user_repository = user_repository
+        self.password_hasher = password_hasher
         super().__init__(user_repository)
 
-    def sign_in(self, sign_in_info: SignIn):
-        find_user = FindUser(email=sign_in_info.email)
-
-        # find_user.email__eq = sign_in_info.email__eq
-
-        user: List[User] = self.user_repository.read_by_options(find_user)[
-            "founds"]
+    def _find_active_user(self, email: str) -> User:
+        found_user = self.user_repository.get_by_email(email)
 
-        if not user or len(user) < 1:
+        if not found_user:
             raise AuthError(detail="Incorrect email or password")
 
-        found_user = user[0]
-
         if not found_user.is_active:
             raise AuthError(detail="Account is not active")
 
+        return found_user
+
+    def sign_in(self, sign_in_info: SignIn):
+        found_user = self._find_active_user(sign_in_info.email)
+
         if (found_user.password and sign_in_info.password) and\
                 not verify_password(sign_in_info.password, found_user.password):
             raise AuthError(detail="Incorrect email or password")
 
+        return self._sign_in_result(found_user)
+
+    async def async_sign_in(self, sign_in_info: SignIn):
+        """Signs in with bcrypt run off the event loop"""
+        if self.password_hasher is None:
+            return self.sign_in(sign_in_info)
+
+        found_user = self._find_active_user(sign_in_info.email)
+
+        if found_user.password and sign_in_info.password:
+            verified, new_hash = await self.password_hasher.verify_and_update(
+                sign_in_info.password, found_user.password)
+
+            if not verified:
+                raise AuthError(detail="Incorrect email or password")
+
+            # the hash was made at a lower cost than the current one
+            if new_hash:
+                self.user_repository.update_attr(
+                    found_user.id, "password", new_hash)
+
+        return self._sign_in_result(found_user)
+
+    def _sign_in_result(self, found_user: User):
         delattr(found_user, "password")
 
         payload = Payload(
@@ -73,10 +98,26 @@ class AuthService(BaseService):
         if len(user_info.password) < 6:
             raise ValidationError("Password is too short!")
 
+        return self._create_user(
+            user_info, get_password_hash(user_info.password))
+
+    async def async_sign_up(self, user_info: SignUp):
+        """Signs up with bcrypt run off the event loop"""
+        if self.password_hasher is None:
+            return self.sign_up(user_info)
+
+        if len(user_info.password) < 6:
+            raise ValidationError("Password is too short!")
+
+        return self._create_user(
+            user_info, await self.password_hasher.hash(user_info.password))
+
+    def _create_user(self, user_info: SignUp, password_hash: str):
         user = User(**user_info.model_dump(exclude_none=True),
                     is_active=True, is_admin=False)
 
-        user.password = get_password_hash(user_info.password)
+        user.email = normalize_email(user_info.email)
+        user.password = password_hash
 
         created_user = self.user_repository.create(user)
 
@@ -86,12 +127,9 @@ class AuthService(BaseService):
 
     def google_sign_up(self, user_info: GoogleSignIn):
         """Google Login"""
-        find_user = FindUser(email=user_info.email)
+        user_exists = self.user_repository.get_by_email(user_info.email)
 
-        user_exists: List[User] = self.user_repository.read_by_options(find_user)[
-            "founds"]
-
-        if len(user_exists) < 1:
+        if not user_exists:
             # register user here
             user_token = get_rand_hash()
 
@@ -104,10 +142,12 @@ class AuthService(BaseService):
                         is_admin=False,
                         user_token=user_token)
 
+            user.email = normalize_email(user_info.email)
+
             created_user = self.user_repository.create(user)
 
             payload = Payload(
-                id=created_user.id,
+                id=str(created_user.id),
                 email=created_user.email,
                 name=created_user.first_name + created_user.last_name,
                 is_admin=created_user.is_admin,
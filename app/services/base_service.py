@@ -14,20 +14,44 @@ class BaseService:
     def get_list(self, schema):
         return self._repository.read_by_options(schema, eager=True)
 
+    async def async_get_list(self, schema):
+        return await self._repository.async_read_by_options(schema, eager=True)
+
     def get_by_id(self, id: str):
         return self._repository.read_by_id(UUID(id))
 
+    async def async_get_by_id(self, id: str):
+        return await self._repository.async_read_by_id(UUID(id))
+
     def add(self, schema):
         return self._repository.create(schema)
 
+    async def async_add(self, schema):
+        return await self._repository.async_create(schema)
+
+    def bulk_add(self, schemas):
+        return self._repository.bulk_create(schemas)
+
     def patch(self, id: UUID, schema):
         return self._repository.update(id, schema)
 
+    async def async_patch(self, id: UUID, schema):
+        return await self._repository.async_update(id, schema)
+
     def patch_attr(self, id: UUID, attr: str, value):
         return self._repository.update_attr(id, attr, value)
 
+    def bulk_patch(self, schemas):
+        return self._repository.bulk_update(schemas)
+
     def put_update(self, id: UUID, schema):
         return self._repository.whole_update(id, schema)
 
     def remove_by_id(self, id):
         return self._repository.delete_by_id(id)
+
+    def bulk_remove(self, ids):
+        return self._repository.bulk_delete(ids)
+
+    async def async_remove_by_id(self, id):
+        return await self._repository.async_delete_by_id(id)
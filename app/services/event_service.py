@@ -4,8 +4,10 @@
 """Event Services"""
 
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from uuid import UUID
+from app.core.cache import ResponseCache
+from app.core.config import configs
 from app.model.category import Category
 from app.model.user import User
 from app.model.event import Event
@@ -17,12 +19,44 @@ from app.schema.event_schema import CreateEvent, Event as ev, UpdateEvent
 from app.util.date import format_time_with_am_pm
 
 
+# every cached event read belongs to this namespace, so any event write
+# invalidates them all; event data changes rarely relative to reads
+EVENTS_CACHE_NAMESPACE = "events"
+
+
 class EventService(BaseService):
-    def __init__(self, event_repository: EventRepository):
+    def __init__(self, event_repository: EventRepository,
+                 cache: Optional[ResponseCache] = None):
         self.event_repository = event_repository
+        self.cache = cache
 
         super().__init__(event_repository)
 
+    def _list_options(self, schema) -> Dict[str, Any]:
+        """Query options with their defaults, so equal queries share a key"""
+        options = schema.dict(exclude_none=True) if schema else {}
+
+        return {"page": configs.PAGE, "page_size": configs.PAGE_SIZE,
+                "ordering": configs.ORDERING, "count": configs.COUNT,
+                **options}
+
+    def _cached(self, parts: tuple, build):
+        if self.cache is None:
+            return build()
+
+        return self.cache.get_or_set((EVENTS_CACHE_NAMESPACE,), parts, build)
+
+    async def _async_cached(self, parts: tuple, build):
+        if self.cache is None:
+            return await build()
+
+        return await self.cache.async_get_or_set(
+            (EVENTS_CACHE_NAMESPACE,), parts, build)
+
+    def _invalidate(self) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(EVENTS_CACHE_NAMESPACE)
+
     def create_event(self, event_info: CreateEvent, user: User) -> Event:
         """Creates a new event"""
         categories = []
@@ -34,22 +68,80 @@ class EventService(BaseService):
 
         event = self.event_repository.create(event_info, user.id)
 
+        self._invalidate()
+
         return event
 
+    def create_events(self, events_info: List[CreateEvent],
+                      user: User) -> List[Event]:
+        """Creates a batch of events"""
+        events = self.event_repository.bulk_create_events(
+            events_info, user.id)
+
+        self._invalidate()
+
+        return events
+
     def get_list(self, schema):
-        return self.event_repository.read_by_options(schema)
+        return self._cached(
+            ("list", self._list_options(schema)),
+            lambda: self.event_repository.read_by_options(schema))
+
+    async def async_get_list(self, schema):
+        # the event reads go through the sync repository without DB_ASYNC
+        if not configs.DB_ASYNC:
+            return self.get_list(schema)
+
+        return await self._async_cached(
+            ("list", self._list_options(schema)),
+            lambda: self.event_repository.async_read_by_options(schema))
 
     def get_events_by_user(self, schema, owner_id: UUID):
         """"""
-        events = self.event_repository.get_events_by_user(schema, owner_id)
+        return self._cached(
+            ("user", owner_id, self._list_options(schema)),
+            lambda: self.event_repository.get_events_by_user(
+                schema, owner_id))
 
-        return events
+    async def async_get_events_by_user(self, schema, owner_id: UUID):
+        """"""
+        if not configs.DB_ASYNC:
+            return self.get_events_by_user(schema, owner_id)
+
+        return await self._async_cached(
+            ("user", owner_id, self._list_options(schema)),
+            lambda: self.event_repository.async_get_events_by_user(
+                schema, owner_id))
 
     def get_by_id(self, id: str):
-        return self.event_repository.get_event_by_id(UUID(id))
+        return self._cached(
+            ("id", UUID(id)),
+            lambda: self.event_repository.get_event_by_id(UUID(id)))
+
+    async def async_get_by_id(self, id: str):
+        if not configs.DB_ASYNC:
+            return self.get_by_id(id)
+
+        return await self._async_cached(
+            ("id", UUID(id)),
+            lambda: self.event_repository.async_get_event_by_id(UUID(id)))
 
     def patch(self, event_info: UpdateEvent, event_id: UUID, user_id: UUID):
-        return self.event_repository.update_event(event_info, event_id, user_id)
+        event = self.event_repository.update_event(
+            event_info, event_id, user_id)
+
+        self._invalidate()
+
+        return event
 
     def remove_by_id(self, id: str, user_id: str) -> None:
-        return self.event_repository.delete_event_by_id(id, user_id)
+        self.event_repository.delete_event_by_id(id, user_id)
+
+        self._invalidate()
+
+    def remove_events(self, ids: List[UUID], user_id: UUID) -> int:
+        deleted = self.event_repository.bulk_delete_events(ids, user_id)
+
+        self._invalidate()
+
+        return deleted
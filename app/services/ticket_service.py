@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# File: ticket_services.py
+# Author: Oluwatobiloba Light
+"""Ticket Services"""
+
+
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.cache import ResponseCache
+from app.repository.ticket_repository import TicketRepository
+from app.schema.ticket_schema import CreateTicketType, Reservation, \
+    ReserveTickets, TicketType as TicketTypeSchema
+from app.services.base_service import BaseService
+
+
+def availability_namespace(event_id: UUID) -> str:
+    return f"tickets:{event_id}"
+
+
+class TicketService(BaseService):
+    def __init__(self, ticket_repository: TicketRepository,
+                 cache: Optional[ResponseCache] = None):
+        self.ticket_repository = ticket_repository
+        # holds do not invalidate the listing, it may be as old as the TTL
+        self.cache = cache
+
+        super().__init__(ticket_repository)
+
+    def _invalidate(self, event_id: UUID) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(availability_namespace(event_id))
+
+    def create_ticket_type(self, ticket_type_info: CreateTicketType,
+                           event_id: UUID, user_id: UUID) -> TicketTypeSchema:
+        """Creates a ticket type on an event of the user"""
+        ticket_type = self.ticket_repository.create_ticket_type(
+            ticket_type_info, event_id, user_id)
+
+        self._invalidate(event_id)
+
+        # all of its tickets remain, on the shards of a sharded event
+        return TicketTypeSchema(**{**ticket_type.model_dump(),
+                                   "remaining": ticket_type_info.capacity})
+
+    def _ticket_types(self, event_id: UUID) -> List[TicketTypeSchema]:
+        return [TicketTypeSchema(**{**ticket_type.model_dump(),
+                                    "remaining": ticket_type.remaining +
+                                    sharded})
+                for ticket_type, sharded in
+                self.ticket_repository.get_ticket_types(event_id)]
+
+    def get_ticket_types(self, event_id: UUID) -> List[TicketTypeSchema]:
+        """The ticket types of an event with the tickets remaining"""
+        if self.cache is None:
+            return self._ticket_types(event_id)
+
+        return self.cache.get_or_set(
+            (availability_namespace(event_id),), ("ticket_types", event_id),
+            lambda: self._ticket_types(event_id))
+
+    def set_ticket_shards(self, event_id: UUID, user_id: UUID,
+                          shards: int) -> List[TicketTypeSchema]:
+        self.ticket_repository.set_ticket_shards(event_id, user_id, shards)
+
+        self._invalidate(event_id)
+
+        return self._ticket_types(event_id)
+
+    def reserve(self, reserve_info: ReserveTickets, event_id: UUID,
+                user_id: UUID) -> Reservation:
+        """Holds tickets of an event for the user"""
+        reservation, remaining = self.ticket_repository.reserve(
+            event_id, reserve_info.ticket_type_id, user_id,
+            reserve_info.quantity)
+
+        return Reservation(**reservation.model_dump(), remaining=remaining)
+
+    def cancel_reservation(self, event_id: UUID, reservation_id: UUID,
+                           user_id: UUID) -> Optional[int]:
+        return self.ticket_repository.cancel_reservation(
+            event_id, reservation_id, user_id)
@@ -4,14 +4,163 @@
 """User Services"""
 
 
+import logging
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from app.core.cache import PrincipalCache, ResponseCache
+from app.core.exceptions import NotFoundError
+from app.core.loader import entity_loader
 from app.repository.user_repository import UserRepository
 from app.services.base_service import BaseService
+from app.services.event_service import EVENTS_CACHE_NAMESPACE
+from app.util.jobs import jobs
+from app.util.utils import normalize_email
+
+logger = logging.getLogger(__name__)
 
 
 class UserService(BaseService):
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository,
+                 cache: Optional[ResponseCache] = None,
+                 principal_cache: Optional[PrincipalCache] = None):
         self.user_repository = user_repository
+        self.cache = cache
+        self.principal_cache = principal_cache
         super().__init__(user_repository)
 
+    def _invalidate_events(self) -> None:
+        # a user's events go with them
+        if self.cache is not None:
+            self.cache.invalidate(EVENTS_CACHE_NAMESPACE)
+
+    def _invalidate_principals(self, *user_ids) -> None:
+        if self.principal_cache is not None:
+            self.principal_cache.invalidate(*user_ids)
+
+    def _invalidate_users(self, *user_ids) -> None:
+        # the cached events embed their owner, whose fields an update may
+        # change, updated_at at least
+        self._invalidate_principals(*user_ids)
+        self._invalidate_events()
+
+    def _get_principal(self, user_id: str):
+        try:
+            return self.get_by_id(user_id)
+        except NotFoundError:
+            # deleted since the token was issued
+            return None
+
+    def get_principal(self, user_id: str,
+                      token_expires_at: Optional[float] = None):
+        """
+        The user a token was issued to, cached up to its expiry, or None
+        when there is no such user
+        """
+        if self.principal_cache is None:
+            return self._get_principal(user_id)
+
+        user = self.principal_cache.get_or_set(
+            user_id, token_expires_at, lambda: self._get_principal(user_id))
+
+        if user is None:
+            return None
+
+        # the copy is the request's own, so later loads of the user within
+        # the request may share it
+        loader = entity_loader()
+
+        if loader is not None:
+            loader.prime(user)
+
+        return user
+
+    def _normalize(self, schema):
+        if getattr(schema, "email", None):
+            schema.email = normalize_email(schema.email)
+
+        return schema
+
+    def patch(self, id: UUID, schema):
+        try:
+            return super().patch(id, self._normalize(schema))
+        finally:
+            self._invalidate_users(id)
+
+    async def async_patch(self, id: UUID, schema):
+        try:
+            return await super().async_patch(id, self._normalize(schema))
+        finally:
+            self._invalidate_users(id)
+
+    def patch_attr(self, id: UUID, attr: str, value):
+        try:
+            return super().patch_attr(id, attr, value)
+        finally:
+            self._invalidate_users(id)
+
+    def put_update(self, id: UUID, schema):
+        try:
+            return super().put_update(id, self._normalize(schema))
+        finally:
+            self._invalidate_users(id)
+
+    def bulk_patch(self, schemas):
+        try:
+            return super().bulk_patch(schemas)
+        finally:
+            self._invalidate_users(*(schema.id for schema in schemas))
+
+    def bulk_remove(self, ids):
+        try:
+            return super().bulk_remove(ids)
+        finally:
+            self._invalidate_principals(*ids)
+            self._invalidate_events()
+
     def remove_by_id(self, user_id: str):
-        return self.user_repository.delete_by_id(user_id)
+        try:
+            self.user_repository.delete_by_id(user_id)
+        finally:
+            self._invalidate_principals(user_id)
+
+        self._invalidate_events()
+
+    def count_events(self, user_id: str) -> int:
+        return self.user_repository.count_user_events(user_id)
+
+    def start_remove_job(self, user_id: str) -> Dict[str, Any]:
+        """
+        Deactivates the user and registers the job deleting them, to be run
+        in the background by `run_remove_job`
+        """
+        self.patch_attr(UUID(user_id), "is_active", False)
+
+        return jobs.create("delete_user", user_id=user_id,
+                           total=self.count_events(user_id), deleted=0)
+
+    def run_remove_job(self, job_id: str, user_id: str) -> None:
+        jobs.update(job_id, status="running")
+
+        try:
+            deleted = self.user_repository.delete_by_id_in_batches(
+                user_id,
+                progress=lambda deleted: jobs.update(job_id, deleted=deleted))
+        except Exception as e:
+            logger.exception("deleting user %s failed", user_id)
+
+            jobs.update(job_id, status="failed", error=str(e))
+            return
+        finally:
+            self._invalidate_principals(user_id)
+            self._invalidate_events()
+
+        jobs.update(job_id, status="done", deleted=deleted)
+
+    async def async_remove_by_id(self, user_id: str):
+        try:
+            await self.user_repository.async_delete_by_id(user_id)
+        finally:
+            self._invalidate_principals(user_id)
+
+        self._invalidate_events()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# File: cursor.py
+# Author: Oluwatobiloba Light
+"""Cursor"""
+
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Sequence
+from uuid import UUID
+
+from sqlmodel.sql.sqltypes import GUID
+
+from app.core.exceptions import ValidationError
+
+
+def encode_cursor(ordering: str, values: Sequence[Any]) -> str:
+    """
+    Encodes the ordering and the keyset values of the last row of a page
+    into an opaque, url safe cursor.
+    """
+    payload = json.dumps({"o": ordering, "v": list(values)},
+                         default=str, separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: str) -> List[Any]:
+    """
+    Decodes a cursor made by `encode_cursor` and returns its keyset values.
+    The cursor must have been issued for the same ordering.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+        values = payload["v"]
+        cursor_ordering = payload["o"]
+    except (ValueError, TypeError, KeyError):
+        raise ValidationError(detail="Invalid cursor")
+
+    if cursor_ordering != ordering:
+        raise ValidationError(
+            detail="Cursor was issued for a different ordering")
+
+    return values
+
+
+def parse_cursor_value(column_type: Any, value: Any) -> Any:
+    """Converts a decoded cursor value back to the column's python type"""
+    if value is None:
+        return None
+
+    try:
+        # sqlmodel's GUID has no python type, but holds uuids
+        python_type = UUID if isinstance(column_type, GUID) else \
+            column_type.python_type
+    except NotImplementedError:
+        # other custom types convert strings on bind
+        return value
+
+    try:
+        if issubclass(python_type, UUID):
+            return UUID(value)
+        if issubclass(python_type, datetime):
+            return datetime.fromisoformat(value)
+        if issubclass(python_type, date):
+            return date.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise ValidationError(detail="Invalid cursor")
+
+    return value
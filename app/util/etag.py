@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# File: etag.py
+# Author: Oluwatobiloba Light
+"""ETag and conditional requests"""
+
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response, status
+
+
+def compute_etag(*parts: Any) -> str:
+    """Strong ETag over the given parts of a representation"""
+    payload = json.dumps(parts, sort_keys=True, default=str,
+                         separators=(",", ":"))
+
+    return '"' + hashlib.sha1(payload.encode()).hexdigest() + '"'
+
+
+def latest(values: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    values = [value for value in values if value is not None]
+
+    return max(values) if values else None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # naive timestamps are stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str,
+                    last_modified: Optional[datetime] = None) -> bool:
+    """
+    Whether the client's copy is current. If-Modified-Since is only
+    considered without If-None-Match.
+    """
+    if_none_match = request.headers.get("if-none-match")
+
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+
+        # If-None-Match uses the weak comparison
+        return etag in {tag.strip().removeprefix("W/")
+                        for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    # HTTP dates have a resolution of one second
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def set_validators(response: Response, etag: str,
+                   last_modified: Optional[datetime] = None) -> None:
+    response.headers["ETag"] = etag
+
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(
+            _as_utc(last_modified), usegmt=True)
+
+
+def not_modified(etag: str,
+                 last_modified: Optional[datetime] = None) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+
+    set_validators(response, etag, last_modified)
+
+    return response
@@ -4,66 +4,252 @@
 """Google Auth"""
 
 
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import logging
 import os
-from typing import Any, Mapping, Optional, Tuple
+import re
+import secrets
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
 import google.auth
 import google.auth.exceptions
-import google.auth.transport
-import google.auth.transport.requests
-from google_auth_oauthlib.flow import Flow
-import oauthlib
-import oauthlib.oauth2.rfc6749
-import google.oauth2.id_token
+import google.auth.jwt
+import httpx
 
+from app.core.cache import CacheBackend
 from app.core.config import configs
 
 
-flow = Flow.from_client_secrets_file(
-    client_secrets_file=configs.GOOGLE_CLIENT,
-    redirect_uri=configs.GOOGLE_REDIRECT_URI,
-    scopes=configs.GOOGLE_SCOPES)
+logger = logging.getLogger(__name__)
 
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
 
-def get_google_auth_state() -> Tuple[str, str]:
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+@functools.lru_cache(maxsize=None)
+def google_client_config() -> Dict[str, Any]:
+    """The client secrets file, read once"""
+    with open(configs.GOOGLE_CLIENT) as client_secrets:
+        client_config = json.load(client_secrets)
+
+    return client_config.get("web") or client_config["installed"]
+
+
+class OAuthStateStore:
+    """
+    The state of each login in progress, its PKCE verifier by OAuth state,
+    kept server side until the callback or for the TTL. Each login has its
+    own, so logins run concurrently.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(state: str) -> str:
+        return f"oauth_state:{state}"
+
+    def create(self) -> Tuple[str, str]:
+        """Returns a new state and its code verifier"""
+        state = secrets.token_urlsafe(32)
+        code_verifier = secrets.token_urlsafe(64)
+
+        self.backend.set(self._key(state), code_verifier.encode(), self.ttl)
+
+        return state, code_verifier
+
+    def pop(self, state: str) -> Optional[str]:
+        """The code verifier of a state, which can only be used once"""
+        key = self._key(state)
+
+        code_verifier = self.backend.get(key)
+
+        if code_verifier is None:
+            return None
+
+        self.backend.delete(key)
+
+        return code_verifier.decode()
+
+
+def get_google_auth_state(states: OAuthStateStore) -> Tuple[str, str]:
     """"""
-    authorization_url, state = flow.authorization_url(
+    client_config = google_client_config()
+
+    state, code_verifier = states.create()
+
+    code_challenge = base64.urlsafe_b64encode(
+        hashlib.sha256(code_verifier.encode()).digest()).decode().rstrip("=")
+
+    params = {
+        "response_type": "code",
+        "client_id": client_config["client_id"],
+        "redirect_uri": configs.GOOGLE_REDIRECT_URI,
+        "scope": " ".join(configs.GOOGLE_SCOPES),
+        "state": state,
         # Recommended, enable offline access so that you can refresh an access token without
         # re-prompting the user for permission. Recommended for web server apps.
-        access_type='offline',
+        "access_type": "offline",
         # # Optional, enable incremental authorization. Recommended as a best practice.
-        include_granted_scopes='true',
-        # # Recommended, state value can increase your assurance that an incoming connection is the result
-        # # of an authentication request.
-        # # state=state,
-        # # Optional, if your application knows which user is trying to authenticate, it can use this
-        # # parameter to provide a hint to the Google Authentication Server.
-        # login_hint='hint@example.com',
-        # # Optional, set prompt to 'consent' will prompt the user for consent
-        # prompt='consent'
-    )
+        "include_granted_scopes": "true",
+        "code_challenge": code_challenge,
+        "code_challenge_method": "S256",
+    }
+
+    authorization_url = client_config["auth_uri"] + "?" + urlencode(params)
+
     return (authorization_url, state)
 
 
-def google_auth_flow(code: str):
-    """"""
-    try:
-        flow.fetch_token(code=code)
+def http_client() -> httpx.AsyncClient:
+    """Pooled client for the calls to Google, kept for the process"""
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=configs.GOOGLE_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=configs.GOOGLE_HTTP_MAX_CONNECTIONS))
+
+    return _http_client
+
 
-        return flow
-    except (oauthlib.oauth2.rfc6749.errors.InvalidGrantError, ) as e:
+class GoogleCertificates:
+    """
+    Google's ID token signing certificates, kept for the max-age of their
+    response. Near expiry they are refreshed in the background while the
+    current ones are served, so logins only wait on the first fetch.
+    """
+
+    def __init__(self, url: str, default_max_age: int,
+                 refresh_before: int) -> None:
+        self.url = url
+        self.default_max_age = default_max_age
+        self.refresh_before = refresh_before
+        self.fetches = 0
+        self._certificates: Optional[Dict[str, str]] = None
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh: Optional[asyncio.Task] = None
+
+    def _max_age(self, response: httpx.Response) -> int:
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+
+        return int(match.group(1)) if match else self.default_max_age
+
+    async def _fetch(self) -> Dict[str, str]:
+        response = await http_client().get(self.url)
+
+        response.raise_for_status()
+
+        self.fetches += 1
+        self._certificates = response.json()
+        self._expires_at = time.monotonic() + self._max_age(response)
+
+        return self._certificates
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self._fetch()
+        except httpx.HTTPError:
+            # the current certificates are served until they expire
+            logger.warning("refreshing the Google certificates failed",
+                           exc_info=True)
+
+    async def get(self) -> Dict[str, str]:
+        remaining = self._expires_at - time.monotonic()
+
+        if self._certificates is not None and remaining > 0:
+            if remaining < self.refresh_before and \
+                    (self._refresh is None or self._refresh.done()):
+                self._refresh = asyncio.create_task(
+                    self._refresh_in_background())
+
+            return self._certificates
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # concurrent logins wait on a single fetch
+        async with self._lock:
+            if self._certificates is not None and \
+                    self._expires_at > time.monotonic():
+                return self._certificates
+
+            return await self._fetch()
+
+
+google_certificates = GoogleCertificates(
+    configs.GOOGLE_CERTS_URL, configs.GOOGLE_CERTS_DEFAULT_MAX_AGE,
+    configs.GOOGLE_CERTS_REFRESH_BEFORE)
+
+
+async def exchange_code(code: str, code_verifier: str) \
+        -> Optional[Dict[str, Any]]:
+    """
+    Exchanges an authorization code, with the PKCE verifier of its login,
+    for Google's token response, or None when Google refuses it
+    """
+    client_config = google_client_config()
+
+    data = {
+        "grant_type": "authorization_code",
+        "code": code,
+        "client_id": client_config["client_id"],
+        "client_secret": client_config["client_secret"],
+        "redirect_uri": configs.GOOGLE_REDIRECT_URI,
+        "code_verifier": code_verifier,
+    }
+
+    response = await http_client().post(
+        configs.GOOGLE_TOKEN_URI or client_config["token_uri"], data=data,
+        headers={"Accept": "application/json"})
+
+    if response.status_code != 200:
+        logger.info("Google refused the authorization code: %s",
+                    response.text)
         return None
 
+    return response.json()
 
-def verify_google_token(id_token: Any) -> Optional[Mapping[str, Any]]:
+
+def session_credentials(token: Mapping[str, Any]) -> Dict[str, Any]:
+    """The credentials of a token response, as kept in the session"""
+    client_config = google_client_config()
+
+    return {
+        'token': token.get("access_token"),
+        'refresh_token': token.get("refresh_token"),
+        'token_uri': client_config["token_uri"],
+        'client_id': client_config["client_id"],
+        'client_secret': client_config["client_secret"],
+        'scopes': token["scope"].split() if token.get("scope")
+        else configs.GOOGLE_SCOPES,
+    }
+
+
+async def verify_google_token(id_token: Any) -> Optional[Mapping[str, Any]]:
     """"""
-    token_request = google.auth.transport.requests.Request()
+    if not id_token:
+        return None
 
     try:
-        user_info = google.oauth2.id_token.verify_oauth2_token(
-            id_token=id_token, request=token_request,
+        user_info = google.auth.jwt.decode(
+            id_token, certs=await google_certificates.get(),
             audience=configs.GOOGLE_CLIENT_ID)
+    except (ValueError, google.auth.exceptions.GoogleAuthError) as e:
+        return None
 
-        return user_info
-    except (google.auth.exceptions.InvalidValue,
-            google.auth.exceptions.InvalidOperation) as e:
+    if user_info.get("iss") not in GOOGLE_ISSUERS:
         return None
+
+    return user_info
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# File: jobs.py
+# Author: Oluwatobiloba Light
+"""Background jobs"""
+
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from cachetools import TTLCache
+
+from app.core.config import configs
+
+
+class JobRegistry:
+    """
+    In-process registry of background jobs and their progress. Each worker
+    keeps the jobs it runs, so a job is only found on the worker that
+    created it; deployments with several workers route the polls of a job
+    to its worker, e.g by sticky sessions.
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self._jobs: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, **fields: Any) -> Dict[str, Any]:
+        job = {
+            "id": str(uuid4()),
+            "kind": kind,
+            "status": "pending",
+            "created_at": datetime.now().isoformat(),
+            **fields,
+        }
+
+        with self._lock:
+            self._jobs[job["id"]] = job
+
+        return dict(job)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+            if job is not None:
+                job.update(fields, updated_at=datetime.now().isoformat())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+            return dict(job) if job is not None else None
+
+
+jobs = JobRegistry(maxsize=configs.JOB_REGISTRY_SIZE, ttl=configs.JOB_TTL)
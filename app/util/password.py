@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# File: password.py
+# Author: Oluwatobiloba Light
+"""Password hashing"""
+
+
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import configs
+
+
+# hashes below the configured cost are upgraded on the next sign in
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto",
+                           bcrypt__rounds=configs.PASSWORD_BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) \
+        -> Tuple[bool, Optional[str]]:
+    """Whether the password matches, and its new hash if the hash is stale"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
@@ -4,6 +4,11 @@
 """Query Builder"""
 
 
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy import bindparam
 from sqlalchemy.sql.expression import and_
 
 SQLALCHEMY_QUERY_MAPPER = {
@@ -16,8 +21,15 @@ SQLALCHEMY_QUERY_MAPPER = {
 }
 
 
-def dict_to_sqlalchemy_filter_options(model_class, search_option_dict):
-    sql_alchemy_filter_options = []
+def parse_filter_options(model_class, search_option_dict) \
+        -> Tuple[tuple, Dict[str, Any]]:
+    """
+    Splits a search option dict into the shape of its filter, which is the
+    same for every dict with the same keys and operators, and the values to
+    bind into it.
+    """
+    shape = []
+    params: Dict[str, Any] = {}
 
     copied_dict = search_option_dict.copy()
 
@@ -29,13 +41,16 @@ def dict_to_sqlalchemy_filter_options(model_class, search_option_dict):
 
         option_from_dict = copied_dict.pop(key)
 
+        param_name = "f_" + key
+
         if type(option_from_dict) in [int, float]:
-            sql_alchemy_filter_options.append(attr == option_from_dict)
+            shape.append((key, "__eq__", param_name))
+            params[param_name] = option_from_dict
         elif type(option_from_dict) in [str]:
-            sql_alchemy_filter_options.append(
-                attr.like("%" + option_from_dict + "%"))
+            shape.append((key, "like", param_name))
+            params[param_name] = "%" + option_from_dict + "%"
         elif type(option_from_dict) in [bool]:
-            sql_alchemy_filter_options.append(attr.is_(option_from_dict))
+            shape.append((key, "is", option_from_dict))
 
     for custom_option in copied_dict:
         if "__" not in custom_option:
@@ -50,16 +65,117 @@ def dict_to_sqlalchemy_filter_options(model_class, search_option_dict):
 
         option_from_dict = copied_dict[custom_option]
 
+        param_name = "f_" + custom_option
+
         if command == "in":
-            sql_alchemy_filter_options.append(
-                attr.in_([option.strip() for option in option_from_dict.split(",")]))
+            shape.append((key, "in", param_name))
+            params[param_name] = [option.strip()
+                                  for option in option_from_dict.split(",")]
         elif command in SQLALCHEMY_QUERY_MAPPER.keys():
+            shape.append((key, SQLALCHEMY_QUERY_MAPPER[command], param_name))
+            params[param_name] = option_from_dict
+        elif command == "isnull":
+            shape.append((key, "isnull", bool(option_from_dict)))
+
+    return tuple(shape), params
+
+
+def build_filter_options(model_class, shape: tuple):
+    """Builds a filter shape into an expression with bound parameters"""
+    sql_alchemy_filter_options = []
+
+    for key, command, argument in shape:
+        attr = getattr(model_class, key)
+
+        if command == "like":
+            sql_alchemy_filter_options.append(attr.like(bindparam(argument)))
+        elif command == "is":
+            sql_alchemy_filter_options.append(attr.is_(argument))
+        elif command == "in":
             sql_alchemy_filter_options.append(
-                getattr(attr, SQLALCHEMY_QUERY_MAPPER[command])(option_from_dict))
+                attr.in_(bindparam(argument, expanding=True)))
         elif command == "isnull":
-            bool_command = "__eq__" if option_from_dict else "__ne__"
+            bool_command = "__eq__" if argument else "__ne__"
 
             sql_alchemy_filter_options.append(
                 getattr(attr, bool_command)(None))
+        else:
+            sql_alchemy_filter_options.append(
+                getattr(attr, command)(bindparam(argument)))
 
     return and_(True, *sql_alchemy_filter_options)
+
+
+def dict_to_sqlalchemy_filter_options(model_class, search_option_dict):
+    shape, params = parse_filter_options(model_class, search_option_dict)
+
+    return build_filter_options(model_class, shape).params(params)
+
+
+def to_fts5_query(search_term: str) -> str:
+    """
+    Turns free text into an FTS5 query that matches every word as a
+    prefix, quoting each word so user input cannot use FTS5 syntax.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"*'
+                    for word in search_term.split())
+
+
+def to_like_pattern(search_term: str, escape: str = "/") -> str:
+    """Turns free text into a LIKE pattern matching it as a substring"""
+    for special in (escape, "%", "_"):
+        search_term = search_term.replace(special, escape + special)
+
+    return "%" + search_term + "%"
+
+
+class StatementCache:
+    """
+    LRU cache of built statements. A cached statement carries bound
+    parameters instead of values, so it is reused for every request with
+    the same shape, and SQLAlchemy's memoized cache key lets it skip
+    recompilation as well.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            statement = self._statements.get(key)
+
+            if statement is not None:
+                self._statements.move_to_end(key)
+                self.hits += 1
+                return statement
+
+            self.misses += 1
+
+        statement = build()
+
+        with self._lock:
+            self._statements[key] = statement
+
+            if len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+
+        return statement
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._statements),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# File: serializers.py
+# Author: Oluwatobiloba Light
+"""Serializers"""
+
+
+from typing import Any, Dict, List, Optional
+
+from app.schema.category_schema import Category
+from app.schema.event_schema import Event_
+from app.schema.user_schema import User_
+
+
+# the response schemas stay the source of the fields, the rows are read once
+# into plain dicts which ORJSONResponse encodes without validating again
+CATEGORY_FIELDS = tuple(Category.model_fields)
+
+OWNER_FIELDS = tuple(User_.model_fields)
+
+EVENT_FIELDS = tuple(field for field in Event_.model_fields
+                     if field not in ("categories", "owner"))
+
+
+def _fields(row, fields: tuple) -> Dict[str, Any]:
+    return {field: getattr(row, field, None) for field in fields}
+
+
+def serialize_category(category) -> Dict[str, Any]:
+    return _fields(category, CATEGORY_FIELDS)
+
+
+def serialize_owner(owner) -> Optional[Dict[str, Any]]:
+    if owner is None:
+        return None
+    return _fields(owner, OWNER_FIELDS)
+
+
+def serialize_event(event, owner=None) -> Dict[str, Any]:
+    """Serializes an event with its categories and owner"""
+    serialized = _fields(event, EVENT_FIELDS)
+
+    serialized["categories"] = [serialize_category(category)
+                                for category in event.categories]
+    serialized["owner"] = serialize_owner(owner or event.owner)
+
+    return serialized
+
+
+def serialize_events(events) -> List[Dict[str, Any]]:
+    return [serialize_event(event) for event in events]
+
+
+def serialize_events_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Serializes the founds and search options of an events listing"""
+    return {
+        "founds": serialize_events(result["founds"]),
+        "search_options": result["search_options"],
+    }
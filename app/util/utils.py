@@ -30,3 +30,8 @@ def get_remaining_minutes(user_info: Any) -> float:
 
 def create_named_tuple(*values):
     return namedtuple('NamedTuple', values)(*values)
+
+
+def normalize_email(email: str) -> str:
+    """Emails are compared and stored lower cased"""
+    return email.strip().lower()
@@ -10,6 +10,7 @@ from app.core.config import configs
 from app.model.user import User
 from app.model.event import Event
 from app.model.category import Category
+from app.model.ticket import Reservation, TicketType
 
 cmd_kwargs = context.get_x_argument(as_dictionary=True)
 if "ENV" in cmd_kwargs:
@@ -0,0 +1,35 @@
+"""Users email lower
+
+Revision ID: 2f6a8d4c1e90
+Revises: 5b1e7c3a9d42
+Create Date: 2026-10-18 16:20:43.718215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6a8d4c1e90'
+down_revision = '5b1e7c3a9d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # fails on addresses differing only by case, which are to be merged by
+    # hand before the index can be unique
+    op.execute("UPDATE users SET email = lower(email) "
+               "WHERE email <> lower(email)")
+
+    with op.get_context().autocommit_block():
+        op.create_index('uq_users_email_lower', 'users',
+                        [sa.text('lower(email)')], unique=True,
+                        if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_users_email_lower', table_name='users',
+                      if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""Query indexes
+
+Revision ID: 3c9a5f1d2b7e
+Revises: e84934bddb12
+Create Date: 2026-10-18 10:12:41.508113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a5f1d2b7e'
+down_revision = 'e84934bddb12'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_events_owner_id', 'events', ['owner_id']),
+    ('ix_events_date', 'events', ['date']),
+    ('ix_events_created_at', 'events', ['created_at']),
+    ('ix_event_categories_category_id', 'event_categories', ['category_id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, and
+    # does not lock the tables against writes while the index builds
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True,
+                          postgresql_concurrently=True)
@@ -0,0 +1,51 @@
+"""Cascade deletes
+
+Revision ID: 5b1e7c3a9d42
+Revises: 8e2d41c7a9f3
+Create Date: 2026-10-18 14:05:17.220431
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e7c3a9d42'
+down_revision = '8e2d41c7a9f3'
+branch_labels = None
+depends_on = None
+
+
+# the constraints were created unnamed, so they carry postgres' default names
+FOREIGN_KEYS = [
+    ('events_owner_id_fkey', 'events', 'owner_id', 'users'),
+    ('event_categories_event_id_fkey', 'event_categories', 'event_id',
+     'events'),
+]
+
+
+def _replace_foreign_keys(on_delete):
+    for name, table, column, referred_table in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+
+        if op.get_context().dialect.name == 'postgresql':
+            # NOT VALID skips the scan of existing rows under the exclusive
+            # lock, VALIDATE then checks them under a weaker one
+            op.execute(
+                f'ALTER TABLE {table} ADD CONSTRAINT {name} '
+                f'FOREIGN KEY ({column}) REFERENCES {referred_table} (id)'
+                + (f' ON DELETE {on_delete}' if on_delete else '')
+                + ' NOT VALID')
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}')
+        else:
+            op.create_foreign_key(name, table, referred_table, [column],
+                                  ['id'], ondelete=on_delete)
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_keys(None)
@@ -0,0 +1,59 @@
+"""Event search
+
+Revision ID: 8e2d41c7a9f3
+Revises: 3c9a5f1d2b7e
+Create Date: 2026-10-18 11:02:17.264930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from app.model.event import EVENT_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2d41c7a9f3'
+down_revision = '3c9a5f1d2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect_name = op.get_bind().dialect.name
+
+    statements = EVENT_SEARCH_DDL.get(dialect_name, [])
+
+    if dialect_name == "postgresql":
+        # GIN builds on a live table must not block writes
+        with op.get_context().autocommit_block():
+            for statement in statements:
+                op.execute(statement.replace(
+                    "CREATE INDEX", "CREATE INDEX CONCURRENTLY"))
+        return
+
+    for statement in statements:
+        op.execute(statement)
+
+    if dialect_name == "sqlite":
+        # index the rows that existed before the triggers
+        op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS "
+                       "ix_events_location_trgm")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_events_name_trgm")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS "
+                       "ix_events_search_vector")
+            op.execute("ALTER TABLE events DROP COLUMN IF EXISTS "
+                       "search_vector")
+    elif dialect_name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS events_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS events_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS events_fts_ai")
+        op.execute("DROP TABLE IF EXISTS events_fts")
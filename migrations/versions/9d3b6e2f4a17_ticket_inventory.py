@@ -0,0 +1,68 @@
+"""Ticket inventory
+
+Revision ID: 9d3b6e2f4a17
+Revises: 2f6a8d4c1e90
+Create Date: 2026-10-18 17:05:12.402561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b6e2f4a17'
+down_revision = '2f6a8d4c1e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ticket_types',
+    sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('event_id', sa.Uuid(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('remaining', sa.Integer(), nullable=False),
+    sa.Column('max_per_order', sa.Integer(), nullable=False),
+    sa.CheckConstraint('remaining >= 0 AND remaining <= capacity',
+                       name='ck_ticket_types_remaining'),
+    sa.CheckConstraint('max_per_order > 0',
+                       name='ck_ticket_types_max_per_order'),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ticket_types_event_id', 'ticket_types', ['event_id'])
+
+    op.create_table('reservations',
+    sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('ticket_type_id', sa.Uuid(), nullable=False),
+    sa.Column('event_id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.CheckConstraint('quantity > 0', name='ck_reservations_quantity'),
+    sa.ForeignKeyConstraint(['ticket_type_id'], ['ticket_types.id'],
+                            ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reservations_ticket_type_id', 'reservations',
+                    ['ticket_type_id'])
+    op.create_index('ix_reservations_event_id', 'reservations', ['event_id'])
+    op.create_index('ix_reservations_user_id', 'reservations', ['user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_reservations_user_id', table_name='reservations')
+    op.drop_index('ix_reservations_event_id', table_name='reservations')
+    op.drop_index('ix_reservations_ticket_type_id',
+                  table_name='reservations')
+    op.drop_table('reservations')
+    op.drop_index('ix_ticket_types_event_id', table_name='ticket_types')
+    op.drop_table('ticket_types')
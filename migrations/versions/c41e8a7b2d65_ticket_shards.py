@@ -0,0 +1,46 @@
+"""Ticket shards
+
+Revision ID: c41e8a7b2d65
+Revises: 9d3b6e2f4a17
+Create Date: 2026-10-18 18:42:37.115093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e8a7b2d65'
+down_revision = '9d3b6e2f4a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('events', sa.Column('ticket_shards', sa.Integer(),
+                                      server_default='1', nullable=False))
+    op.add_column('reservations', sa.Column('shard', sa.Integer(),
+                                            nullable=True))
+
+    op.create_table('ticket_type_shards',
+    sa.Column('ticket_type_id', sa.Uuid(), nullable=False),
+    sa.Column('shard', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('remaining', sa.Integer(), nullable=False),
+    sa.CheckConstraint('remaining >= 0',
+                       name='ck_ticket_type_shards_remaining'),
+    sa.ForeignKeyConstraint(['ticket_type_id'], ['ticket_types.id'],
+                            ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ticket_type_id', 'shard')
+    )
+
+
+def downgrade():
+    # join the shards back into their ticket types first
+    op.execute("UPDATE ticket_types SET remaining = remaining + ("
+               "SELECT coalesce(sum(remaining), 0) FROM ticket_type_shards "
+               "WHERE ticket_type_id = ticket_types.id)")
+
+    op.drop_table('ticket_type_shards')
+    op.drop_column('reservations', 'shard')
+    op.drop_column('events', 'ticket_shards')
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# File: bench_login.py
+# Author: Oluwatobiloba Light
+"""
+Sign in lookups of mixed case emails against a large users table, through
+the lower(email) index and without it, and whole sign ins.
+
+    python -m tests.bench_login --users 200000 --lookups 2000
+
+Runs on TEST_DATABASE_URI when set, or else on a SQLite file.
+"""
+
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+
+from sqlalchemy import insert, text
+from sqlmodel import SQLModel
+
+from app.core.database import Database
+from app.model.ticket import Reservation, TicketType  # noqa: F401
+from app.model.user import User
+from app.repository.user_repository import UserRepository
+from app.schema.auth_schema import SignIn
+from app.services.auth_service import AuthService
+from app.util.password import hash_password
+
+
+PASSWORD = "password"
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    return latencies[min(int(len(latencies) * fraction),
+                         len(latencies) - 1)] * 1000
+
+
+def seed_users(db: Database, users: int, batch: int = 10000) -> None:
+    now = datetime.utcnow()
+
+    # one hash for all, hashing each would take longer than the bench
+    password = hash_password(PASSWORD)
+
+    with db.session() as session:
+        for start in range(0, users, batch):
+            session.execute(insert(User), [
+                dict(id=uuid4(), email=f"user-{index}@example.com",
+                     first_name="First", last_name="Last", password=password,
+                     is_active=True, is_admin=False, created_at=now,
+                     updated_at=now)
+                for index in range(start, min(start + batch, users))])
+
+        session.commit()
+
+
+def timed(run, emails: List[str]) -> List[float]:
+    latencies = []
+
+    for email in emails:
+        started = time.perf_counter()
+
+        run(email)
+
+        latencies.append(time.perf_counter() - started)
+
+    return sorted(latencies)
+
+
+def report(name: str, latencies: List[float]) -> None:
+    print(f"{name}: {len(latencies) / sum(latencies):.0f}/s, "
+          f"p50 {percentile(latencies, .5):.2f} ms, "
+          f"p99 {percentile(latencies, .99):.2f} ms")
+
+
+def bench(url: str, users: int, lookups: int, sign_ins: int) -> None:
+    db = Database(url)
+
+    SQLModel.metadata.drop_all(db._engine)
+    SQLModel.metadata.create_all(db._engine)
+
+    started = time.perf_counter()
+
+    seed_users(db, users)
+
+    print(f"seeded {users} users in {time.perf_counter() - started:.1f} s")
+
+    repository = UserRepository(db.session)
+
+    # sign ins come in whatever case the user typed
+    emails = [f"User-{random.randrange(users)}@Example.COM"
+              for _ in range(lookups)]
+
+    def lookup(email):
+        assert repository.get_by_email(email)
+
+    report("lookup by lower(email) index", timed(lookup, emails))
+
+    service = AuthService(repository)
+
+    def sign_in(email):
+        service.sign_in(SignIn(email=email, password=PASSWORD))
+
+    report("sign in", timed(sign_in, emails[:sign_ins]))
+
+    with db._engine.begin() as connection:
+        connection.execute(text("DROP INDEX uq_users_email_lower"))
+
+    # pooled connections may keep the plans of the dropped index
+    db._engine.dispose()
+
+    report("lookup without the index",
+           timed(lookup, emails[:max(lookups // 100, 10)]))
+
+    SQLModel.metadata.drop_all(db._engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--sign-ins", type=int, default=50)
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = os.getenv("TEST_DATABASE_URI",
+                        f"sqlite:///{os.path.join(directory, 'bench.db')}")
+
+        bench(url, args.users, args.lookups, args.sign_ins)
+
+
+if __name__ == "__main__":
+    main()
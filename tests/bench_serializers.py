@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# File: bench_serializers.py
+# Author: Oluwatobiloba Light
+"""
+Time to serialize an events listing through its response model with
+jsonable_encoder and JSONResponse, against the plain dicts of
+app.util.serializers encoded by ORJSONResponse.
+
+    python -m tests.bench_serializers --page-sizes 20 200 --rounds 50
+
+Runs on TEST_DATABASE_URI when set, or else on a SQLite file.
+"""
+
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlmodel import SQLModel
+
+from app.core.database import Database
+from app.model.ticket import Reservation, TicketType  # noqa: F401
+from app.repository.event_repository import EventRepository
+from app.schema.base_schema import SearchOptions
+from app.schema.event_schema import Event_, FindEventQueryOptions, \
+    FindEventsResult
+from app.util.serializers import serialize_events_result
+from tests.conftest import seed
+
+
+def response_model(result) -> JSONResponse:
+    # as FastAPI validates a returned result against the response model
+    validated = FindEventsResult(
+        founds=[Event_.model_validate(event, from_attributes=True)
+                for event in result["founds"]],
+        search_options=SearchOptions.model_validate(
+            result["search_options"]))
+
+    return JSONResponse(jsonable_encoder(validated))
+
+
+def plain_dicts(result) -> ORJSONResponse:
+    return ORJSONResponse(serialize_events_result(result))
+
+
+def bench(url: str, page_sizes: list, rounds: int) -> None:
+    db = Database(url)
+
+    SQLModel.metadata.drop_all(db._engine)
+    SQLModel.metadata.create_all(db._engine)
+
+    seed(db, users=20, events=max(page_sizes), categories=8)
+
+    repository = EventRepository(db.session)
+
+    for page_size in page_sizes:
+        result = repository.read_by_options(
+            FindEventQueryOptions(page_size=page_size))
+
+        # both give the same document
+        assert json.loads(response_model(result).body) == \
+            json.loads(plain_dicts(result).body)
+
+        for name, serialize in (("response_model", response_model),
+                                ("orjson", plain_dicts)):
+            body = serialize(result).body
+
+            started = time.perf_counter()
+
+            for _ in range(rounds):
+                serialize(result)
+
+            elapsed = (time.perf_counter() - started) / rounds
+
+            print(f"page_size={page_size} {name}: {elapsed * 1000:.2f} ms, "
+                  f"{len(body)} bytes")
+
+    SQLModel.metadata.drop_all(db._engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+",
+                        default=[20, 200])
+    parser.add_argument("--rounds", type=int, default=50)
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = os.getenv("TEST_DATABASE_URI",
+                        f"sqlite:///{os.path.join(directory, 'bench.db')}")
+
+        bench(url, args.page_sizes, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# File: bench_ticket_shards.py
+# Author: Oluwatobiloba Light
+"""
+Reservations per second of a hot ticket type on one counter against its
+shards, and the availability listing with and without its cache.
+
+    python -m tests.bench_ticket_shards --shards 1 16 --buyers 8
+
+Runs on TEST_DATABASE_URI when set, or else on a SQLite file, whose writes
+are serialized whatever the shards.
+"""
+
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from typing import List
+
+from sqlalchemy import func, select
+from sqlmodel import SQLModel
+
+from app.core.cache import MemoryCacheBackend, ResponseCache
+from app.core.database import Database
+from app.core.exceptions import ConflictError
+from app.model.ticket import Reservation
+from app.repository.ticket_repository import TicketRepository
+from app.schema.ticket_schema import CreateTicketType
+from app.services.ticket_service import TicketService
+from tests.conftest import seed
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    return latencies[min(int(len(latencies) * fraction),
+                         len(latencies) - 1)] * 1000
+
+
+def bench(url: str, shards: int, buyers: int, tickets: int,
+          attempts: int) -> None:
+    db = Database(url)
+
+    SQLModel.metadata.drop_all(db._engine)
+    SQLModel.metadata.create_all(db._engine)
+
+    ids = seed(db, users=buyers, events=1)
+
+    event_id, owner_id = ids["events"][0], ids["users"][0]
+
+    repository = TicketRepository(db.session)
+
+    ticket_type_id = repository.create_ticket_type(CreateTicketType(
+        name="General", price=Decimal("25.00"), capacity=tickets,
+        max_per_order=4), event_id, owner_id).id
+
+    if shards > 1:
+        repository.set_ticket_shards(event_id, owner_id, shards)
+
+    held, latencies = [0], []
+    lock = threading.Lock()
+
+    def buy(user_id):
+        for _ in range(attempts // buyers):
+            started = time.perf_counter()
+
+            try:
+                repository.reserve(event_id, ticket_type_id, user_id, 1)
+                success = 1
+            except ConflictError:
+                success = 0
+
+            with lock:
+                held[0] += success
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=buy, args=(user_id,))
+               for user_id in ids["users"]]
+
+    started = time.perf_counter()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - started
+
+    with db.session() as session:
+        reserved = session.scalar(select(func.coalesce(
+            func.sum(Reservation.quantity), 0)))
+
+    ticket_type, sharded = repository.get_ticket_types(event_id)[0]
+
+    remaining = ticket_type.remaining + sharded
+
+    # a hold reserves exactly one ticket, and never one that is not there
+    assert reserved == held[0] <= tickets
+    assert reserved + remaining == tickets
+
+    latencies.sort()
+
+    print(f"shards={shards}: {len(latencies) / elapsed:.0f} holds/s, "
+          f"p50 {percentile(latencies, .5):.1f} ms, "
+          f"p99 {percentile(latencies, .99):.1f} ms, "
+          f"held {reserved}, remaining {remaining}")
+
+    for name, cache in (("uncached", None), ("cached", ResponseCache(
+            MemoryCacheBackend(max_entries=100, max_bytes=1 << 20),
+            ttl=2))):
+        service = TicketService(repository, cache)
+
+        started = time.perf_counter()
+
+        for _ in range(1000):
+            service.get_ticket_types(event_id)
+
+        print(f"  listing {name}: "
+              f"{(time.perf_counter() - started) / 1000 * 1e6:.0f} us")
+
+    SQLModel.metadata.drop_all(db._engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--buyers", type=int, default=8)
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--attempts", type=int, default=2400)
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = os.getenv("TEST_DATABASE_URI",
+                        f"sqlite:///{os.path.join(directory, 'bench.db')}")
+
+        for shards in args.shards:
+            bench(url, shards, args.buyers, args.tickets, args.attempts)
+
+
+if __name__ == "__main__":
+    main()
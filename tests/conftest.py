@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# File: conftest.py
+# Author: Oluwatobiloba Light
+"""Test fixtures"""
+
+
+import os
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+# the lowest bcrypt cost, the tests sign in often
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+
+from dependency_injector import providers
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
+
+from app.core.container import Container
+from app.core.database import Database
+from app.core.security import create_access_token
+from app.model.category import Category
+from app.model.event import Event, EventType
+from app.model.ticket import Reservation, TicketType  # noqa: F401
+from app.model.user import User
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    A database with the schema of the models, on TEST_DATABASE_URI when
+    set, e.g. a scratch Postgres database, or else a SQLite file
+    """
+    url = os.getenv("TEST_DATABASE_URI",
+                    f"sqlite:///{tmp_path / 'test.db'}")
+
+    db = Database(url)
+
+    SQLModel.metadata.create_all(db._engine)
+
+    yield db
+
+    SQLModel.metadata.drop_all(db._engine)
+
+
+@pytest.fixture
+def container(database):
+    """The app's container, wired on the test database"""
+    container = Container()
+    container.db.override(providers.Object(database))
+
+    yield container
+
+    container.password_hasher().shutdown()
+    container.unwire()
+
+
+@pytest.fixture
+def client(container):
+    """The app's routes on the test database"""
+    from app.api.routes import routers
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(routers)
+
+    return TestClient(app)
+
+
+def auth_headers(user_id, email: str = "user@example.com") -> dict:
+    """The Authorization header of an access token of the user"""
+    access_token, _ = create_access_token({
+        "id": str(user_id), "email": email, "name": "First Last",
+        "is_admin": False})
+
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def seed(db: Database, users: int = 4, events: int = 40,
+         categories: int = 4) -> dict:
+    """Users owning events, each event in one category"""
+    now = datetime.utcnow()
+
+    with db.session() as session:
+        seeded_categories = [
+            Category(id=uuid4(), name=f"category-{index}", created_at=now,
+                     updated_at=now)
+            for index in range(categories)]
+
+        seeded_users = [
+            User(id=uuid4(), email=f"user-{index}@example.com",
+                 first_name="First", last_name="Last", password="password",
+                 is_active=True, is_admin=False, created_at=now,
+                 updated_at=now)
+            for index in range(users)]
+
+        session.add_all(seeded_categories + seeded_users)
+
+        session.flush()
+
+        seeded_events = []
+
+        for index in range(events):
+            event = Event(id=uuid4(), name=f"event-{index}",
+                          description="description", location="location",
+                          image="image", date=date.today(),
+                          evt_type=EventType.public,
+                          owner_id=seeded_users[index % users].id,
+                          created_at=now + timedelta(seconds=index),
+                          updated_at=now)
+
+            event.categories.append(
+                seeded_categories[index % categories])
+
+            seeded_events.append(event)
+
+        session.add_all(seeded_events)
+
+        session.commit()
+
+        return {
+            "users": [user.id for user in seeded_users],
+            "events": [event.id for event in seeded_events],
+            "categories": [category.id for category in seeded_categories],
+        }
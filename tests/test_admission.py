@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# File: test_admission.py
+# Author: Oluwatobiloba Light
+"""Waiting room of the purchase routes"""
+
+
+import time
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from dependency_injector import providers
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core.admission import ALGORITHM, QUEUE_TOKEN_HEADER, \
+    QUEUE_TOKEN_TYPE, AdmissionController
+from app.core.config import configs
+from app.core.container import Container
+from app.core.security import create_access_token
+from app.repository.ticket_repository import TicketRepository
+from app.schema.ticket_schema import CreateTicketType
+from tests.conftest import seed
+
+
+def controller(burst: int = 1) -> AdmissionController:
+    # admits the burst, then nobody for the length of a test
+    return AdmissionController(rate=0.001, burst=burst, max_depth=100,
+                               token_ttl=300)
+
+
+def test_admitted_position_is_used_once():
+    admission = controller()
+    event_id, user_id = uuid4(), uuid4()
+
+    status = admission.admit(event_id, user_id, use=True)
+
+    assert status["admitted"]
+
+    replayed = admission.admit(event_id, user_id, status["token"], use=True)
+
+    # the replay queues again, behind the buyers let in meanwhile
+    assert replayed["position"] == 2
+    assert not replayed["admitted"]
+
+
+def test_released_position_is_admitted_again():
+    admission = controller()
+    event_id, user_id = uuid4(), uuid4()
+
+    status = admission.admit(event_id, user_id, use=True)
+
+    admission.release(event_id, status["position"])
+
+    again = admission.admit(event_id, user_id, status["token"], use=True)
+
+    assert again["admitted"] and again["position"] == status["position"]
+
+
+def test_token_is_bound_to_event_and_buyer():
+    admission = controller(burst=2)
+    event_id, user_id = uuid4(), uuid4()
+
+    token = admission.admit(event_id, user_id)["token"]
+
+    assert admission.admit(event_id, uuid4(), token)["position"] == 2
+    assert admission.admit(uuid4(), user_id, token)["position"] == 1
+    assert admission.admit(event_id, user_id, token)["position"] == 1
+
+
+def test_token_signed_with_app_secret_is_refused():
+    admission = controller(burst=2)
+    event_id, user_id = uuid4(), uuid4()
+
+    admission.admit(event_id, user_id)
+
+    epoch = admission._queues[str(event_id)].epoch
+
+    forged = jwt.encode({
+        "typ": QUEUE_TOKEN_TYPE, "evt": str(event_id), "sub": str(user_id),
+        "epoch": epoch, "pos": 1, "exp": int(time.time()) + 300,
+    }, configs.SECRET_KEY, algorithm=ALGORITHM)
+
+    # refused, the buyer joins again rather than holding the first place
+    assert admission.admit(event_id, user_id, forged)["position"] == 2
+
+
+@pytest.fixture
+def client(database):
+    ids = seed(database, users=2, events=1)
+
+    event_id, owner_id = ids["events"][0], ids["users"][0]
+
+    ticket_type = TicketRepository(database.session).create_ticket_type(
+        CreateTicketType(name="General", price=Decimal("25.00"),
+                         capacity=10, max_per_order=2), event_id, owner_id)
+
+    container = Container()
+    container.db.override(providers.Object(database))
+    container.admission.override(providers.Object(controller()))
+
+    from app.api.endpoints.event import router
+
+    app = FastAPI()
+    app.include_router(router)
+
+    access_token, _ = create_access_token({
+        "id": str(ids["users"][1]), "email": "user-1@example.com",
+        "name": "First Last", "is_admin": False})
+
+    yield (TestClient(app), f"/event/{event_id}/reserve", ticket_type.id,
+           {"Authorization": f"Bearer {access_token}"})
+
+    container.unwire()
+
+
+def test_reserve_replay_is_queued(client):
+    client, url, ticket_type_id, headers = client
+
+    def reserve(quantity, token=None):
+        return client.post(
+            url, json={"ticket_type_id": str(ticket_type_id),
+                       "quantity": quantity},
+            headers={**headers, QUEUE_TOKEN_HEADER: token} if token
+            else headers)
+
+    token = client.get(url.replace("/reserve", "/queue"),
+                       headers=headers).json()["token"]
+
+    # a failed purchase leaves the admission to retry with
+    assert reserve(3, token).status_code == 422
+    assert reserve(1, token).status_code == 200
+
+    replayed = reserve(1, token)
+
+    assert replayed.status_code == 429
+    assert replayed.headers[QUEUE_TOKEN_HEADER] != token
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# File: test_async_reads.py
+# Author: Oluwatobiloba Light
+"""Event reads on the async engine"""
+
+
+import asyncio
+
+import pytest
+from dependency_injector import providers
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from app.core.config import configs
+from app.core.database import Database, read_your_writes_scope
+from app.core.exceptions import NotFoundError
+from app.core.loader import entity_loader_scope
+from app.repository.event_repository import EventRepository
+from app.repository.user_repository import UserRepository
+from app.schema.event_schema import FindEventQueryOptions
+from tests.conftest import seed
+
+
+def make_database(tmp_path, replicas: int = 0) -> Database:
+    names = ["primary"] + [f"replica-{index}" for index in range(replicas)]
+
+    urls = [tmp_path / f"{name}.db" for name in names]
+
+    db = Database(f"sqlite:///{urls[0]}",
+                  async_db_url=f"sqlite+aiosqlite:///{urls[0]}",
+                  replica_urls=[f"sqlite:///{url}" for url in urls[1:]],
+                  async_replica_urls=[f"sqlite+aiosqlite:///{url}"
+                                      for url in urls[1:]])
+
+    # the replicas have the schema, but none of the rows
+    for engine in [db._engine, *db._replica_engines]:
+        SQLModel.metadata.create_all(engine)
+
+    return db
+
+
+def repository(db: Database) -> EventRepository:
+    return EventRepository(db.session, db.async_session, db.read_session,
+                           db.async_read_session)
+
+
+def test_async_reads_match_the_sync_ones(tmp_path):
+    db = make_database(tmp_path)
+    ids = seed(db, users=2, events=6, categories=2)
+    events = repository(db)
+
+    options = FindEventQueryOptions(page_size=4)
+
+    listing = events.get_events_by_user(options, ids["users"][0])
+    async_listing = asyncio.run(
+        events.async_get_events_by_user(options, ids["users"][0]))
+
+    assert [event.id for event in async_listing["founds"]] == \
+        [event.id for event in listing["founds"]]
+    assert async_listing["search_options"] == listing["search_options"]
+
+    event = asyncio.run(events.async_get_event_by_id(ids["events"][0]))
+
+    # loaded with the event, no lazy load is possible once awaited
+    assert event.owner.id == ids["users"][0]
+    assert [category.name for category in event.categories] == \
+        ["category-0"]
+
+
+def test_async_reads_go_to_the_replica_until_a_write(tmp_path):
+    db = make_database(tmp_path, replicas=1)
+    ids = seed(db, users=1, events=2)
+    events = repository(db)
+
+    async def reads():
+        with read_your_writes_scope():
+            with pytest.raises(NotFoundError):
+                await events.async_get_event_by_id(ids["events"][0])
+
+            assert (await events.async_read_by_options(
+                FindEventQueryOptions()))["founds"] == []
+
+            async with db.async_session() as session:
+                await session.execute(text("SELECT 1"))
+                await session.commit()
+
+            # the client's own write is not on the replica yet
+            return await events.async_get_event_by_id(ids["events"][0])
+
+    assert asyncio.run(reads()).id == ids["events"][0]
+
+
+def test_async_reads_are_shared_with_the_request(tmp_path):
+    db = make_database(tmp_path)
+    ids = seed(db, users=1, events=2)
+    events = repository(db)
+
+    async def reads():
+        with entity_loader_scope() as loader:
+            event = await events.async_get_event_by_id(ids["events"][0])
+
+            assert events.read_by_id(event.id) is event
+            assert UserRepository(db.session).read_by_id(event.owner_id) is \
+                event.owner
+
+            return loader.stats()
+
+    assert asyncio.run(reads())["queries"] == 0
+
+
+def test_event_endpoints_on_the_async_engine(tmp_path, monkeypatch,
+                                             container, client):
+    db = make_database(tmp_path, replicas=1)
+    ids = seed(db, users=1, events=2)
+
+    # the async reads have a replica of their own, the primary's file,
+    # which has the rows the sync replica has not
+    primary = tmp_path / "primary.db"
+
+    db = Database(f"sqlite:///{primary}",
+                  async_db_url=f"sqlite+aiosqlite:///{primary}",
+                  replica_urls=[f"sqlite:///{tmp_path / 'replica-0.db'}"],
+                  async_replica_urls=[f"sqlite+aiosqlite:///{primary}"])
+
+    container.db.override(providers.Object(db))
+    container.event_cache.override(providers.Object(None))
+
+    urls = ["/event/all", f"/event/{ids['users'][0]}/all"]
+
+    with read_your_writes_scope():
+        monkeypatch.setattr(configs, "DB_ASYNC", True)
+
+        assert [len(client.get(url).json()["founds"]) for url in urls] == \
+            [2, 2]
+        assert client.get(f"/event/{ids['events'][0]}").status_code == 200
+
+        monkeypatch.setattr(configs, "DB_ASYNC", False)
+
+        assert [len(client.get(url).json()["founds"]) for url in urls] == \
+            [0, 0]
+        assert client.get(f"/event/{ids['events'][0]}").status_code == 404
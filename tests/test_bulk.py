@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# File: test_bulk.py
+# Author: Oluwatobiloba Light
+"""Bulk writes of the base repository"""
+
+
+import time
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel
+
+from app.model.user import User
+from app.repository.user_repository import UserRepository
+
+
+class UpdateName(BaseModel):
+    id: UUID
+    first_name: str
+
+
+def test_bulk_create_gives_each_row_an_id(database):
+    repository = UserRepository(database.session)
+
+    now = datetime.utcnow()
+
+    # as the class-level default id of a table model would
+    shared = uuid4()
+
+    created = repository.bulk_create([
+        User(id=shared, email=f"bulk-{index}@example.com", first_name="First",
+             last_name="Last", password="password", phone_no=None,
+             is_active=True, is_admin=False, created_at=now, updated_at=now)
+        for index in range(3)])
+
+    assert len({user.id for user in created}) == 3
+    assert shared not in {user.id for user in created}
+
+
+def test_bulk_update_stamps_updated_at(database):
+    repository = UserRepository(database.session)
+
+    now = datetime.utcnow()
+
+    created = repository.bulk_create([
+        User(id=uuid4(), email=f"bulk-{index}@example.com",
+             first_name="First", last_name="Last", password="password",
+             phone_no=None, is_active=True, is_admin=False,
+             created_at=now, updated_at=now)
+        for index in range(2)])
+
+    # the database stamps whole seconds
+    time.sleep(1.1)
+
+    updated = repository.bulk_update(
+        [UpdateName(id=user.id, first_name="Renamed") for user in created])
+
+    assert {user.first_name for user in updated} == {"Renamed"}
+    assert all(user.updated_at > now for user in updated)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# File: test_count_strategies.py
+# Author: Oluwatobiloba Light
+"""Total counts of the listings"""
+
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.exceptions import ValidationError
+from app.model.event import Event
+from app.repository import base_repository
+from app.repository.event_repository import EventRepository
+from app.schema.event_schema import FindEventQueryOptions
+from tests.conftest import seed
+
+
+@pytest.fixture
+def seeded(database):
+    # the cache is shared by every database, clear the other tests' counts
+    base_repository._count_cache.clear()
+
+    yield EventRepository(database.session), seed(database, users=4,
+                                                  events=40)
+
+    base_repository._count_cache.clear()
+
+
+def search_options(repository, owner_id=None, **options) -> dict:
+    schema = FindEventQueryOptions(**options)
+
+    if owner_id is None:
+        return repository.read_by_options(schema)["search_options"]
+
+    return repository.get_events_by_user(schema, owner_id)["search_options"]
+
+
+def test_exact_count(seeded):
+    repository, ids = seeded
+
+    page = search_options(repository, page_size=15, count="exact")
+
+    assert (page["total_count"], page["pages"], page["has_more"]) == \
+        (40, 3, None)
+
+    # past the last page the window is empty, and the count is queried
+    assert search_options(repository, page=4, page_size=15,
+                          count="exact")["total_count"] == 40
+
+    assert search_options(repository, page_size=15, count="exact",
+                          owner_id=ids["users"][0])["total_count"] == 10
+
+
+def test_estimated_count_is_exact_without_an_estimate(seeded):
+    repository, ids = seeded
+
+    # SQLite has no planner estimate to read
+    assert search_options(repository, page_size=15,
+                          count="estimated")["total_count"] == 40
+
+    # filtered listings are always counted
+    assert search_options(repository, page_size=15, count="estimated",
+                          owner_id=ids["users"][0])["total_count"] == 10
+
+
+def test_cached_count_until_it_expires(database, seeded):
+    repository, ids = seeded
+
+    assert search_options(repository, page_size=15,
+                          count="cached")["total_count"] == 40
+
+    with database.session() as session:
+        session.execute(delete(Event).where(Event.id == ids["events"][0]))
+        session.commit()
+
+    # stale until the cached count expires
+    assert search_options(repository, page_size=15,
+                          count="cached")["total_count"] == 40
+
+    # counted on its own for another filter
+    assert search_options(repository, page_size=15, count="cached",
+                          owner_id=ids["users"][0])["total_count"] == 9
+
+    base_repository._count_cache.clear()
+
+    page = search_options(repository, page_size=15, count="cached")
+
+    assert (page["total_count"], page["pages"]) == (39, 3)
+
+
+def test_skipped_count(seeded):
+    repository, _ = seeded
+
+    first = search_options(repository, page_size=15, count="skip")
+
+    assert (first["total_count"], first["pages"], first["has_more"]) == \
+        (None, None, True)
+
+    last = repository.read_by_options(FindEventQueryOptions(
+        page=3, page_size=15, count="skip"))
+
+    assert len(last["founds"]) == 10
+    assert last["search_options"]["has_more"] is False
+
+
+def test_unknown_count_strategy(seeded):
+    repository, _ = seeded
+
+    with pytest.raises(ValidationError) as refused:
+        search_options(repository, count="approximate")
+
+    assert refused.value.detail == "Invalid count strategy : approximate"
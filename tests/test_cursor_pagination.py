@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# File: test_cursor_pagination.py
+# Author: Oluwatobiloba Light
+"""Keyset pagination of the listings"""
+
+
+import base64
+import json
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.repository.event_repository import EventRepository
+from app.schema.event_schema import FindEventQueryOptions
+from app.util.cursor import decode_cursor, encode_cursor
+from tests.conftest import seed
+
+
+@pytest.fixture
+def seeded(database):
+    return EventRepository(database.session), seed(database, users=3,
+                                                   events=23)
+
+
+def walk(read, ordering: str, page_size: int = 5) -> list:
+    """The ids of every page, following the cursors to the last one"""
+    ids, after = [], None
+
+    while True:
+        result = read(FindEventQueryOptions(
+            ordering=ordering, page_size=page_size, after=after,
+            count="skip"))
+
+        ids.extend(event.id for event in result["founds"])
+
+        after = result["search_options"]["next_cursor"]
+
+        if after is None:
+            return ids
+
+
+@pytest.mark.parametrize("ordering", ["-id", "id", "created_at",
+                                      "-created_at"])
+def test_cursors_walk_the_whole_listing(seeded, ordering):
+    repository, _ = seeded
+
+    listing = repository.read_by_options(FindEventQueryOptions(
+        ordering=ordering, page_size="all"))
+
+    assert walk(repository.read_by_options, ordering) == \
+        [event.id for event in listing["founds"]]
+
+
+def test_cursors_of_a_user_s_events(seeded):
+    repository, ids = seeded
+    owner_id = ids["users"][0]
+
+    walked = walk(lambda options: repository.get_events_by_user(
+        options, owner_id), "-created_at", page_size=2)
+
+    # the owner has every third event, which were created in order
+    assert walked == ids["events"][::3][::-1]
+
+
+def test_cursor_round_trip():
+    values = ["2026-01-01T00:00:00", "8c0c5a4e-8a43-4a57-9d9f-8d1e0b9a1e11"]
+
+    cursor = encode_cursor("-created_at", values)
+
+    # url safe, with no padding to escape
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+    assert decode_cursor(cursor, "-created_at") == values
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(
+        json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("ordering, cursor", [
+    ("-created_at", "not a cursor"),
+    ("-created_at", _cursor(["no", "ordering"])),
+    # issued for another ordering
+    ("-created_at", _cursor({"o": "created_at",
+                             "v": ["2026-01-01T00:00:00", "x"]})),
+    ("-created_at", _cursor({"o": "-created_at",
+                             "v": ["2026-01-01T00:00:00"]})),
+    ("-created_at", _cursor({"o": "-created_at", "v": ["yesterday", "x"]})),
+    ("-id", _cursor({"o": "-id", "v": ["not-a-uuid"]})),
+])
+def test_tampered_cursor_is_refused(seeded, ordering, cursor):
+    repository, _ = seeded
+
+    with pytest.raises(ValidationError):
+        repository.read_by_options(FindEventQueryOptions(
+            ordering=ordering, page_size=5, after=cursor))
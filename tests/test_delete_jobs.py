@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# File: test_delete_jobs.py
+# Author: Oluwatobiloba Light
+"""Account deletions in the background"""
+
+
+from uuid import uuid4
+
+from app.repository.user_repository import UserRepository
+from tests.conftest import auth_headers, seed
+
+
+def test_delete_job_lifecycle(database, client):
+    ids = seed(database, users=2, events=6)
+    user_id = ids["users"][0]
+    headers = auth_headers(user_id)
+
+    started = client.delete("/user/?background=true", headers=headers)
+
+    assert started.status_code == 202
+
+    job = started.json()["job"]
+
+    assert (job["status"], job["total"], job["deleted"]) == \
+        ("pending", 3, 0)
+
+    # the test client runs the job before returning the response
+    done = client.get(f"/user/delete-jobs/{job['id']}", headers=headers)
+
+    assert done.status_code == 200
+    assert (done.json()["status"], done.json()["deleted"]) == ("done", 3)
+
+    assert UserRepository(database.session).get_by_email(
+        "user-0@example.com") is None
+
+
+def test_delete_job_is_only_seen_by_its_user(database, client):
+    ids = seed(database, users=2, events=2)
+
+    job = client.delete("/user/?background=true", headers=auth_headers(
+        ids["users"][0])).json()["job"]
+
+    url = f"/user/delete-jobs/{job['id']}"
+
+    assert client.get(url).status_code == 403
+    assert client.get(url, headers=auth_headers(
+        ids["users"][1])).status_code == 404
+    assert client.get(f"/user/delete-jobs/{uuid4()}", headers=auth_headers(
+        ids["users"][0])).status_code == 404
+
+
+def test_failed_delete_job(database, client, monkeypatch):
+    ids = seed(database, users=1, events=2)
+    headers = auth_headers(ids["users"][0])
+
+    def fail(self, user_id, batch_size=None, progress=None):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(UserRepository, "delete_by_id_in_batches", fail)
+
+    job = client.delete("/user/?background=true",
+                        headers=headers).json()["job"]
+
+    # the user is kept, deactivated, and can still see why
+    failed = client.get(f"/user/delete-jobs/{job['id']}",
+                        headers=headers).json()
+
+    assert (failed["status"], failed["error"]) == \
+        ("failed", "database went away")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# File: test_event_conditional.py
+# Author: Oluwatobiloba Light
+"""Conditional requests of the event endpoints"""
+
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.schema.event_schema import UpdateEvent
+from tests.conftest import auth_headers, seed
+
+
+@pytest.fixture
+def seeded(database):
+    return seed(database, users=2, events=4, categories=2)
+
+
+@pytest.mark.parametrize("url", ["/event/all", "/event/{owner_id}/all"])
+def test_list_after_delete_is_modified(client, seeded, url):
+    owner_id = seeded["users"][0]
+    url = url.format(owner_id=owner_id)
+
+    cached = client.get(url)
+
+    # a delete leaves the latest update of the other events as it was
+    assert "Last-Modified" not in cached.headers
+
+    assert client.get(url, headers={
+        "If-None-Match": cached.headers["ETag"]}).status_code == 304
+
+    # the owner's first event is not the latest updated one
+    assert client.delete(f"/event/{seeded['events'][0]}",
+                         headers=auth_headers(owner_id)).status_code == 200
+
+    later = format_datetime(
+        datetime.now(timezone.utc) + timedelta(days=1), usegmt=True)
+
+    for headers in ({"If-None-Match": cached.headers["ETag"]},
+                    {"If-Modified-Since": later}):
+        fresh = client.get(url, headers=headers)
+
+        assert fresh.status_code == 200
+        assert len(fresh.json()["founds"]) == \
+            len(cached.json()["founds"]) - 1
+
+
+@pytest.mark.parametrize("url", ["/event/all", "/event/{owner_id}/all",
+                                 "/event/{event_id}"])
+def test_read_after_update_is_modified(container, client, seeded, url):
+    owner_id, event_id = seeded["users"][0], seeded["events"][0]
+    url = url.format(owner_id=owner_id, event_id=event_id)
+
+    cached = client.get(url)
+
+    container.event_service().patch(
+        UpdateEvent.model_construct(name="Renamed"), event_id, owner_id)
+
+    fresh = client.get(url, headers={"If-None-Match": cached.headers["ETag"]})
+
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != cached.headers["ETag"]
+    assert "Renamed" in fresh.text
+
+
+def test_event_is_not_modified_since(client, seeded):
+    url = f"/event/{seeded['events'][0]}"
+
+    cached = client.get(url)
+
+    assert client.get(url, headers={
+        "If-Modified-Since": cached.headers["Last-Modified"]}
+    ).status_code == 304
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# File: test_event_search.py
+# Author: Oluwatobiloba Light
+"""Full-text search of the events"""
+
+
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.model.event import Event, EventType
+from app.repository.event_repository import EventRepository
+from app.schema.event_schema import FindEventQueryOptions
+from tests.conftest import seed
+
+
+EVENTS = [
+    # name, location, description
+    ("Open air", "Lagos", "Live jazz by the lagoon"),
+    ("Jazz night", "Abuja", "An evening of music"),
+    ("Book fair", "Jazzland", "Stalls and readings"),
+    ("Food market", "Ibadan", "Street food"),
+]
+
+
+@pytest.fixture
+def events(database):
+    owner_id = seed(database, users=1, events=0)["users"][0]
+    now = datetime.utcnow()
+
+    with database.session() as session:
+        seeded = [Event(id=uuid4(), name=name, location=location,
+                        description=description, image="image",
+                        date=date.today(), evt_type=EventType.public,
+                        owner_id=owner_id,
+                        created_at=now + timedelta(seconds=index),
+                        updated_at=now)
+                  for index, (name, location, description)
+                  in enumerate(EVENTS)]
+
+        session.add_all(seeded)
+        session.commit()
+
+        return {event.name: event.id for event in seeded}
+
+
+def search(database, q: str, **options) -> list:
+    founds = EventRepository(database.session).read_by_options(
+        FindEventQueryOptions(q=q, count="exact", **options))["founds"]
+
+    return [event.name for event in founds]
+
+
+def test_search_ranks_names_first(database, events):
+    # name, then location, then description matches
+    assert search(database, "jazz") == ["Jazz night", "Book fair",
+                                        "Open air"]
+
+    # words match as prefixes, every one of them
+    assert search(database, "ja") == ["Jazz night", "Book fair", "Open air"]
+    assert search(database, "live jaz") == ["Open air"]
+    assert search(database, "jazz market") == []
+
+
+def test_search_with_an_ordering_is_not_ranked(database, events):
+    assert search(database, "jazz", ordering="created_at") == \
+        ["Open air", "Jazz night", "Book fair"]
+
+
+@pytest.mark.parametrize("q", ['"', 'jazz"', "jazz OR food", "NEAR(jazz)",
+                               "name:food", "*", "-jazz", "^jazz"])
+def test_search_syntax_is_plain_text(database, events, q):
+    # FTS5 operators are searched for as words, never parsed
+    founds = search(database, q)
+
+    assert "Food market" not in founds
+
+
+def test_search_follows_updates_and_deletes(database, events):
+    with database.session() as session:
+        session.execute(update(Event).where(
+            Event.id == events["Food market"]).values(name="Jazz brunch"))
+        session.execute(delete(Event).where(
+            Event.id == events["Open air"]))
+        session.commit()
+
+    assert search(database, "jazz") == ["Jazz brunch", "Jazz night",
+                                        "Book fair"]
+    assert search(database, "food") == ["Jazz brunch"]
+    assert search(database, "lagoon") == []
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# File: test_event_update.py
+# Author: Oluwatobiloba Light
+"""Updates of the categories of an event"""
+
+
+from typing import List, Optional
+from uuid import uuid4
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import func, select
+
+from app.core.exceptions import NotFoundError
+from app.model.event import event_categories
+from app.repository.event_repository import EventRepository
+from tests.conftest import seed
+
+
+class UpdateCategories(BaseModel):
+    name: Optional[str] = None
+    categories: Optional[List[str]] = None
+
+
+def links(db, event_id) -> int:
+    with db.session() as session:
+        return session.scalar(select(func.count()).select_from(
+            event_categories).filter(
+            event_categories.c.event_id == event_id))
+
+
+@pytest.fixture
+def seeded(database):
+    return database, seed(database, users=2, events=2, categories=2)
+
+
+def test_owner_replaces_categories(seeded):
+    db, ids = seeded
+    repository = EventRepository(db.session)
+
+    event = repository.update_event(
+        UpdateCategories(name="renamed",
+                         categories=["category-0", "category-1"]),
+        ids["events"][0], ids["users"][0])
+
+    assert event.name == "renamed"
+    assert sorted(category.name for category in event.categories) == \
+        ["category-0", "category-1"]
+    assert links(db, ids["events"][0]) == 2
+
+
+def test_other_user_is_not_found(seeded):
+    db, ids = seeded
+    repository = EventRepository(db.session)
+
+    # the event's own category is among them, a re-insert would collide
+    with pytest.raises(NotFoundError):
+        repository.update_event(
+            UpdateCategories(categories=["category-0", "category-1"]),
+            ids["events"][0], ids["users"][1])
+
+    assert links(db, ids["events"][0]) == 1
+
+
+def test_unknown_event_is_not_found(seeded):
+    db, ids = seeded
+    repository = EventRepository(db.session)
+
+    with pytest.raises(NotFoundError):
+        repository.update_event(UpdateCategories(categories=["category-0"]),
+                                uuid4(), ids["users"][0])
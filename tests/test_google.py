@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# File: test_google.py
+# Author: Oluwatobiloba Light
+"""Google logins against a local stand-in for Google's endpoints"""
+
+
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import google.auth.crypt
+import google.auth.jwt
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from app.core.cache import MemoryCacheBackend
+from app.core.config import configs
+from app.util import google as google_auth
+
+
+CLIENT_ID = "test-client"
+
+# the certificates response is cached for this many seconds
+MAX_AGE = 1
+
+
+class GoogleStub:
+    """Serves signing certificates and a token endpoint issuing ID tokens"""
+
+    def __init__(self) -> None:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "stub")])
+
+        certificate = x509.CertificateBuilder().subject_name(name)\
+            .issuer_name(name).public_key(key.public_key()).serial_number(1)\
+            .not_valid_before(datetime(2020, 1, 1))\
+            .not_valid_after(datetime(2040, 1, 1)).sign(key, hashes.SHA256())
+
+        self.certificates = {"stub": certificate.public_bytes(
+            serialization.Encoding.PEM).decode()}
+
+        self.signer = google.auth.crypt.RSASigner.from_string(
+            key.private_bytes(serialization.Encoding.PEM,
+                              serialization.PrivateFormat.PKCS8,
+                              serialization.NoEncryption()).decode(),
+            key_id="stub")
+
+        self.certificate_fetches = 0
+        self.token_requests = []
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def id_token(self) -> str:
+        now = int(time.time())
+
+        return google.auth.jwt.encode(self.signer, {
+            "iss": "https://accounts.google.com", "aud": CLIENT_ID,
+            "email": "buyer@example.com", "email_verified": True,
+            "iat": now, "exp": now + 600}).decode()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _reply(self, status: int, body: dict, **headers) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+
+                for name, value in headers.items():
+                    self.send_header(name.replace("_", "-"), value)
+
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode())
+
+            def do_GET(self) -> None:
+                stub.certificate_fetches += 1
+
+                self._reply(200, stub.certificates,
+                            Cache_Control=f"public, max-age={MAX_AGE}")
+
+            def do_POST(self) -> None:
+                form = parse_qs(self.rfile.read(
+                    int(self.headers["Content-Length"])).decode())
+
+                stub.token_requests.append(form)
+
+                if form["code"] == ["refused"]:
+                    return self._reply(400, {"error": "invalid_grant"})
+
+                self._reply(200, {"access_token": "access",
+                                  "id_token": stub.id_token(),
+                                  "scope": "openid email",
+                                  "expires_in": 3600})
+
+        return Handler
+
+    def __enter__(self) -> "GoogleStub":
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with GoogleStub() as stub:
+        monkeypatch.setattr(configs, "GOOGLE_CLIENT_ID", CLIENT_ID)
+        monkeypatch.setattr(configs, "GOOGLE_TOKEN_URI", stub.url + "/token")
+        monkeypatch.setattr(google_auth, "google_client_config", lambda: {
+            "client_id": CLIENT_ID, "client_secret": "secret",
+            "auth_uri": stub.url + "/auth",
+            "token_uri": stub.url + "/token"})
+        monkeypatch.setattr(
+            google_auth, "google_certificates",
+            google_auth.GoogleCertificates(stub.url + "/certs", 3600, 0))
+        # the pooled client belongs to the event loop of one test
+        monkeypatch.setattr(google_auth, "_http_client", None)
+
+        yield stub
+
+
+def run(coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await google_auth.http_client().aclose()
+
+            google_auth._http_client = None
+
+    return asyncio.run(main())
+
+
+def test_certificates_cached_for_their_max_age(stub):
+    id_token = stub.id_token()
+
+    async def verify():
+        verified = await asyncio.gather(*[
+            google_auth.verify_google_token(id_token) for _ in range(20)])
+
+        # concurrent logins wait on one fetch
+        assert stub.certificate_fetches == 1
+
+        await asyncio.sleep(MAX_AGE + 0.2)
+
+        await google_auth.verify_google_token(id_token)
+
+        return verified
+
+    verified = run(verify())
+
+    assert {info["email"] for info in verified} == {"buyer@example.com"}
+    assert stub.certificate_fetches == 2
+
+
+def test_invalid_token_is_refused(stub):
+    assert run(google_auth.verify_google_token("not.a.token")) is None
+
+
+def test_code_exchange(stub):
+    token = run(google_auth.exchange_code("granted", "verifier"))
+
+    assert token["access_token"] == "access"
+    assert stub.token_requests[-1]["code_verifier"] == ["verifier"]
+
+    assert run(google_auth.exchange_code("refused", "verifier")) is None
+
+
+def test_login_states_are_pkce_and_single_use(stub):
+    states = google_auth.OAuthStateStore(
+        MemoryCacheBackend(max_entries=100, max_bytes=1024 * 1024), ttl=60)
+
+    url, state = google_auth.get_google_auth_state(states)
+    _, other_state = google_auth.get_google_auth_state(states)
+
+    params = parse_qs(urlparse(url).query)
+
+    assert state != other_state
+    assert params["code_challenge_method"] == ["S256"]
+
+    code_verifier = states.pop(state)
+
+    assert params["code_challenge"] == [base64.urlsafe_b64encode(
+        hashlib.sha256(code_verifier.encode()).digest()).decode().rstrip("=")]
+
+    # a replayed callback finds no state
+    assert states.pop(state) is None
+    assert states.pop(other_state) is not None
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# File: test_password_hasher.py
+# Author: Oluwatobiloba Light
+"""Password hashing in the process pool of the sign ins"""
+
+
+from datetime import datetime
+from uuid import uuid4
+
+from dependency_injector import providers
+from passlib.context import CryptContext
+
+from app.core.config import configs
+from app.core.password_hasher import PasswordHasher
+from app.model.user import User
+from app.services import auth_service
+from tests.test_sign_in import PASSWORD, sign_in, sign_up
+
+
+def stored_password(database, email: str) -> str:
+    with database.session() as session:
+        return session.query(User.password).filter(
+            User.email == email).scalar()
+
+
+def test_sign_up_and_sign_in_go_through_the_pool(container, client,
+                                                 monkeypatch):
+    def in_process(*args):
+        raise AssertionError("bcrypt ran in the serving process")
+
+    # the workers are other processes, which the patches do not reach
+    monkeypatch.setattr(auth_service, "get_password_hash", in_process)
+    monkeypatch.setattr(auth_service, "verify_password", in_process)
+
+    assert sign_up(client, "buyer@example.com").status_code == 200
+    assert sign_in(client, "buyer@example.com").status_code == 200
+
+    stats = container.password_hasher().stats()
+
+    assert stats["started"] and stats["pending"] == 0
+
+
+def test_saturated_pool_refuses_sign_ins(container, client):
+    hasher = PasswordHasher(workers=1, max_pending=1)
+
+    container.password_hasher.override(providers.Object(hasher))
+
+    assert sign_up(client, "buyer@example.com").status_code == 200
+
+    # as if a sign in were hashing already
+    hasher.pending = hasher.max_pending
+
+    for refused in (sign_in(client, "buyer@example.com"),
+                    sign_up(client, "other@example.com")):
+        assert refused.status_code == 503
+        assert refused.headers["Retry-After"] == "1"
+
+    assert hasher.stats()["rejected"] == 2
+
+    hasher.pending = 0
+
+    assert sign_in(client, "buyer@example.com").status_code == 200
+
+
+def test_sign_in_rehashes_at_the_configured_cost(database, client):
+    now = datetime.utcnow()
+
+    cheaper = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5)
+
+    with database.session() as session:
+        session.add(User(id=uuid4(), email="buyer@example.com",
+                         first_name="First", last_name="Last",
+                         password=cheaper.hash(PASSWORD), is_active=True,
+                         is_admin=False, created_at=now, updated_at=now))
+        session.commit()
+
+    assert stored_password(database, "buyer@example.com").startswith("$2b$05$")
+
+    assert sign_in(client, "buyer@example.com").status_code == 200
+
+    rehashed = stored_password(database, "buyer@example.com")
+
+    assert rehashed.startswith(f"$2b${configs.PASSWORD_BCRYPT_ROUNDS:02d}$")
+
+    # the new hash still signs in, and is kept
+    assert sign_in(client, "buyer@example.com").status_code == 200
+    assert stored_password(database, "buyer@example.com") == rehashed
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# File: test_principal_cache.py
+# Author: Oluwatobiloba Light
+"""The cache of authenticated users"""
+
+
+import time
+from uuid import UUID
+
+from app.core.cache import PrincipalCache
+from tests.conftest import auth_headers, seed
+
+
+def test_principal_is_cached_until_the_user_changes(database, container,
+                                                    client):
+    user_id = seed(database, users=1, events=0)["users"][0]
+    headers = auth_headers(user_id)
+
+    cache = container.principal_cache()
+
+    assert client.get("/auth/me", headers=headers).json()["first_name"] == \
+        "First"
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 1)
+
+    patched = client.patch("/user/", json={"first_name": "Renamed"},
+                           headers=headers)
+
+    assert patched.status_code == 200
+
+    # the patch dropped the cached user
+    assert client.get("/auth/me", headers=headers).json()["first_name"] == \
+        "Renamed"
+
+    container.user_service().patch_attr(UUID(str(user_id)), "is_active",
+                                        False)
+
+    refused = client.get("/auth/me", headers=headers)
+
+    assert (refused.status_code, refused.json()["detail"]) == \
+        (403, "Inactive user")
+
+
+def test_principal_copies_are_the_request_s_own():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+
+    first = cache.get_or_set("user", None, lambda: {"name": "First"})
+    first["name"] = "Changed by the request"
+
+    assert cache.get_or_set("user", None, lambda: None) == {"name": "First"}
+
+    cache.invalidate("user")
+
+    assert cache.get_or_set("user", None, lambda: {"name": "Loaded"}) == \
+        {"name": "Loaded"}
+    assert cache.stats()["hits"] == 1
+
+
+def test_principal_is_not_kept_past_the_token():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+
+    cache.get_or_set("user", time.time() + 0.1, lambda: "First")
+
+    assert cache.get_or_set("user", None, lambda: "Reloaded") == "First"
+
+    time.sleep(0.2)
+
+    # expired with the token it was loaded for, well before the ttl
+    assert cache.get_or_set("user", None, lambda: "Reloaded") == "Reloaded"
+
+
+def test_disabled_principal_cache_always_loads():
+    cache = PrincipalCache(maxsize=10, ttl=60, enabled=False)
+
+    for name in ("First", "Second"):
+        assert cache.get_or_set("user", None, lambda: name) == name
+
+    assert cache.stats()["entries"] == 0
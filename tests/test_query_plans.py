@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# File: test_query_plans.py
+# Author: Oluwatobiloba Light
+"""Query plans of the hot paths"""
+
+
+import re
+from contextlib import contextmanager
+from typing import Iterable, List, Tuple
+
+import pytest
+from sqlalchemy import event
+
+from app.model.category import Category
+from app.repository.event_repository import EventRepository
+from app.repository.user_repository import UserRepository
+from app.schema.event_schema import FindEventQueryOptions
+from tests.conftest import seed
+
+
+TABLES = {"events", "users", "categories", "event_categories"}
+
+# SQLite reports a full table scan as a bare "SCAN <table>", an index walk
+# as "SCAN <table> USING ... INDEX" and a lookup as "SEARCH"; aliased tables
+# come as "<table>_1"
+SQLITE_SEQ_SCAN = re.compile(r"^SCAN (\w+?)(?:_\d+)?$")
+
+SQLITE_INDEX_WALK = re.compile(r"^SCAN (\w+?)(?:_\d+)? USING ")
+
+POSTGRES_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+# an index scan with no "Index Cond" below it reads the whole index
+POSTGRES_INDEX_SCAN = re.compile(r"Index (?:Only )?Scan (?:Backward )?"
+                                 r"using \w+ on (\w+)")
+
+
+@contextmanager
+def captured_statements(db):
+    """Collects the statements run on the database with their parameters"""
+    statements: List[Tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db._engine, "before_cursor_execute", capture)
+
+    try:
+        yield statements
+    finally:
+        event.remove(db._engine, "before_cursor_execute", capture)
+
+
+def _postgres_scans(lines: List[str], searched: Iterable[str]) \
+        -> List[str]:
+    tables = []
+
+    for index, line in enumerate(lines):
+        match = POSTGRES_SEQ_SCAN.search(line)
+
+        if match:
+            tables.append(match.group(1))
+            continue
+
+        match = POSTGRES_INDEX_SCAN.search(line)
+
+        if match and match.group(1) in searched:
+            details = []
+
+            for detail in lines[index + 1:]:
+                if "->" in detail:
+                    break
+                details.append(detail)
+
+            if not any("Index Cond" in detail for detail in details):
+                tables.append(match.group(1))
+
+    return tables
+
+
+def _sqlite_scans(lines: List[str], searched: Iterable[str]) -> List[str]:
+    tables = []
+
+    for line in lines:
+        match = SQLITE_SEQ_SCAN.match(line)
+
+        if match is None:
+            match = SQLITE_INDEX_WALK.match(line)
+
+            if match is not None and match.group(1) not in searched:
+                continue
+
+        if match is not None:
+            tables.append(match.group(1))
+
+    return tables
+
+
+def query_plans(db, statements) -> List[Tuple[str, List[str]]]:
+    """The plan of each statement, one line per step"""
+    plans = []
+
+    connection = db._engine.raw_connection()
+
+    try:
+        cursor = connection.cursor()
+
+        postgres = db._engine.dialect.name == "postgresql"
+
+        # with sequential scans priced out, one left means no index serves
+        # the query, however small the seeded tables are
+        if postgres:
+            cursor.execute("SET enable_seqscan = off")
+
+        for statement, parameters in statements:
+            cursor.execute(("EXPLAIN " if postgres else
+                            "EXPLAIN QUERY PLAN ") + statement, parameters)
+
+            plans.append((statement, [row[0] if postgres else row[-1]
+                                      for row in cursor.fetchall()]))
+    finally:
+        connection.close()
+
+    return plans
+
+
+def seq_scans(db, statements, searched: Iterable[str] = ()) \
+        -> List[Tuple[str, str]]:
+    """
+    The tables the statements read by a sequential scan, or by a walk of a
+    whole index for the searched ones, which the statements filter on
+    """
+    scans = _postgres_scans if db._engine.dialect.name == "postgresql" \
+        else _sqlite_scans
+
+    return [(table, statement)
+            for statement, lines in query_plans(db, statements)
+            for table in scans(lines, searched) if table in TABLES]
+
+
+@pytest.fixture
+def seeded(database):
+    return database, seed(database)
+
+
+def assert_index_backed(db, run, searched: Iterable[str] = ()) -> None:
+    # an ordered index walk serves a page, a filter needs a keyed lookup
+    with captured_statements(db) as statements:
+        run()
+
+    assert statements
+
+    assert seq_scans(db, statements, searched) == []
+
+
+def test_event_listing(seeded):
+    # an exact count reads every matching row by definition, the page
+    # itself has to walk an index
+    db, _ = seeded
+    repository = EventRepository(db.session)
+
+    assert_index_backed(db, lambda: repository.read_by_options(
+        FindEventQueryOptions(page=2, page_size=10, count="skip"),
+        eager=True))
+
+    assert_index_backed(db, lambda: repository.read_by_options(
+        FindEventQueryOptions(page_size=10, ordering="-created_at",
+                              count="skip"), eager=True))
+
+
+def test_events_by_owner(seeded):
+    db, ids = seeded
+    repository = EventRepository(db.session)
+
+    assert_index_backed(db, lambda: repository.get_events_by_user(
+        FindEventQueryOptions(page_size=10, count="skip"), ids["users"][0]),
+        searched={"events"})
+
+
+def test_event_by_id(seeded):
+    db, ids = seeded
+    repository = EventRepository(db.session)
+
+    assert_index_backed(
+        db, lambda: repository.get_event_by_id(ids["events"][0]),
+        searched={"events", "event_categories"})
+
+
+def test_events_by_category(seeded):
+    db, ids = seeded
+
+    def run():
+        with db.session() as session:
+            category = session.get(Category, ids["categories"][0])
+
+            assert category.events
+
+    assert_index_backed(db, run, searched={"categories",
+                                           "event_categories"})
+
+
+def test_user_lookups(seeded):
+    db, ids = seeded
+    repository = UserRepository(db.session)
+
+    def run():
+        assert repository.read_by_id(ids["users"][0])
+        assert repository.get_by_email("USER-1@example.com")
+
+    assert_index_backed(db, run, searched={"users"})
+
+
+def test_email_lookup_uses_the_lower_index(seeded):
+    # a plain index on email can not serve lower(email)
+    db, _ = seeded
+    repository = UserRepository(db.session)
+
+    with captured_statements(db) as statements:
+        assert repository.get_by_email("User-1@Example.COM")
+
+    [(_, lines)] = query_plans(db, statements)
+
+    assert any("uq_users_email_lower" in line for line in lines), lines
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# File: test_read_your_writes.py
+# Author: Oluwatobiloba Light
+"""Reads on the replicas, and on the primary after a client's writes"""
+
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.database import Database, read_your_writes_scope
+from app.core.middleware import READ_YOUR_WRITES_COOKIE, \
+    parse_primary_until, read_your_writes_middleware, sign_primary_until
+
+
+SECRET = "test-secret"
+
+SECONDS = 0.5
+
+
+def make_database(tmp_path, replicas: int, strategy: str) -> Database:
+    urls = [f"sqlite:///{tmp_path / f'{name}.db'}"
+            for name in ["primary"] + [f"replica-{index}"
+                                       for index in range(replicas)]]
+
+    return Database(urls[0], replica_urls=urls[1:],
+                    replica_strategy=strategy,
+                    read_your_writes_seconds=SECONDS)
+
+
+def read_from(db: Database) -> str:
+    with db.read_session() as session:
+        return session.get_bind().url.database.rsplit("/", 1)[-1]
+
+
+@pytest.fixture
+def client(tmp_path):
+    db = make_database(tmp_path, 1, "round_robin")
+
+    app = FastAPI()
+    app.middleware("http")(read_your_writes_middleware(SECRET, SECONDS))
+
+    @app.post("/write")
+    def write():
+        with db.session() as session:
+            session.execute(text("CREATE TABLE IF NOT EXISTS t (id INTEGER)"))
+            session.commit()
+
+    @app.get("/read")
+    def read():
+        return read_from(db)
+
+    return TestClient(app)
+
+
+def test_reads_after_a_write_go_to_the_primary(client):
+    assert client.get("/read").json() == "replica-0.db"
+
+    client.post("/write")
+
+    assert READ_YOUR_WRITES_COOKIE in client.cookies
+    assert client.get("/read").json() == "primary.db"
+
+    time.sleep(SECONDS + 0.1)
+
+    assert client.get("/read").json() == "replica-0.db"
+
+
+def test_cookie_is_clamped():
+    # a client can not pin itself on the primary for longer than a write
+    cookie = sign_primary_until(time.time() + 3600, SECRET)
+
+    assert parse_primary_until(cookie, SECRET, SECONDS) <= \
+        time.time() + SECONDS
+
+
+@pytest.mark.parametrize("cookie", [
+    f"{time.time() + 3600}",
+    sign_primary_until(time.time() + 3600, "other-secret"),
+    "not-a-timestamp",
+])
+def test_unsigned_cookie_is_ignored(client, cookie):
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, cookie)
+
+    assert client.get("/read").json() == "replica-0.db"
+
+
+def test_round_robin(tmp_path):
+    db = make_database(tmp_path, 3, "round_robin")
+
+    with read_your_writes_scope():
+        assert [read_from(db) for _ in range(4)] == [
+            "replica-0.db", "replica-1.db", "replica-2.db", "replica-0.db"]
+
+
+def test_least_connections(tmp_path):
+    db = make_database(tmp_path, 2, "least_connections")
+
+    with read_your_writes_scope():
+        with db.read_session() as busy:
+            # checks out a connection of the first replica
+            busy.execute(text("SELECT 1"))
+
+            assert read_from(db) == "replica-1.db"
+
+        assert read_from(db) == "replica-0.db"
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# File: test_reservations.py
+# Author: Oluwatobiloba Light
+"""Ticket reservations under concurrent buyers"""
+
+
+import itertools
+import threading
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.core.exceptions import ConflictError, NotFoundError, \
+    ValidationError
+from app.model.ticket import Reservation, TicketType, ticket_type_shards
+from app.repository.ticket_repository import TicketRepository
+from app.schema.ticket_schema import CreateTicketType
+from tests.conftest import seed
+
+
+CAPACITY = 40
+
+BUYERS = 8
+
+
+@pytest.fixture
+def on_sale(database):
+    ids = seed(database, users=BUYERS, events=1)
+
+    event_id, owner_id = ids["events"][0], ids["users"][0]
+
+    repository = TicketRepository(database.session)
+
+    ticket_type = repository.create_ticket_type(CreateTicketType(
+        name="General", price=Decimal("25.00"), capacity=CAPACITY,
+        max_per_order=4), event_id, owner_id)
+
+    return database, repository, event_id, ticket_type.id, ids["users"]
+
+
+@pytest.fixture
+def sharded(on_sale):
+    _, repository, event_id, _, users = on_sale
+
+    repository.set_ticket_shards(event_id, users[0], 4)
+
+    return on_sale
+
+
+def held(db, ticket_type_id):
+    """The tickets remaining, on the ticket type and its shards, and held"""
+    with db.session() as session:
+        return session.execute(select(
+            TicketType.remaining +
+            select(func.coalesce(func.sum(ticket_type_shards.c.remaining),
+                                 0))
+            .filter(ticket_type_shards.c.ticket_type_id == ticket_type_id)
+            .scalar_subquery(),
+            select(func.coalesce(func.sum(Reservation.quantity), 0))
+            .filter(Reservation.ticket_type_id == ticket_type_id)
+            .scalar_subquery())
+            .filter(TicketType.id == ticket_type_id)).one()
+
+
+def reserve_concurrently(repository, event_id, ticket_type_id, users,
+                         attempts: int) -> dict:
+    """Each buyer reserves one ticket at a time on a thread of their own"""
+    outcomes = {"held": 0, "sold_out": 0}
+    lock = threading.Lock()
+
+    def buy(user_id):
+        for _ in range(attempts):
+            try:
+                repository.reserve(event_id, ticket_type_id, user_id, 1)
+                outcome = "held"
+            except ConflictError:
+                outcome = "sold_out"
+
+            with lock:
+                outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=buy, args=(user_id,))
+               for user_id in users]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return outcomes
+
+
+def test_concurrent_reservations_do_not_oversell(on_sale):
+    db, repository, event_id, ticket_type_id, users = on_sale
+
+    # twice as many attempts as tickets
+    outcomes = reserve_concurrently(repository, event_id, ticket_type_id,
+                                    users, 2 * CAPACITY // BUYERS)
+
+    assert outcomes == {"held": CAPACITY, "sold_out": CAPACITY}
+
+    assert tuple(held(db, ticket_type_id)) == (0, CAPACITY)
+
+
+def test_order_limit(on_sale):
+    _, repository, event_id, ticket_type_id, users = on_sale
+
+    with pytest.raises(ValidationError):
+        repository.reserve(event_id, ticket_type_id, users[1], 5)
+
+
+def test_cancel_gives_tickets_back(on_sale):
+    db, repository, event_id, ticket_type_id, users = on_sale
+
+    reservation, remaining = repository.reserve(
+        event_id, ticket_type_id, users[1], 3)
+
+    assert remaining == CAPACITY - 3
+
+    # only the buyer cancels their reservation
+    with pytest.raises(NotFoundError):
+        repository.cancel_reservation(event_id, reservation.id, users[2])
+
+    assert repository.cancel_reservation(
+        event_id, reservation.id, users[1]) == CAPACITY
+
+    assert tuple(held(db, ticket_type_id)) == (CAPACITY, 0)
+
+
+def test_sharded_reservations_do_not_oversell(sharded):
+    db, repository, event_id, ticket_type_id, users = sharded
+
+    outcomes = reserve_concurrently(repository, event_id, ticket_type_id,
+                                    users, 2 * CAPACITY // BUYERS)
+
+    assert outcomes == {"held": CAPACITY, "sold_out": CAPACITY}
+
+    assert tuple(held(db, ticket_type_id)) == (0, CAPACITY)
+
+
+def test_sharded_remaining_is_not_counted(sharded):
+    db, repository, event_id, ticket_type_id, users = sharded
+
+    _, remaining = repository.reserve(event_id, ticket_type_id, users[1], 1)
+
+    assert remaining is None
+
+    # as tickets given back once their shard is gone are
+    with db.session() as session:
+        session.execute(update(TicketType).filter(
+            TicketType.id == ticket_type_id).values(remaining=2))
+        session.commit()
+
+    reservation, remaining = repository.reserve(
+        event_id, ticket_type_id, users[1], 1)
+
+    # held off the ticket type, whose count leaves the shards out
+    assert reservation.shard is None
+    assert remaining is None
+
+
+def test_rebalance_after_fewer_shards(sharded):
+    db, repository, event_id, ticket_type_id, users = sharded
+
+    # the first shard was picked among 4 before the counters were split
+    # in 2
+    repository.set_ticket_shards(event_id, users[0], 2)
+
+    with db.session() as session:
+        shard = repository._rebalance(session, ticket_type_id, 4, first=3)
+
+        session.commit()
+
+    assert shard in (0, 1)
+    assert tuple(held(db, ticket_type_id)) == (CAPACITY - 4, 0)
+
+
+def test_reshard_while_reserving(sharded):
+    db, repository, event_id, ticket_type_id, users = sharded
+
+    # on a database with row locks, a hold locking the shards before the
+    # ticket type deadlocks with a change of the shards
+    stop, errors = threading.Event(), []
+
+    def reshard():
+        for shards in itertools.cycle([1, 2, 4, 8]):
+            if stop.is_set():
+                return
+
+            try:
+                repository.set_ticket_shards(event_id, users[0], shards)
+            except Exception as e:
+                errors.append(e)
+                return
+
+    thread = threading.Thread(target=reshard)
+    thread.start()
+
+    try:
+        outcomes = reserve_concurrently(repository, event_id,
+                                        ticket_type_id, users[1:], 4)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert errors == []
+
+    # no buyer's thread died on an error
+    assert sum(outcomes.values()) == 4 * (BUYERS - 1)
+
+    remaining, reserved = held(db, ticket_type_id)
+
+    assert reserved == outcomes["held"]
+    assert remaining + reserved == CAPACITY
+
+    # no ticket was lost on the way
+    while True:
+        try:
+            repository.reserve(event_id, ticket_type_id, users[1], 1)
+        except ConflictError:
+            break
+
+    assert tuple(held(db, ticket_type_id)) == (0, CAPACITY)
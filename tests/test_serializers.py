@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# File: test_serializers.py
+# Author: Oluwatobiloba Light
+"""Serialized events against the response models of the endpoints"""
+
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app.repository.event_repository import EventRepository
+from app.schema.event_schema import Event, Event_, FindEventQueryOptions, \
+    FindEventsResult
+from app.util.serializers import serialize_event, serialize_events_result
+from tests.conftest import seed
+
+
+def encoded(content) -> dict:
+    return orjson.loads(ORJSONResponse(content).body)
+
+
+def test_event_matches_its_response_model(database):
+    ids = seed(database, users=2, events=2, categories=2)
+
+    event = EventRepository(database.session).get_event_by_id(
+        ids["events"][0])
+
+    assert encoded(serialize_event(event)) == Event.model_validate(
+        event, from_attributes=True).model_dump(mode="json")
+
+
+def test_events_listing_matches_its_response_model(database):
+    seed(database, users=2, events=6, categories=2)
+
+    result = EventRepository(database.session).read_by_options(
+        FindEventQueryOptions(page_size=4))
+
+    serialized = encoded(serialize_events_result(result))
+
+    # the listing validates as its response model, which adds nothing to it
+    assert FindEventsResult.model_validate(serialized).model_dump(
+        mode="json") == serialized
+
+    assert serialized["founds"] == [
+        Event_.model_validate(event, from_attributes=True).model_dump(
+            mode="json") for event in result["founds"]]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# File: test_sign_in.py
+# Author: Oluwatobiloba Light
+"""Sign ups and sign ins"""
+
+
+PASSWORD = "password"
+
+
+def sign_up(client, email: str):
+    return client.post("/auth/sign-up", json={
+        "email": email, "password": PASSWORD, "first_name": "First",
+        "last_name": "Last"})
+
+
+def sign_in(client, email: str, password: str = PASSWORD):
+    return client.post("/auth/sign-in",
+                       json={"email": email, "password": password})
+
+
+def test_sign_in_ignores_the_case_of_the_email(client):
+    assert sign_up(client, "Buyer@Example.com").json()["email"] == \
+        "buyer@example.com"
+
+    signed_in = sign_in(client, "bUYER@example.COM")
+
+    assert signed_in.status_code == 200
+    assert signed_in.json()["user_info"]["email"] == "buyer@example.com"
+
+    assert sign_in(client, "BUYER@EXAMPLE.COM", "wrong").status_code == 403
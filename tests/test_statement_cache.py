@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# File: test_statement_cache.py
+# Author: Oluwatobiloba Light
+"""Reuse of the built list statements"""
+
+
+import pytest
+
+from app.repository.base_repository import statement_cache
+from app.repository.event_repository import EventRepository
+from app.schema.event_schema import FindEventQueryOptions
+from app.util.query_builder import StatementCache
+from tests.conftest import seed
+
+
+@pytest.fixture
+def seeded(database):
+    # shared by every repository, start from an empty one
+    statement_cache.clear()
+
+    yield EventRepository(database.session), seed(database, users=2,
+                                                  events=10)
+
+    statement_cache.clear()
+
+
+def test_same_shape_is_a_hit(seeded):
+    repository, ids = seeded
+
+    users_events = [
+        repository.get_events_by_user(FindEventQueryOptions(
+            page=page, page_size=2, ordering="-created_at"), owner_id)
+        for owner_id, page in ((ids["users"][0], 1), (ids["users"][1], 2))]
+
+    assert statement_cache.stats()["hits"] == 1
+    assert statement_cache.stats()["misses"] == 1
+
+    # the statement is shared, the values are not: newest first, the users
+    # own every other event
+    assert [[event.id for event in events["founds"]]
+            for events in users_events] == \
+        [ids["events"][8:4:-2], ids["events"][5:1:-2]]
+
+
+def test_new_shape_is_a_miss(seeded):
+    repository, _ = seeded
+
+    for options in (FindEventQueryOptions(page_size=2),
+                    FindEventQueryOptions(page_size=2, ordering="id"),
+                    FindEventQueryOptions(page_size="all"),
+                    FindEventQueryOptions(page_size=2, count="skip"),
+                    FindEventQueryOptions(page_size=2, q="event")):
+        repository.read_by_options(options)
+
+    assert statement_cache.stats()["hits"] == 0
+    assert statement_cache.stats()["misses"] == 5
+
+    # the page and page size are values, the same shape as the first
+    repository.read_by_options(FindEventQueryOptions(page=3, page_size=4))
+
+    assert statement_cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_is_evicted():
+    cache = StatementCache(maxsize=2)
+
+    first = cache.get_or_build("first", object)
+
+    cache.get_or_build("second", object)
+
+    assert cache.get_or_build("first", object) is first
+
+    cache.get_or_build("third", object)
+
+    # "second" was the least recently used
+    assert cache.get_or_build("first", object) is first
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2,
+                             "misses": 3}
+
+    cache.get_or_build("second", object)
+
+    assert cache.stats()["misses"] == 4
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# File: test_user_updates.py
+# Author: Oluwatobiloba Light
+"""Updates of a user, as seen through the cached events they own"""
+
+
+from tests.conftest import auth_headers, seed
+
+
+def test_patched_owner_is_not_served_from_the_events_cache(database, client):
+    ids = seed(database, users=1, events=1)
+
+    url = f"/event/{ids['events'][0]}"
+
+    cached = client.get(url)
+
+    assert cached.json()["owner"]["first_name"] == "First"
+
+    # served from the cache
+    assert client.get(url).headers["ETag"] == cached.headers["ETag"]
+
+    patched = client.patch("/user/", json={"first_name": "Renamed"},
+                           headers=auth_headers(ids["users"][0]))
+
+    assert patched.status_code == 200
+
+    fresh = client.get(url, headers={"If-None-Match": cached.headers["ETag"]})
+
+    assert fresh.status_code == 200
+    assert fresh.json()["owner"]["first_name"] == "Renamed"
+    assert fresh.headers["ETag"] != cached.headers["ETag"]
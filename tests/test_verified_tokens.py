@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# File: test_verified_tokens.py
+# Author: Oluwatobiloba Light
+"""The cache of verified access tokens"""
+
+
+import time
+
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.config import configs
+from tests.conftest import auth_headers, seed
+
+
+@pytest.fixture(autouse=True)
+def verified_tokens():
+    security._verified_tokens.clear()
+
+    yield security._verified_tokens
+
+    security._verified_tokens.clear()
+
+
+def access_token(user_id, expires_in: int) -> str:
+    return jwt.encode({"exp": int(time.time()) + expires_in,
+                       "id": str(user_id), "email": "user@example.com",
+                       "name": "First Last", "is_admin": False},
+                      configs.SECRET_KEY, algorithm=security.ALGORITHM)
+
+
+def test_token_is_verified_once(monkeypatch):
+    token = access_token("user", expires_in=60)
+
+    claims = security.decode_jwt(token)
+
+    assert claims["id"] == "user"
+
+    def verify(token):
+        raise AssertionError("verified again")
+
+    monkeypatch.setattr(security, "_decode_jwt", verify)
+
+    assert security.decode_jwt(token) == claims
+
+    # the caller's copy, the cached claims are left alone
+    security.decode_jwt(token)["id"] = "someone else"
+
+    assert security.decode_jwt(token) == claims
+
+
+def test_expired_token_is_not_served(database, client):
+    user_id = seed(database, users=1, events=0)["users"][0]
+    token = access_token(user_id, expires_in=1)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert security.decode_jwt(token)
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    time.sleep(1.1)
+
+    assert security.decode_jwt(token) == {}
+
+    expired = client.get("/auth/me", headers=headers)
+
+    assert (expired.status_code, expired.json()["detail"]) == \
+        (403, "Invalid token or expired token.")
+
+
+def test_rotated_secret_revokes_the_tokens(monkeypatch):
+    token = access_token("user", expires_in=60)
+
+    assert security.decode_jwt(token)
+
+    monkeypatch.setattr(configs, "SECRET_KEY", "rotated-secret")
+
+    assert security.decode_jwt(token) == {}
+
+    monkeypatch.undo()
+
+    assert security.decode_jwt(token)["id"] == "user"
+
+
+def test_deleted_user_s_token_is_refused(database, container, client):
+    user_id = seed(database, users=1, events=0)["users"][0]
+    headers = auth_headers(user_id)
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    container.user_service().remove_by_id(user_id)
+
+    # the token is still valid, but its user is looked up again
+    refused = client.get("/auth/me", headers=headers)
+
+    assert (refused.status_code, refused.json()["detail"]) == \
+        (403, "User not found")